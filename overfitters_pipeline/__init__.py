@@ -10,13 +10,15 @@ Moduły:
 - pipeline: Główny pipeline łączący wszystkie warstwy
 """
 
-from .regex_layer import RegexLayer, DetectedEntity, EntityType
+from .regex_layer import RegexLayer, DetectedEntity, EntityType, CompactEntity, EntityBatch
 from .pipeline import AnonymizationPipeline
 
 __all__ = [
     'RegexLayer',
     'DetectedEntity', 
     'EntityType',
+    'CompactEntity',
+    'EntityBatch',
     'AnonymizationPipeline',
 ]
 
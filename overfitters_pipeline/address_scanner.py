@@ -0,0 +1,118 @@
+"""
+Skaner adresów zakotwiczony na prefiksach - alternatywny silnik dla adresów warstwy Regex.
+
+Każde dopasowanie address_regex zaczyna się od jednego z kilkunastu stałych prefiksów
+(ul., ulica, al., aleja, ...). Zamiast próbować wzorca przy każdej granicy słowa,
+skaner najpierw znajduje wystąpienia prefiksów automatem wielowzorcowym
+(Aho-Corasick z pakietu pyahocorasick, a bez niego - regex zbudowany z drzewa trie),
+a pełny wzorzec uruchamia tylko od tych pozycji (dopasowanie zakotwiczone).
+
+Wyniki są identyczne z `finditer` wzorca address_regex.
+"""
+
+import re
+import string
+from typing import Dict, List, Tuple
+
+# pyahocorasick - opcjonalna zależność
+try:
+    import ahocorasick
+    _AHOCORASICK_AVAILABLE = True
+except ImportError:
+    ahocorasick = None
+    _AHOCORASICK_AVAILABLE = False
+
+# Prefiksy z address_regex (małymi literami)
+ADDRESS_PREFIXES = ("ul.", "ulica", "al.", "aleja", "aleje", "pl.", "plac",
+                    "os.", "osiedle", "skwer", "rondo")
+
+# Sprowadzenie tekstu do małych liter ASCII bez zmiany długości - tak jak re.IGNORECASE
+# utożsamia też İ/ı z i, ſ z s i znak Kelvina z k
+_FOLD = str.maketrans(
+    string.ascii_uppercase + "\u0130\u0131\u017f\u212a",
+    string.ascii_lowercase + "iisk",
+)
+
+
+def _fold(text: str) -> str:
+    """Małe litery bez zmiany długości tekstu (str.lower jest kilka razy szybsze od translate)."""
+    folded = text.lower()
+    if len(folded) != len(text):
+        # "İ".lower() ma dwa znaki
+        return text.translate(_FOLD)
+    if "\u0131" in folded or "\u017f" in folded:
+        folded = folded.replace("\u0131", "i").replace("\u017f", "s")
+    return folded
+
+
+def _is_word(text: str, i: int) -> bool:
+    """Odpowiednik \\w dla pozycji i (poza tekstem -> False)."""
+    if i < 0 or i >= len(text):
+        return False
+    ch = text[i]
+    return ch.isalnum() or ch == '_'
+
+
+def _trie_regex(words: Tuple[str, ...]) -> str:
+    """Regex w kształcie drzewa trie, np. al(?:\\.|ej(?:a|e))|...|ul(?:\\.|ica)."""
+    trie: Dict = {}
+    for word in words:
+        node = trie
+        for ch in word:
+            node = node.setdefault(ch, {})
+        node[""] = {}
+
+    def render(node: Dict) -> str:
+        branches = [re.escape(ch) + render(child) for ch, child in sorted(node.items()) if ch]
+        optional = "" in node
+        if not branches:
+            return ""
+        if len(branches) == 1 and not optional:
+            return branches[0]
+        body = "(?:" + "|".join(branches) + ")"
+        return body + "?" if optional else body
+
+    return render(trie)
+
+
+class AddressAnchorScanner:
+    """
+    Wyszukuje adresy, uruchamiając wzorzec tylko od wystąpień prefiksów.
+    Zwraca zakresy dopasowań w tej samej kolejności co `finditer`.
+    """
+
+    def __init__(self, prefixes: Tuple[str, ...] = ADDRESS_PREFIXES):
+        self.prefixes = prefixes
+        if _AHOCORASICK_AVAILABLE:
+            self._automaton = ahocorasick.Automaton()
+            for prefix in prefixes:
+                self._automaton.add_word(prefix, len(prefix))
+            self._automaton.make_automaton()
+            self._trie_re = None
+        else:
+            self._automaton = None
+            self._trie_re = re.compile(_trie_regex(prefixes))
+
+    def anchors(self, text: str) -> List[int]:
+        """Posortowane pozycje początków prefiksów stojących na granicy słowa."""
+        folded = _fold(text)
+        if self._automaton is not None:
+            starts = {end - length + 1 for end, length in self._automaton.iter(folded)}
+        else:
+            # Prefiksy w trie nie są swoimi przedrostkami poza wspólnym początkiem,
+            # więc wystarczy najwcześniejsze dopasowanie od każdej pozycji startowej
+            starts = {m.start() for m in self._trie_re.finditer(folded)}
+        return sorted(s for s in starts if not _is_word(text, s - 1))
+
+    def scan(self, text: str, pattern) -> List[Tuple[int, int]]:
+        """Zakresy dopasowań `pattern` (address_regex) zakotwiczonych na prefiksach."""
+        spans = []
+        last_end = 0
+        for start in self.anchors(text):
+            if start < last_end:
+                continue
+            match = pattern.match(text, start)
+            if match:
+                spans.append(match.span())
+                last_end = match.end()
+        return spans
@@ -0,0 +1,175 @@
+"""
+Trwały magazyn analiz Morfeusza - wspólny dla kolejnych uruchomień.
+
+Analizy (wynik morfeusz.analyse) zapisywane są w lokalnej bazie SQLite
+z kluczem (wersja słownika, słowo), więc zmiana wersji Morfeusza lub
+słownika nie zwraca nieaktualnych wyników.
+
+- Analizy zapisywane są jako JSON (encode_analyses), nie pickle - odczyt
+  pliku z dysku nie może wykonać kodu.
+- Przy starcie workera zapisane analizy danej wersji są wczytywane raz,
+  w trybie tylko do odczytu, jako surowe bajty - dekodowane dopiero przy
+  pierwszym użyciu słowa.
+- Nowe analizy trafiają do kolejki, którą w tle opróżnia wątek zapisujący
+  (wsadowo, INSERT OR IGNORE - kilka procesów może pisać do tej samej bazy).
+- close() (wywoływane też przy zakończeniu procesu) dopisuje zaległe wpisy.
+- Magazyn odziedziczony przez fork() (workery puli) dostaje własną kolejkę
+  i wątek zapisujący - wczytana migawka jest współdzielona copy-on-write.
+"""
+
+import json
+import logging
+import os
+import queue
+import sqlite3
+import threading
+from multiprocessing import util
+from typing import Dict, List, Optional
+
+logger = logging.getLogger("analysis_store")
+
+# Maksymalna liczba wpisów zapisywanych w jednej transakcji
+WRITE_BATCH_SIZE = 512
+
+# Czas oczekiwania na blokadę bazy przy zapisie z wielu procesów (sekundy)
+SQLITE_TIMEOUT = 30.0
+
+# Tabela z analizami w JSON (dawna tabela "analyses" z pickle jest pomijana)
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS analyses_json (
+    dict_version TEXT NOT NULL,
+    word TEXT NOT NULL,
+    data BLOB NOT NULL,
+    PRIMARY KEY (dict_version, word)
+)
+"""
+
+
+def encode_analyses(analyses: List) -> bytes:
+    """Wynik morfeusz.analyse jako JSON (UTF-8)."""
+    return json.dumps(analyses, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def decode_analyses(data: bytes) -> List:
+    """
+    Odwrotność encode_analyses - krotki (początek, koniec, (forma, lemat, tag,
+    kwalifikatory, kwalifikatory)) jak z morfeusz.analyse. ValueError dla
+    niepoprawnych danych.
+    """
+    try:
+        return [(start, end, tuple(interp)) for start, end, interp in json.loads(data)]
+    except (TypeError, ValueError) as e:
+        raise ValueError(f"Niepoprawny zapis analiz: {e}") from e
+
+
+def morfeusz_dict_version(morfeusz) -> str:
+    """Wersja biblioteki i identyfikator słownika, np. '1.99.15/pl.sgjp.sgjp-2026.06.01'."""
+    import morfeusz2
+    return f"{morfeusz2.__version__}/{morfeusz.dict_id()}"
+
+
+class MorfeuszAnalysisStore:
+    """Analizy Morfeusza jednej wersji słownika, odczytane z dysku i dopisywane w tle."""
+
+    def __init__(self, path: str, dict_version: str):
+        self.path = path
+        self.dict_version = dict_version
+        self._entries: Dict[str, bytes] = self._load()
+        self._queue: "queue.Queue" = queue.Queue()
+        self._writer: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        # Zaległe wpisy są zapisywane także przy wyjściu procesu (również workera puli)
+        self._finalizer = util.Finalize(self, self.close, exitpriority=10)
+        util.register_after_fork(self, MorfeuszAnalysisStore._after_fork)
+
+    def _after_fork(self) -> None:
+        """W procesie potomnym: wątek zapisujący rodzica nie działa, kolejka zaczyna od zera."""
+        self._queue = queue.Queue()
+        self._writer = None
+        self._lock = threading.Lock()
+        self._finalizer = util.Finalize(self, self.close, exitpriority=10)
+
+    def _load(self) -> Dict[str, bytes]:
+        if not os.path.exists(self.path):
+            return {}
+        try:
+            conn = sqlite3.connect(f"file:{self.path}?mode=ro", uri=True, timeout=SQLITE_TIMEOUT)
+            try:
+                rows = conn.execute(
+                    "SELECT word, data FROM analyses_json WHERE dict_version = ?", (self.dict_version,)
+                ).fetchall()
+            finally:
+                conn.close()
+        except sqlite3.Error as e:
+            logger.warning(f"Nie można wczytać magazynu analiz {self.path}: {e}")
+            return {}
+        return dict(rows)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def words(self) -> List[str]:
+        """Słowa z wczytanej migawki."""
+        return list(self._entries)
+
+    def get(self, word: str) -> Optional[List]:
+        """Zapisana analiza słowa albo None."""
+        data = self._entries.get(word)
+        if data is None:
+            return None
+        try:
+            return decode_analyses(data)
+        except ValueError as e:
+            logger.warning(f"Pomijam uszkodzony wpis magazynu analiz dla {word!r}: {e}")
+            return None
+
+    def put(self, word: str, analyses: List) -> None:
+        """
+        Dodaje nową analizę - zapis na dysk odbywa się w wątku w tle.
+        Wpis nie trafia do wczytanej migawki (pamięć procesu ogranicza cache LRU
+        w LineProcessor); będzie widoczny w kolejnych uruchomieniach.
+        """
+        data = encode_analyses(analyses)
+        with self._lock:
+            if self._writer is None:
+                self._writer = threading.Thread(target=self._write_loop, name="analysis-store-writer", daemon=True)
+                self._writer.start()
+        self._queue.put((word, data))
+
+    def _write_loop(self) -> None:
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=SQLITE_TIMEOUT)
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(_SCHEMA)
+            done = False
+            while not done:
+                batch = [self._queue.get()]
+                while len(batch) < WRITE_BATCH_SIZE:
+                    try:
+                        batch.append(self._queue.get_nowait())
+                    except queue.Empty:
+                        break
+                if None in batch:
+                    done = True
+                    batch = [item for item in batch if item is not None]
+                if batch:
+                    with conn:
+                        conn.executemany(
+                            "INSERT OR IGNORE INTO analyses_json (dict_version, word, data) VALUES (?, ?, ?)",
+                            [(self.dict_version, word, data) for word, data in batch],
+                        )
+        except sqlite3.Error as e:
+            logger.warning(f"Błąd zapisu magazynu analiz {self.path}: {e}")
+        finally:
+            conn.close()
+
+    def close(self) -> None:
+        """Czeka na zapis zaległych wpisów i kończy wątek zapisujący."""
+        with self._lock:
+            writer, self._writer = self._writer, None
+        if writer is not None:
+            self._queue.put(None)
+            writer.join()
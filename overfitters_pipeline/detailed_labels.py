@@ -5,11 +5,22 @@ Zrównoleglone przetwarzanie z wykorzystaniem wszystkich rdzeni CPU.
 
 import re
 import os
+import gc
+import sys
+import time
 import logging
-from rapidfuzz.distance import Levenshtein
+from collections import OrderedDict, deque
+from itertools import islice, zip_longest
+from dataclasses import dataclass
 import morfeusz2
 from functools import lru_cache
-from multiprocessing import Pool, cpu_count, current_process
+from multiprocessing import Barrier, Pool, cpu_count, get_start_method
+
+from .analysis_store import MorfeuszAnalysisStore, morfeusz_dict_version
+from .morph_lexicon import open_lexicon
+from .morph_tags import ADJ, CASE_MASK, SUBST, first_case, gender_of, parse_tag
+from .shared_analysis_table import SharedAnalysisTable
+from .token_alignment import align_tokens
 
 # ================= LOGOWANIE =================
 logger = logging.getLogger("detailed_labels")
@@ -32,6 +43,35 @@ PRZYPADKI = {
 # Regex do czyszczenia tokenów
 CLEANUP_RE = re.compile(r'[.,;:(){}\[\]\n]+')
 
+# Poniżej tylu linii przetwarzanie jest sekwencyjne (start puli się nie opłaca)
+MIN_PARALLEL_LINES = 10
+
+# Jednostka pracy workera: ciągły zakres linii (górny limit liczby linii)
+MAX_CHUNK_LINES = 256
+CHUNKS_PER_WORKER = 4
+
+# Trwały magazyn analiz Morfeusza (SQLite) - ścieżka z MORFEUSZ_ANALYSIS_STORE, brak = wyłączony
+ANALYSIS_STORE_PATH = os.environ.get("MORFEUSZ_ANALYSIS_STORE")
+
+# Leksykon form imion, nazwisk i miejscowości (utils/build_morph_lexicon.py) - ścieżka z MORFEUSZ_LEXICON, brak = wyłączony
+MORPH_LEXICON_PATH = os.environ.get("MORFEUSZ_LEXICON")
+
+# Limity cache analiz Morfeusza w jednym procesie (liczba słów i szacowany rozmiar w bajtach)
+CACHE_MAX_ENTRIES = 100_000
+CACHE_MAX_BYTES = 64 * 2 ** 20
+
+# Najwyżej tyle słów z magazynu analiz trafia do cache rodzica przed fork() puli (tryb prefork)
+PREFORK_WARM_WORDS = CACHE_MAX_ENTRIES
+
+# Limit czasu odpowiedzi workerów przy sprawdzaniu stanu puli (sekundy)
+HEALTH_CHECK_TIMEOUT = 10.0
+
+# Wykonawcy Detailed Labels ("auto" = wybór wg skalibrowanego modelu kosztu)
+EXECUTORS = ("sequential", "process", "persistent")
+
+# Liczba linii syntetycznego obciążenia przy kalibracji modelu kosztu
+CALIBRATION_LINES = 400
+
 # ================= FUNKCJE POMOCNICZE =================
 
 def get_num_workers():
@@ -47,28 +87,116 @@ def tokenize_keep_delimiters(text):
     return tokens
 
 
+@lru_cache(maxsize=32)
+def _relevant_tag_re(allowed_labels):
+    """
+    Jeden skompilowany regex wykrywający w linii dowolny tag z allowed_labels
+    (frozenset). None, gdy żadna etykieta nie może wystąpić jako tag.
+    """
+    labels = sorted(label for label in allowed_labels if re.fullmatch(r'[a-zA-Z0-9-]+', label))
+    if not labels:
+        return None
+    return re.compile(r'\[(?:' + '|'.join(map(re.escape, labels)) + r')\]')
+
+
+def _needs_labels(original_line, anonymized_line, tag_re):
+    """Czy linia wymaga tokenizacji i wyrównania (zawiera tag z allowed_labels)."""
+    return (tag_re is not None and original_line.strip() and anonymized_line.strip()
+            and tag_re.search(anonymized_line) is not None)
+
+
+def _passthrough_line(original_line, anonymized_line):
+    """
+    Wynik _process_single_line dla linii bez istotnych tagów - bez tokenizacji,
+    o ile linia nie zawiera samotnych nawiasów (TOKEN_RE ich nie zwraca).
+    Gdy któraś z linii jest pusta, zanonimizowana wraca bez zmian.
+    """
+    if (not original_line.strip() or not anonymized_line.strip()
+            or ('[' not in anonymized_line and ']' not in anonymized_line)):
+        return anonymized_line
+    return "".join(tokenize_keep_delimiters(anonymized_line))
+
+
 def extract_przypadek(tag_string):
     """Wyciąga pierwszy pasujący przypadek z tag_string"""
-    if not tag_string:
-        return None
-    
-    for case_key, case_name in PRZYPADKI.items():
-        if case_key in tag_string:
-            return case_name
-    return None
+    case = first_case(parse_tag(tag_string))
+    return PRZYPADKI[case] if case else None
 
 
 def extract_rodzaj_from_tagparts(tag_parts):
     """Zamapuj symbole z tagów na 'man' / 'woman'"""
     if not tag_parts:
         return None
-    
-    for t in tag_parts:
-        if 'f' in t:
-            return "woman"
-        if any(m in t for m in ('m1', 'm2', 'm3', 'm')):
-            return "man"
-    return None
+    return gender_of(parse_tag(":" + ":".join(tag_parts)))
+
+
+# ================= CACHE ANALIZ =================
+
+def _deep_sizeof(obj):
+    """Przybliżony rozmiar analizy Morfeusza w pamięci (krotki/listy napisów i liczb)."""
+    size = sys.getsizeof(obj)
+    if isinstance(obj, (tuple, list)):
+        size += sum(_deep_sizeof(item) for item in obj)
+    return size
+
+
+class AnalysisLRU:
+    """
+    Ograniczony cache analiz Morfeusza (LRU) z licznikami.
+
+    Przy przekroczeniu limitu liczby słów lub szacowanego rozmiaru usuwane są
+    najdawniej używane wpisy. None jako limit oznacza brak ograniczenia.
+    """
+
+    def __init__(self, max_entries=CACHE_MAX_ENTRIES, max_bytes=CACHE_MAX_BYTES):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()  # słowo -> (analizy, rozmiar)
+        self.resident_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, word):
+        """Analizy słowa albo None (liczone jako trafienie/chybienie)."""
+        entry = self._entries.get(word)
+        if entry is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(word)
+        self.hits += 1
+        return entry[0]
+
+    def put(self, word, analyses):
+        size = _deep_sizeof(word) + _deep_sizeof(analyses)
+        old = self._entries.pop(word, None)
+        if old is not None:
+            self.resident_bytes -= old[1]
+        self._entries[word] = (analyses, size)
+        self.resident_bytes += size
+        while self._entries and (
+            (self.max_entries is not None and len(self._entries) > self.max_entries)
+            or (self.max_bytes is not None and self.resident_bytes > self.max_bytes)
+        ):
+            _, (_, evicted_size) = self._entries.popitem(last=False)
+            self.resident_bytes -= evicted_size
+            self.evictions += 1
+
+    def reset_counters(self):
+        self.hits = self.misses = self.evictions = 0
+
+    def stats(self):
+        """Liczniki cache (do raportu per worker)."""
+        return {
+            "entries": len(self._entries),
+            "resident_bytes": self.resident_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
 
 
 # ================= KLASA PROCESORA (dla multiprocessing) =================
@@ -81,25 +209,84 @@ class LineProcessor:
     
     _morfeusz = None
     _cache = None
+    _store = None
+    _store_path = None
+    _lexicon = None
+    _shared = None  # SharedAnalysisTable puli (ustawiana przez _init_pool_worker)
     
     @classmethod
-    def init_worker(cls):
-        """Inicjalizacja workera - tworzy instancję Morfeusz2 dla procesu."""
+    def init_worker(cls, store_path=None, lexicon_path=MORPH_LEXICON_PATH):
+        """
+        Inicjalizacja workera - tworzy instancję Morfeusz2 dla procesu.
+        store_path: trwały magazyn analiz (wczytywany tylko do odczytu, nowe analizy dopisywane w tle)
+        lexicon_path: skompilowany leksykon form (mmap) sprawdzany przed magazynem i Morfeuszem
+        """
         cls._morfeusz = morfeusz2.Morfeusz()
-        cls._cache = {}
+        cls._cache = AnalysisLRU()
+        if cls._store is not None:
+            cls._store.close()
+        if cls._lexicon is not None:
+            cls._lexicon.close()
+        dict_version = morfeusz_dict_version(cls._morfeusz)
+        cls._store_path = store_path
+        cls._store = MorfeuszAnalysisStore(store_path, dict_version) if store_path else None
+        cls._lexicon = open_lexicon(lexicon_path, dict_version)
     
     @classmethod
     def analyse_with_cache(cls, word):
-        """Cache dla wywołań Morfeusz2"""
+        """Cache dla wywołań Morfeusz2 (pamięć procesu, leksykon, tablica wspólna puli, trwały magazyn, Morfeusz)"""
         if cls._morfeusz is None:
             cls.init_worker()
         
-        if word not in cls._cache:
+        analyses = cls._cache.get(word)
+        if analyses is not None:
+            return analyses
+
+        analyses = cls._lexicon.get(word) if cls._lexicon is not None else None
+        if analyses is None and cls._shared is not None:
+            analyses = cls._shared.get(word)
+            if analyses is None:
+                analyses = cls._analyse_uncached(word)
+                cls._shared.put(word, analyses)
+        elif analyses is None:
+            analyses = cls._analyse_uncached(word)
+        cls._cache.put(word, analyses)
+        return analyses
+
+    @classmethod
+    def _analyse_uncached(cls, word):
+        """Analiza z trwałego magazynu albo z Morfeusza (zapisywana w magazynie)."""
+        analyses = cls._store.get(word) if cls._store is not None else None
+        if analyses is None:
             try:
-                cls._cache[word] = cls._morfeusz.analyse(word)
+                analyses = cls._morfeusz.analyse(word)
             except Exception:
-                cls._cache[word] = []
-        return cls._cache[word]
+                analyses = []
+            else:
+                if cls._store is not None:
+                    cls._store.put(word, analyses)
+        return analyses
+
+    @classmethod
+    def prime(cls, words):
+        """Analizuje słowa z wyprzedzeniem (rozgrzanie cache); zwraca ich liczbę."""
+        count = 0
+        for word in words:
+            cls.analyse_with_cache(word)
+            count += 1
+        return count
+
+    @classmethod
+    def cache_stats(cls):
+        """Liczniki cache analiz tego procesu (pusty słownik przed inicjalizacją)."""
+        if cls._cache is None:
+            return {}
+        stats = cls._cache.stats()
+        if cls._lexicon is not None:
+            stats["lexicon_hits"] = cls._lexicon.hits
+        if cls._shared is not None:
+            stats["shared_hits"] = cls._shared.hits
+        return stats
     
     @classmethod
     def analizuj_slowo_city(cls, tokens):
@@ -114,7 +301,7 @@ class LineProcessor:
                 tags = item[2][2] if isinstance(item[2], tuple) else ""
                 dodatkowe = item[3] if len(item) > 3 else []
                 
-                if "nazwa_geograficzna" in dodatkowe or "subst" in tags:
+                if "nazwa_geograficzna" in dodatkowe or parse_tag(tags) & SUBST:
                     przypadek = extract_przypadek(tags)
                     if przypadek:
                         return kand_full, przypadek
@@ -133,7 +320,7 @@ class LineProcessor:
             else:
                 tags = None
             
-            if tags and "subst" in tags:
+            if tags and parse_tag(tags) & SUBST:
                 przypadek = extract_przypadek(tags)
                 if przypadek:
                     return kand_full, przypadek
@@ -148,6 +335,9 @@ class LineProcessor:
         if not analizy:
             return None, None, None
         
+        # Analiza nieodmienna (wszystkie przypadki) to zwykle żeńskie użycie
+        # nazwy męskiej ("Jan" - subst:sg.pl:nom...voc:f) - tylko gdy nie ma innej
+        fallback = None
         for item in analizy:
             base = None
             tags = None
@@ -163,39 +353,81 @@ class LineProcessor:
             if not base:
                 continue
             
-            tag_parts = []
-            if tags:
-                for part in tags.split(":"):
-                    tag_parts.extend(part.split("."))
-            
-            przypadek = extract_przypadek(tags) if tags else None
-            rodzaj = extract_rodzaj_from_tagparts(tag_parts)
-            
-            if not rodzaj and isinstance(base, str) and base.endswith("a"):
-                rodzaj = "woman"
-            
-            accept = (tags and ("subst" in tags or "adj" in tags)) or bool(dodatkowe)
-            
-            if accept and przypadek:
-                return base, rodzaj, przypadek
+            mask = parse_tag(tags)
+            accept = bool(mask & (SUBST | ADJ)) or bool(dodatkowe)
+            if not (accept and mask & CASE_MASK):
+                continue
+            if mask & CASE_MASK == CASE_MASK:
+                fallback = fallback or (base, mask)
+                continue
+            return cls._labels_of(base, mask)
         
+        if fallback:
+            return cls._labels_of(*fallback)
         return None, None, None
+    
+    @staticmethod
+    def _labels_of(base, mask):
+        """(lemat, rodzaj, przypadek) przyjętej analizy"""
+        rodzaj = gender_of(mask)
+        if not rodzaj and isinstance(base, str) and base.endswith("a"):
+            rodzaj = "woman"
+        return base, rodzaj, PRZYPADKI[first_case(mask)]
 
 
-def _process_single_line(args):
+def _label_slot(label_name, orig_tokens, orig_idx):
     """
-    Przetwarza pojedynczą linię (dla multiprocessing).
-    Args: (original_line, anonymized_line, allowed_labels)
+    Klucz analizy morfologicznej tagu [label_name], którego oryginalny tekst
+    zaczyna się od orig_tokens[orig_idx]: (etykieta, kandydat) - dla city
+    kandydatem jest krotka kolejnych tokenów z wielkiej litery.
     """
-    original_line, anonymized_line, allowed_labels = args
+    if label_name == "city":
+        city_tokens = []
+        for t_idx in range(orig_idx, len(orig_tokens)):
+            t = CLEANUP_RE.sub('', orig_tokens[t_idx])
+            if t and t[0].isupper():
+                city_tokens.append(t)
+            else:
+                break
+        return label_name, tuple(city_tokens)
     
-    if not original_line.strip() or not anonymized_line.strip():
-        return anonymized_line
+    return label_name, CLEANUP_RE.sub('', orig_tokens[orig_idx])
+
+
+def _resolve_slot(slot):
+    """Tag z etykietami morfologicznymi dla klucza z _label_slot."""
+    label_name, kand = slot
+    
+    if label_name == "city":
+        _, przypadek = LineProcessor.analizuj_slowo_city(list(kand))
+        return f"[{label_name}][{przypadek}]" if przypadek else f"[{label_name}]"
+    
+    if label_name == "sex":
+        _, przypadek = LineProcessor.analizuj_slowo_sex([kand])
+        return f"[{label_name}][{przypadek}]" if przypadek else f"[{label_name}]"
+    
+    base, rodzaj, przypadek = LineProcessor.analizuj_slowo(kand, label_name)
     
+    if base and rodzaj and przypadek:
+        return f"[{label_name}][{rodzaj}][{przypadek}]"
+    return f"[{label_name}]"
+
+
+def _detailed_tag(label_name, orig_tokens, orig_idx):
+    """Tag z etykietami morfologicznymi dla tagu [label_name] (oryginał od orig_tokens[orig_idx])."""
+    return _resolve_slot(_label_slot(label_name, orig_tokens, orig_idx))
+
+
+def _line_template(original_line, anonymized_line, allowed_labels):
+    """
+    Wyrównanie linii z tagami: elementy wyniku - napisy oraz sloty
+    (etykieta, kandydat) czekające na analizę morfologiczną (_resolve_slot).
+    """
     orig_tokens = tokenize_keep_delimiters(original_line)
     anon_tokens = tokenize_keep_delimiters(anonymized_line)
     
-    ops = Levenshtein.opcodes(anon_tokens, orig_tokens)
+    # Długie linie: wyrównanie tylko przerw między kotwicami (token_alignment)
+    ops = align_tokens(anon_tokens, orig_tokens)
     output = []
     
     for tag, i1, i2, j1, j2 in ops:
@@ -219,98 +451,898 @@ def _process_single_line(args):
                     output.append(token)
                     continue
                 
-                if label_name == "city":
-                    city_tokens = []
-                    for t_idx in range(orig_idx, len(orig_tokens)):
-                        t = CLEANUP_RE.sub('', orig_tokens[t_idx])
-                        if t and t[0].isupper():
-                            city_tokens.append(t)
-                        else:
-                            break
-                    
-                    _, przypadek = LineProcessor.analizuj_slowo_city(city_tokens)
-                    tag_new = f"[{label_name}][{przypadek}]" if przypadek else f"[{label_name}]"
-                    output.append(tag_new)
-                
-                elif label_name == "sex":
-                    kand = CLEANUP_RE.sub('', orig_tokens[orig_idx])
-                    _, przypadek = LineProcessor.analizuj_slowo_sex([kand])
-                    tag_new = f"[{label_name}][{przypadek}]" if przypadek else f"[{label_name}]"
-                    output.append(tag_new)
-                
-                else:
-                    kand = CLEANUP_RE.sub('', orig_tokens[orig_idx])
-                    base, rodzaj, przypadek = LineProcessor.analizuj_slowo(kand, label_name)
-                    
-                    if base and rodzaj and przypadek:
-                        tag_new = f"[{label_name}][{rodzaj}][{przypadek}]"
-                    else:
-                        tag_new = token
-                    output.append(tag_new)
+                output.append(_label_slot(label_name, orig_tokens, orig_idx))
         
         elif tag == "delete":
             output.extend(anon_chunk)
     
-    return "".join(output)
+    return output
+
+
+def _process_single_line(args):
+    """
+    Przetwarza pojedynczą linię (dla multiprocessing).
+    Args: (original_line, anonymized_line, allowed_labels)
+
+    Szybką ścieżkę (_needs_labels) stosuje wywołujący - linie bez tagów
+    z allowed_labels trafiają tu tylko z zewnętrznych skryptów i dają ten sam
+    wynik co _passthrough_line.
+    """
+    original_line, anonymized_line, allowed_labels = args
+    
+    if not original_line.strip() or not anonymized_line.strip():
+        return anonymized_line
+    
+    template = _line_template(original_line, anonymized_line, allowed_labels)
+    return "".join(item if isinstance(item, str) else _resolve_slot(item) for item in template)
 
 
-def _init_pool_worker():
-    """Inicjalizacja workera w puli procesów."""
-    LineProcessor.init_worker()
+# Etykiety przekazane raz przy starcie workera (zamiast w każdym zadaniu)
+_worker_allowed_labels = None
 
+# Czas inicjalizacji workera (sekundy)
+_worker_startup_time = None
 
-# ================= GŁÓWNA FUNKCJA PRZETWARZANIA =================
+# Bariera puli - odpytanie każdego workera dokładnie raz (DetailedLabelsPool._on_each_worker)
+_worker_barrier = None
 
-def process_text_tokenized(original, anonymized, allowed_labels, num_workers=None):
+
+def _init_pool_worker(allowed_labels=None, store_path=None, inherited=False, shared_table=None, barrier=None):
     """
-    Zrównoleglone przetwarzanie tekstu z użyciem wszystkich rdzeni CPU.
+    Inicjalizacja workera w puli procesów. inherited=True: Morfeusz i cache
+    rozgrzane w rodzicu przed fork() są używane bez ponownego ładowania.
+    shared_table: SharedAnalysisTable wspólna dla workerów puli (None = brak).
+    barrier: multiprocessing.Barrier na wszystkie workery puli.
+    """
+    global _worker_allowed_labels, _worker_startup_time, _worker_barrier
+    start = time.perf_counter()
+    _worker_allowed_labels = allowed_labels
+    _worker_barrier = barrier
+    if inherited and LineProcessor._morfeusz is not None and LineProcessor._store_path == store_path:
+        # Liczniki rozgrzewania w rodzicu nie dotyczą workera
+        LineProcessor._cache.reset_counters()
+    else:
+        LineProcessor.init_worker(store_path)
+    LineProcessor._shared = shared_table
+    _worker_startup_time = time.perf_counter() - start
+
+
+def _process_line_range(unit):
+    """
+    Przetwarza ciągły zakres linii (jednostka pracy workera).
+    Args: (original_lines, anonymized_lines, allowed_labels) - allowed_labels=None
+    oznacza etykiety przekazane przy starcie workera.
+
+    Linie bez zmian wracają jako None - rodzic ma je już w anonymized_lines.
+    """
+    orig_lines, anon_lines, allowed_labels = unit
+    if allowed_labels is None:
+        allowed_labels = _worker_allowed_labels
+    results = []
+    for orig_line, anon_line in zip(orig_lines, anon_lines):
+        result = _process_single_line((orig_line, anon_line, allowed_labels))
+        results.append(None if result == anon_line else result)
+    return results
+
+
+def _template_line_range(unit):
+    """
+    Faza 1 trybu deduplikacji: wyrównanie zakresu linii z tagami, bez analizy
+    morfologicznej. Zwraca szablony linii (_line_template) z połączonymi
+    sąsiednimi napisami.
+    """
+    orig_lines, anon_lines, allowed_labels = unit
+    if allowed_labels is None:
+        allowed_labels = _worker_allowed_labels
+    templates = []
+    for orig_line, anon_line in zip(orig_lines, anon_lines):
+        template = []
+        text = []
+        for item in _line_template(orig_line, anon_line, allowed_labels):
+            if isinstance(item, str):
+                text.append(item)
+                continue
+            if text:
+                template.append("".join(text))
+                text = []
+            template.append(item)
+        if text:
+            template.append("".join(text))
+        templates.append(template)
+    return templates
+
+
+def _resolve_slots(slots):
+    """Faza 2 trybu deduplikacji: tagi dla listy unikalnych slotów."""
+    return [_resolve_slot(slot) for slot in slots]
+
+
+def _iter_unit_results(units, results):
+    """Linie wyniku z jednostek pracy (None = linia zanonimizowana bez zmian)."""
+    for (_, anon_lines, _), lines in zip(units, results):
+        for anon_line, line in zip(anon_lines, lines):
+            yield anon_line if line is None else line
+
+
+def _merge_skipped(orig_lines, anon_lines, todo, results):
+    """
+    Linie wyniku w kolejności dokumentu: linie z listy `todo` z wyników workerów,
+    pozostałe (pominięte przez szybką ścieżkę) - bez zmian, w procesie głównym.
+    """
+    todo = iter(todo)
+    next_todo = next(todo, None)
+    for idx, anon_line in enumerate(anon_lines):
+        if idx == next_todo:
+            yield next(results)
+            next_todo = next(todo, None)
+        else:
+            yield _passthrough_line(orig_lines[idx], anon_line)
+
+
+def _worker_status(_):
+    """Stan workera: (pid, liczba słów w cache Morfeusza)."""
+    return os.getpid(), len(LineProcessor._cache or ())
+
+
+def _worker_startup(_):
+    """Czas inicjalizacji workera: (pid, sekundy)."""
+    return os.getpid(), _worker_startup_time
+
+
+def _echo_line_range(unit):
+    """Zadanie kalibracji: linie wracają bez przetwarzania - sam koszt przesyłania."""
+    return unit[1]
+
+
+def _worker_cache_stats(_):
+    """Liczniki cache analiz workera: (pid, statystyki)."""
+    return os.getpid(), LineProcessor.cache_stats()
+
+
+def _on_each_worker(task):
+    """
+    Zadanie odpytania (func, timeout): worker czeka na barierze, aż zadanie
+    odbiorą wszystkie workery puli - żaden nie weźmie drugiego, więc każdy
+    odpowiada dokładnie raz. Zawieszony lub martwy worker łamie barierę.
+    """
+    func, timeout = task
+    _worker_barrier.wait(timeout)
+    return func(None)
+
+
+# ================= TRWAŁA PULA PROCESÓW =================
+
+class DetailedLabelsPool:
+    """
+    Długowieczna pula procesów dla Detailed Labels.
+
+    Workery startują raz (każdy z własną instancją Morfeusz2) i zachowują
+    LineProcessor._cache między kolejnymi wywołaniami process_text_tokenized,
+    więc koszt startu nie obciąża każdego dokumentu. Pula jest tworzona
+    leniwie przy pierwszym użyciu; close() kończy workery.
+
+    prefork=True: Morfeusz jest tworzony, a cache rozgrzewany (warm_words,
+    domyślnie słowa z magazynu analiz) w procesie głównym przed fork() -
+    workery dziedziczą je copy-on-write zamiast ładować słowniki osobno.
+    Wymaga metody startu "fork"; przy innej workery inicjalizują się same.
+
+    shared_table=True: analizy spoza leksykonu trafiają też do tablicy we
+    wspólnej pamięci (SharedAnalysisTable), więc chybienie jednego workera
+    nie powtarza się w pozostałych. Tablica żyje tyle, co workery.
+    """
+
+    def __init__(self, num_workers=None, allowed_labels=KEEP_LABELS, store_path=ANALYSIS_STORE_PATH,
+                 prefork=False, warm_words=None, shared_table=False):
+        self.num_workers = num_workers or get_num_workers()
+        # Etykiety wysyłane workerom raz, przy starcie
+        self.allowed_labels = frozenset(allowed_labels)
+        self.store_path = store_path
+        self.prefork = prefork
+        self.warm_words = warm_words
+        self.shared_table = shared_table
+        self._table = None
+        self._barrier = None
+        self._pool = None
+
+    @property
+    def running(self):
+        return self._pool is not None
+
+    def start(self):
+        """Uruchamia workery (jeśli jeszcze nie działają)."""
+        if self._pool is None:
+            inherited = self.prefork and get_start_method() == "fork"
+            if inherited:
+                self._warm_parent()
+            if self.shared_table:
+                self._table = SharedAnalysisTable()
+            self._barrier = Barrier(self.num_workers)
+            if inherited:
+                # Obiekty sprzed fork() poza GC workerów - jego przebiegi nie kopiują stron
+                # współdzielonych; w procesie głównym tylko na czas tworzenia workerów
+                gc.freeze()
+            try:
+                self._pool = Pool(processes=self.num_workers, initializer=_init_pool_worker,
+                                  initargs=(self.allowed_labels, self.store_path, inherited, self._table,
+                                            self._barrier))
+            finally:
+                if inherited:
+                    gc.unfreeze()
+        return self
+
+    def _warm_parent(self):
+        """Morfeusz i rozgrzany cache w procesie głównym - do odziedziczenia przez workery."""
+        if LineProcessor._morfeusz is None or LineProcessor._store_path != self.store_path:
+            LineProcessor.init_worker(self.store_path)
+        words = self.warm_words
+        if words is None:
+            words = LineProcessor._store.words() if LineProcessor._store is not None else ()
+        LineProcessor.prime(islice(words, PREFORK_WARM_WORDS))
+
+    def map(self, func, iterable, chunksize=None):
+        return self.start()._pool.map(func, iterable, chunksize)
+
+    def imap(self, func, iterable, chunksize=1):
+        return self.start()._pool.imap(func, iterable, chunksize)
+
+    def apply_async(self, func, args=()):
+        return self.start()._pool.apply_async(func, args)
+
+    def _on_each_worker(self, func, timeout):
+        """
+        Wyniki (pid, wartość) func z każdego workera - po jednym z różnych
+        procesów - albo None, gdy pula nie działa lub któryś worker nie
+        odpowiedział w czasie `timeout`.
+        """
+        if self._pool is None:
+            return None
+        if self._barrier.broken:
+            self._barrier.reset()
+        try:
+            results = self._pool.map_async(_on_each_worker, [(func, timeout)] * self.num_workers,
+                                           chunksize=1).get(timeout)
+        except Exception as e:
+            logger.warning(f"Pula Detailed Labels nie odpowiada: {e!r}")
+            return None
+        if len({pid for pid, _ in results}) != self.num_workers:
+            logger.warning("Pula Detailed Labels: odpowiedziała tylko część workerów")
+            return None
+        return results
+
+    def status(self, timeout=HEALTH_CHECK_TIMEOUT):
+        """
+        Odpytuje każdy worker; zwraca listę (pid, rozmiar cache) lub None, gdy
+        pula nie działa albo któryś worker nie odpowiedział w czasie `timeout`.
+        """
+        return self._on_each_worker(_worker_status, timeout)
+
+    def cache_stats(self, timeout=HEALTH_CHECK_TIMEOUT):
+        """
+        Statystyki cache analiz workerów: {pid: {entries, resident_bytes, hits,
+        misses, evictions[, lexicon_hits, shared_hits]}} (wszystkie workery; pusty
+        słownik, gdy pula nie działa lub nie odpowiada).
+        """
+        return dict(self._on_each_worker(_worker_cache_stats, timeout) or ())
+
+    def startup_times(self, timeout=HEALTH_CHECK_TIMEOUT):
+        """Czasy inicjalizacji workerów: {pid: sekundy} (wszystkie workery; pusty słownik jak w cache_stats)."""
+        return dict(self._on_each_worker(_worker_startup, timeout) or ())
+
+    def is_healthy(self, timeout=HEALTH_CHECK_TIMEOUT):
+        return self.status(timeout) is not None
+
+    def ensure_healthy(self, timeout=HEALTH_CHECK_TIMEOUT):
+        """Sprawdza stan puli i w razie awarii uruchamia ją od nowa."""
+        if self._pool is not None and not self.is_healthy(timeout):
+            self.terminate()
+        return self.start()
+
+    def shared_stats(self):
+        """Wypełnienie tablicy wspólnej: {entries, arena_bytes, ...} (pusty słownik bez tablicy)."""
+        return self._table.stats() if self._table is not None else {}
+
+    def _close_table(self):
+        if self._table is not None:
+            self._table.close()
+            self._table = None
+
+    def close(self):
+        """Czyste zamknięcie - workery kończą bieżące zadania."""
+        if self._pool is not None:
+            self._pool.close()
+            self._pool.join()
+            self._pool = None
+        self._close_table()
+
+    def terminate(self):
+        """Natychmiastowe zatrzymanie workerów."""
+        if self._pool is not None:
+            self._pool.terminate()
+            self._pool.join()
+            self._pool = None
+        self._close_table()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+# ================= WYKONAWCY I MODEL KOSZTU =================
+
+class SequentialExecutor:
+    """Jednostki pracy wykonywane w bieżącym procesie, po kolei."""
     
-    Args:
-        original: Oryginalny tekst
-        anonymized: Zanonimizowany tekst
-        allowed_labels: Zbiór etykiet do przetworzenia
-        num_workers: Liczba workerów (domyślnie = liczba rdzeni CPU)
+    name = "sequential"
     
-    Returns:
-        Przetworzony tekst z etykietami morfologicznymi
+    def __init__(self, store_path=ANALYSIS_STORE_PATH):
+        self.store_path = store_path
+        self.num_workers = 1
+    
+    def unit_labels(self, allowed_labels):
+        """Etykiety dołączane do jednostek pracy (None = przekazane workerom przy starcie)."""
+        return allowed_labels
+    
+    def imap(self, func, units):
+        return map(func, units)
+    
+    def submit(self, func, unit):
+        """Zleca jedną jednostkę; zwraca funkcję oczekującą na jej wynik."""
+        result = func(unit)
+        return lambda: result
+    
+    def __enter__(self):
+        if LineProcessor._morfeusz is None or LineProcessor._store_path != self.store_path:
+            LineProcessor.init_worker(self.store_path)
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        pass
+
+
+class ProcessExecutor:
+    """Nowa pula procesów na czas jednego wywołania (koszt startu przy każdym użyciu)."""
+    
+    name = "process"
+    
+    def __init__(self, num_workers, allowed_labels, store_path=ANALYSIS_STORE_PATH):
+        self.num_workers = num_workers
+        self.allowed_labels = frozenset(allowed_labels)
+        self.store_path = store_path
+        self._pool = None
+    
+    def unit_labels(self, allowed_labels):
+        return None
+    
+    def imap(self, func, units):
+        return self._pool.imap(func, units)
+    
+    def submit(self, func, unit):
+        return self._pool.apply_async(func, (unit,)).get
+    
+    def __enter__(self):
+        self._pool = Pool(processes=self.num_workers, initializer=_init_pool_worker,
+                          initargs=(self.allowed_labels, self.store_path))
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        self._pool.terminate()
+        self._pool.join()
+        self._pool = None
+
+
+class PersistentExecutor:
+    """Trwała pula DetailedLabelsPool (start tylko przy pierwszym użyciu)."""
+    
+    name = "persistent"
+    
+    def __init__(self, pool):
+        self.pool = pool
+        self.num_workers = pool.num_workers
+    
+    def unit_labels(self, allowed_labels):
+        return None if frozenset(allowed_labels) == self.pool.allowed_labels else allowed_labels
+    
+    def imap(self, func, units):
+        return self.pool.imap(func, units)
+    
+    def submit(self, func, unit):
+        return self.pool.apply_async(func, (unit,)).get
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        pass
+
+
+def make_executor(name, num_workers=None, allowed_labels=KEEP_LABELS, store_path=ANALYSIS_STORE_PATH, pool=None):
+    """Wykonawca o podanej nazwie (jedna z EXECUTORS)."""
+    if num_workers is None:
+        num_workers = get_num_workers()
+    if name == "sequential":
+        return SequentialExecutor(store_path)
+    if name == "process":
+        return ProcessExecutor(num_workers, allowed_labels, store_path)
+    if name == "persistent":
+        if pool is None:
+            raise ValueError("Wykonawca 'persistent' wymaga puli DetailedLabelsPool")
+        return PersistentExecutor(pool)
+    raise ValueError(f"Nieznany wykonawca: {name} (dostępne: {', '.join(EXECUTORS)}, auto)")
+
+
+@dataclass
+class ExecutorCostModel:
+    """
+    Model kosztu wykonawców, skalibrowany na syntetycznym obciążeniu
+    (calibrate_executors). Obciążenie mierzone jest w znakach linii z tagami
+    (oryginał + zanonimizowana).
+    """
+    char_cost: float          # s na znak - przetwarzanie w jednym wątku
+    process_startup: float    # s - start puli procesów z inicjalizacją Morfeusza
+    ipc_char_cost: float      # s na znak - przesyłanie do workerów i z powrotem
+    cores: int
+    
+    def predict(self, name, chars, num_units, num_workers, pool_running=False):
+        """Przewidywany czas (s) wykonawcy `name` dla obciążenia `chars` w `num_units` jednostkach."""
+        compute = self.char_cost * chars
+        if name == "sequential":
+            return compute
+        parallel = max(1, min(num_workers, num_units, self.cores))
+        predicted = compute / parallel + self.ipc_char_cost * chars
+        if name == "process" or not pool_running:
+            predicted += self.process_startup
+        return predicted
+
+
+# Modele kosztu skalibrowane w tym procesie (klucz: liczba workerów)
+_cost_models = {}
+
+_CALIBRATION_SAMPLE = (
+    ("Jan Kowalski mieszka w Krakowie i pracuje jako nauczyciel w szkole.",
+     "[name] [surname] mieszka w [city] i pracuje jako [job-title] w szkole."),
+    ("Wczoraj Anna Nowak pojechała do Gdańska, tel. 600 500 400.",
+     "Wczoraj [name] [surname] pojechała do [city], tel. [phone]."),
+    ("Pani Maria Wiśniewska napisała z Poznania, adres e-mail maria@example.com.",
+     "Pani [name] [surname] napisała z [city], adres e-mail [email]."),
+    ("Brat Piotra Zielińskiego studiuje w Warszawie.",
+     "[relative] [name] [surname] studiuje w [city]."),
+)
+
+
+def _calibration_lines(num_lines):
+    """Syntetyczne linie z tagami o różnej długości (1-8 zdań)."""
+    orig_lines = []
+    anon_lines = []
+    for i in range(num_lines):
+        orig, anon = _CALIBRATION_SAMPLE[i % len(_CALIBRATION_SAMPLE)]
+        repeat = 1 + i % 8
+        orig_lines.append(" ".join([orig] * repeat))
+        anon_lines.append(" ".join([anon] * repeat))
+    return orig_lines, anon_lines
+
+
+def _run_units(executor, orig_lines, anon_lines):
+    """Czas przetworzenia linii przez działającego wykonawcę."""
+    units = list(_line_ranges(orig_lines, anon_lines, executor.unit_labels(KEEP_LABELS), executor.num_workers))
+    start = time.perf_counter()
+    for _ in executor.imap(_process_line_range, units):
+        pass
+    return time.perf_counter() - start
+
+
+def calibrate_executors(num_workers=None, store_path=ANALYSIS_STORE_PATH, num_lines=CALIBRATION_LINES):
+    """
+    Kalibruje model kosztu krótkim benchmarkiem (raz na proces i liczbę workerów):
+    czas sekwencyjny oraz start i narzut nowej puli procesów.
     """
-    # Określ liczbę workerów
     if num_workers is None:
         num_workers = get_num_workers()
+    model = _cost_models.get(num_workers)
+    if model is not None:
+        return model
+    
+    orig_lines, anon_lines = _calibration_lines(num_lines)
+    chars = sum(map(len, orig_lines)) + sum(map(len, anon_lines))
+    
+    with SequentialExecutor(store_path) as executor:
+        _run_units(executor, orig_lines, anon_lines)  # rozgrzanie cache analiz
+        t_sequential = _run_units(executor, orig_lines, anon_lines)
+    
+    start = time.perf_counter()
+    with ProcessExecutor(num_workers, KEEP_LABELS, store_path) as executor:
+        executor._pool.map(_worker_status, range(num_workers), chunksize=1)
+        t_startup = time.perf_counter() - start
+        _run_units(executor, orig_lines, anon_lines)  # rozgrzanie cache workerów
+        t_process = _run_units(executor, orig_lines, anon_lines)
+    
+    cores = cpu_count() or 1
+    num_units = len(list(_line_ranges(orig_lines, anon_lines, None, num_workers)))
+    parallel = max(1, min(num_workers, num_units, cores))
+    model = ExecutorCostModel(
+        char_cost=t_sequential / chars,
+        process_startup=t_startup,
+        ipc_char_cost=max(0.0, t_process - t_sequential / parallel) / chars,
+        cores=cores,
+    )
+    _cost_models[num_workers] = model
+    logger.info(f"Skalibrowany model kosztu Detailed Labels ({num_workers} workerów): {model}")
+    return model
+
+
+def calibrate_pool(pool, store_path=ANALYSIS_STORE_PATH, num_lines=CALIBRATION_LINES):
+    """
+    Model kosztu dla trwałej puli (raz na proces i liczbę jej workerów), bez
+    tworzenia drugiej puli: czas sekwencyjny w bieżącym procesie, narzut IPC
+    z przesłania tych samych jednostek przez pulę i z powrotem bez
+    przetwarzania (_echo_line_range), start - najdłuższa inicjalizacja workera.
+    """
+    key = ("persistent", pool.num_workers)
+    model = _cost_models.get(key)
+    if model is not None:
+        return model
     
-    # Podziel na linie
+    orig_lines, anon_lines = _calibration_lines(num_lines)
+    chars = sum(map(len, orig_lines)) + sum(map(len, anon_lines))
+    
+    with SequentialExecutor(store_path) as executor:
+        _run_units(executor, orig_lines, anon_lines)  # rozgrzanie cache analiz
+        t_sequential = _run_units(executor, orig_lines, anon_lines)
+    
+    units = list(_line_ranges(orig_lines, anon_lines, None, pool.num_workers))
+    pool.map(_echo_line_range, units, chunksize=1)  # rozgrzanie (start leniwej puli)
+    start = time.perf_counter()
+    pool.map(_echo_line_range, units, chunksize=1)
+    t_ipc = time.perf_counter() - start
+    
+    model = ExecutorCostModel(
+        char_cost=t_sequential / chars,
+        process_startup=max(pool.startup_times().values(), default=0.0),
+        ipc_char_cost=t_ipc / chars,
+        cores=cpu_count() or 1,
+    )
+    _cost_models[key] = model
+    logger.info(f"Skalibrowany model kosztu Detailed Labels (trwała pula, {pool.num_workers} workerów): {model}")
+    return model
+
+
+def choose_executor(model, chars, num_lines, num_workers, pool=None):
+    """
+    Najszybszy wykonawca wg modelu kosztu: (nazwa, {nazwa: przewidywany czas}).
+    "persistent" tylko, gdy podano pulę DetailedLabelsPool.
+    """
+    candidates = ["sequential"]
+    if num_workers > 1:
+        candidates.append("process")
+    if pool is not None:
+        candidates.append("persistent")
+    predictions = {}
+    for name in candidates:
+        workers = pool.num_workers if name == "persistent" else num_workers
+        num_units = -(-num_lines // _chunk_size(num_lines, workers)) if num_lines else 0
+        predictions[name] = model.predict(name, chars, num_units, workers,
+                                          pool_running=pool is not None and pool.running)
+    return min(predictions, key=predictions.get), predictions
+
+
+def _select_executor(executor, todo_orig, todo_anon, allowed_labels, num_workers, pool, store_path, stats):
+    """
+    Wykonawca dla linii z tagami: None - dotychczasowa reguła (trwała pula, jeśli
+    podana; sekwencyjnie dla małej liczby linii), "auto" - model kosztu,
+    nazwa z EXECUTORS - wprost. Przy wyborze jawnym ("auto" lub nazwa) decyzja
+    i prognoza trafiają do `stats`.
+
+    "auto" z trwałą pulą kalibruje model na niej (calibrate_pool) - wybór
+    między sekwencyjnym a pulą, bez uruchamiania drugiej puli.
+    """
+    predicted = None
+    if executor is None:
+        if pool is not None:
+            name = "persistent"
+        elif len(todo_orig) < MIN_PARALLEL_LINES or num_workers == 1:
+            name = "sequential"
+        else:
+            name = "process"
+    elif executor == "auto":
+        if pool is not None:
+            model = calibrate_pool(pool, store_path)
+        else:
+            model = calibrate_executors(num_workers, store_path)
+        chars = sum(map(len, todo_orig)) + sum(map(len, todo_anon))
+        name, predictions = choose_executor(model, chars, len(todo_orig), num_workers, pool)
+        predicted = predictions[name]
+        logger.info(f"Wykonawca Detailed Labels: {name} (prognozy: {predictions})")
+    else:
+        name = executor
+    if stats is not None and executor is not None:
+        stats["executor"] = name
+        stats["predicted"] = predicted
+    return make_executor(name, num_workers, allowed_labels, store_path, pool)
+
+
+# ================= GŁÓWNA FUNKCJA PRZETWARZANIA =================
+
+def _aligned_lines(original, anonymized):
+    """Linie obu tekstów, wyrównane pustymi liniami do tej samej liczby."""
     orig_lines = original.split('\n')
     anon_lines = anonymized.split('\n')
     
-    # Wyrównaj długość list
     max_lines = max(len(orig_lines), len(anon_lines))
-    while len(orig_lines) < max_lines:
-        orig_lines.append('')
-    while len(anon_lines) < max_lines:
-        anon_lines.append('')
+    orig_lines.extend([''] * (max_lines - len(orig_lines)))
+    anon_lines.extend([''] * (max_lines - len(anon_lines)))
+    return orig_lines, anon_lines
+
+
+def _chunk_size(num_items, num_workers):
+    """Rozmiar jednostki pracy: kilka na workera, najwyżej MAX_CHUNK_LINES elementów."""
+    return max(1, min(MAX_CHUNK_LINES, -(-num_items // (num_workers * CHUNKS_PER_WORKER))))
+
+
+def _line_ranges(orig_lines, anon_lines, allowed_labels, num_workers):
+    """Jednostki pracy: ciągłe zakresy linii, kilka na workera (najwyżej MAX_CHUNK_LINES linii)."""
+    num_lines = len(anon_lines)
+    chunk = _chunk_size(num_lines, num_workers)
+    for start in range(0, num_lines, chunk):
+        yield orig_lines[start:start + chunk], anon_lines[start:start + chunk], allowed_labels
+
+
+def iter_text_tokenized(original, anonymized, allowed_labels, num_workers=None, pool=None,
+                        store_path=ANALYSIS_STORE_PATH, stats=None, executor=None):
+    """
+    Strumieniowa wersja process_text_tokenized: zwraca przetworzone linie
+    po kolei, gdy tylko wróci zakres, w którym się znajdują (imap) -
+    wynik można zapisywać na bieżąco.
+
+    Linie bez tagu z allowed_labels (np. tylko [phone]/[email] albo bez tagów)
+    są rozpoznawane jednym regexem jeszcze przed tokenizacją i nie trafiają do
+    workerów. Gdy podano słownik `stats`, trafia do niego liczba linii
+    ("lines") i pominiętych przez szybką ścieżkę ("skipped"), a przy jawnie
+    podanym `executor` także wybrany wykonawca ("executor"), prognoza czasu
+    ("predicted", tylko dla "auto") i czas przetwarzania linii z tagami ("elapsed").
+
+    Workery dostają ciągłe zakresy linii jako jedną jednostkę pracy, a zbiór
+    etykiet tylko raz - przy starcie (w jednostce tylko, gdy różni się od
+    etykiet, z którymi wystartowała trwała pula). store_path wskazuje trwały
+    magazyn analiz Morfeusza (pula DetailedLabelsPool ma własny).
+    """
+    if num_workers is None:
+        num_workers = get_num_workers()
     
+    orig_lines, anon_lines = _aligned_lines(original, anonymized)
     num_lines = len(anon_lines)
     
-    # Dla małej liczby linii użyj przetwarzania sekwencyjnego
-    if num_lines < 10 or num_workers == 1:
-        LineProcessor.init_worker()
-        results = []
+    # Szybka ścieżka: do przetworzenia tylko linie z istotnymi tagami
+    tag_re = _relevant_tag_re(frozenset(allowed_labels))
+    todo = [idx for idx in range(num_lines) if _needs_labels(orig_lines[idx], anon_lines[idx], tag_re)]
+    if stats is not None:
+        stats["lines"] = num_lines
+        stats["skipped"] = num_lines - len(todo)
+    
+    if not todo:
         for orig_line, anon_line in zip(orig_lines, anon_lines):
-            result = _process_single_line((orig_line, anon_line, allowed_labels))
-            results.append(result)
-        return '\n'.join(results)
+            yield _passthrough_line(orig_line, anon_line)
+        return
     
-    # Przygotuj argumenty dla workerów
-    args_list = [
-        (orig_lines[i], anon_lines[i], allowed_labels)
-        for i in range(num_lines)
-    ]
+    todo_orig = [orig_lines[idx] for idx in todo]
+    todo_anon = [anon_lines[idx] for idx in todo]
+    chosen = _select_executor(executor, todo_orig, todo_anon, allowed_labels, num_workers, pool, store_path, stats)
+    start = time.perf_counter()
+    with chosen:
+        units = list(_line_ranges(todo_orig, todo_anon, chosen.unit_labels(allowed_labels), chosen.num_workers))
+        results = _iter_unit_results(units, chosen.imap(_process_line_range, units))
+        yield from _merge_skipped(orig_lines, anon_lines, todo, results)
+    if stats is not None and executor is not None:
+        stats["elapsed"] = time.perf_counter() - start
+
+
+def iter_lines_tokenized(orig_lines, anon_lines, allowed_labels, num_workers=None, pool=None,
+                         store_path=ANALYSIS_STORE_PATH, stats=None, executor=None,
+                         chunk_lines=MAX_CHUNK_LINES, window=None):
+    """
+    Detailed Labels dla par linii z iteratorów (np. otwartych plików) - bez
+    wczytywania całych tekstów. Zwraca przetworzone linie po kolei (bez znaku
+    nowej linii); krótszy iterator jest uzupełniany pustymi liniami. Dla plików
+    zakończonych znakiem nowej linii zapis każdej linii z '\n' daje ten sam
+    plik co wynik process_text_tokenized.
+
+    Wejście czytane jest paczkami po chunk_lines linii; linie z tagami z paczki
+    są jedną jednostką pracy. Workery wyprzedzają odbiorcę najwyżej o `window`
+    jednostek (domyślnie CHUNKS_PER_WORKER na workera), więc w pamięci jest
+    najwyżej window * chunk_lines linii - także dla plików większych niż RAM.
+
+    executor: nazwa z EXECUTORS; None - trwała pula, jeśli podana, sekwencyjnie
+    dla jednego workera, w pozostałych przypadkach nowa pula procesów. "auto"
+    działa jak None (model kosztu wymaga rozmiaru wejścia, nieznanego z góry).
+    stats: jak w iter_text_tokenized ("lines", "skipped").
+    """
+    if num_workers is None:
+        num_workers = get_num_workers()
+    if executor in (None, "auto"):
+        if pool is not None:
+            executor = "persistent"
+        else:
+            executor = "sequential" if num_workers == 1 else "process"
+    chosen = make_executor(executor, num_workers, allowed_labels, store_path, pool)
+    if window is None:
+        window = chosen.num_workers * CHUNKS_PER_WORKER
+    
+    tag_re = _relevant_tag_re(frozenset(allowed_labels))
+    if stats is not None:
+        stats["lines"] = stats["skipped"] = 0
+    
+    def strip_newline(lines):
+        for line in lines:
+            yield line[:-1] if line.endswith('\n') else line
     
-    # Przetwarzanie równoległe
-    with Pool(processes=num_workers, initializer=_init_pool_worker) as pool:
-        results = pool.map(_process_single_line, args_list)
+    pairs = zip_longest(strip_newline(orig_lines), strip_newline(anon_lines), fillvalue='')
+    pending = deque()  # (linie paczki: oryginalne, zanonimizowane; indeksy linii z tagami, oczekiwanie na wynik)
     
-    return '\n'.join(results)
+    def finish_oldest():
+        batch_orig, batch_anon, todo, result = pending.popleft()
+        lines = result() if result is not None else []
+        results = (batch_anon[idx] if line is None else line for idx, line in zip(todo, lines))
+        return _merge_skipped(batch_orig, batch_anon, todo, results)
+    
+    with chosen:
+        unit_labels = chosen.unit_labels(allowed_labels)
+        while True:
+            batch = list(islice(pairs, chunk_lines))
+            if not batch:
+                break
+            todo = [idx for idx, (orig, anon) in enumerate(batch) if _needs_labels(orig, anon, tag_re)]
+            batch_orig = [orig for orig, _ in batch]
+            batch_anon = [anon for _, anon in batch]
+            if stats is not None:
+                stats["lines"] += len(batch)
+                stats["skipped"] += len(batch) - len(todo)
+            result = None
+            if todo:
+                unit = [batch_orig[idx] for idx in todo], [batch_anon[idx] for idx in todo], unit_labels
+                result = chosen.submit(_process_line_range, unit)
+            pending.append((batch_orig, batch_anon, todo, result))
+            if len(pending) > window:
+                yield from finish_oldest()
+        while pending:
+            yield from finish_oldest()
+
+
+def label_spans(original, spans, allowed_labels, store_path=ANALYSIS_STORE_PATH, stats=None):
+    """
+    Detailed Labels na podstawie spanów z etapów ML/Regex - bez tokenizacji
+    i wyrównywania tekstów.
+
+    spans: posortowane, rozłączne (start, end, tag) z offsetami w oryginalnym
+    tekście - zanonimizowany tekst to apply_spans(original, spans). Dla tagów
+    z allowed_labels oryginalne słowa brane są wprost z original[start:end].
+    Tekst spoza spanów przepisywany jest bez zmian (także samotne nawiasy,
+    które tokenizacja pomija). stats jak w iter_text_tokenized.
+    """
+    if LineProcessor._morfeusz is None or LineProcessor._store_path != store_path:
+        LineProcessor.init_worker(store_path)
+    
+    parts = []
+    pos = 0
+    line = 0
+    last_labelled_line = -1
+    labelled_lines = 0
+    for start, end, label_name in spans:
+        parts.append(original[pos:start])
+        # Numer linii w tekście wynikowym (znaki nowej linii wewnątrz spanów znikają)
+        line += original.count('\n', pos, start)
+        token = f"[{label_name}]"
+        if label_name in allowed_labels:
+            orig_tokens = tokenize_keep_delimiters(original[start:end])
+            if orig_tokens:
+                token = _detailed_tag(label_name, orig_tokens, 0)
+            if line != last_labelled_line:
+                last_labelled_line = line
+                labelled_lines += 1
+        parts.append(token)
+        pos = end
+    parts.append(original[pos:])
+    result = "".join(parts)
+    
+    if stats is not None:
+        stats["lines"] = result.count('\n') + 1
+        stats["skipped"] = stats["lines"] - labelled_lines
+    return result
+
+
+def _two_phase_lines(map_units, orig_lines, anon_lines, unit_labels, num_workers, stats):
+    """
+    Linie z tagami w dwóch fazach: szablony (wyrównanie), potem jedna analiza
+    na unikalny slot i wypełnienie wszystkich wystąpień z tabeli wyników.
+    map_units(func, jednostki) -> lista wyników (w kolejności jednostek).
+    """
+    units = list(_line_ranges(orig_lines, anon_lines, unit_labels, num_workers))
+    templates = [template for part in map_units(_template_line_range, units) for template in part]
+    
+    occurrences = [item for template in templates for item in template if not isinstance(item, str)]
+    slots = list(dict.fromkeys(occurrences))
+    chunk = _chunk_size(len(slots), num_workers)
+    slot_units = [slots[start:start + chunk] for start in range(0, len(slots), chunk)]
+    table = dict(zip(slots, (tag for part in map_units(_resolve_slots, slot_units) for tag in part)))
+    
+    if stats is not None:
+        stats["tags"] = len(occurrences)
+        stats["unique"] = len(slots)
+    return ["".join(item if isinstance(item, str) else table[item] for item in template)
+            for template in templates]
+
+
+def process_text_dedup(original, anonymized, allowed_labels, num_workers=None, pool=None,
+                       store_path=ANALYSIS_STORE_PATH, stats=None, executor=None):
+    """
+    Detailed Labels z deduplikacją analiz w całym dokumencie (wynik jak
+    process_text_tokenized).
+
+    Faza 1: workery wyrównują linie z tagami i zwracają szablony ze slotami
+    (etykieta, kandydat) zamiast od razu analizować słowa. Faza 2: każdy
+    unikalny slot (słowo, ciąg tokenów miasta) jest analizowany raz,
+    równolegle, a tabela wyników wypełnia wszystkie wystąpienia - to samo
+    nazwisko w 500 liniach to jedna analiza zamiast jednej na worker.
+    stats i executor jak w iter_text_tokenized, dodatkowo "tags" (wystąpienia
+    slotów) i "unique" (wykonane analizy).
+    """
+    if num_workers is None:
+        num_workers = get_num_workers()
+    
+    orig_lines, anon_lines = _aligned_lines(original, anonymized)
+    num_lines = len(anon_lines)
+    tag_re = _relevant_tag_re(frozenset(allowed_labels))
+    todo = [idx for idx in range(num_lines) if _needs_labels(orig_lines[idx], anon_lines[idx], tag_re)]
+    if stats is not None:
+        stats["lines"] = num_lines
+        stats["skipped"] = num_lines - len(todo)
+    todo_orig = [orig_lines[idx] for idx in todo]
+    todo_anon = [anon_lines[idx] for idx in todo]
+    
+    chosen = _select_executor(executor, todo_orig, todo_anon, allowed_labels, num_workers, pool, store_path, stats)
+    start = time.perf_counter()
+    with chosen:
+        lines = _two_phase_lines(lambda func, units: list(chosen.imap(func, units)), todo_orig, todo_anon,
+                                 chosen.unit_labels(allowed_labels), chosen.num_workers, stats)
+    if stats is not None and executor is not None:
+        stats["elapsed"] = time.perf_counter() - start
+    
+    return '\n'.join(_merge_skipped(orig_lines, anon_lines, todo, iter(lines)))
+
+
+def process_text_tokenized(original, anonymized, allowed_labels, num_workers=None, pool=None,
+                           store_path=ANALYSIS_STORE_PATH, stats=None, spans=None, dedup=False, executor=None):
+    """
+    Zrównoleglone przetwarzanie tekstu z użyciem wszystkich rdzeni CPU.
+    
+    Args:
+        original: Oryginalny tekst
+        anonymized: Zanonimizowany tekst
+        allowed_labels: Zbiór etykiet do przetworzenia
+        num_workers: Liczba workerów (domyślnie = liczba rdzeni CPU)
+        pool: Trwała pula DetailedLabelsPool - zamiast tworzenia nowej puli
+            (num_workers jest wtedy ignorowane)
+        store_path: Trwały magazyn analiz Morfeusza (None = tylko cache w pamięci)
+        stats: Opcjonalny słownik - wypełniany liczbą linii i linii pominiętych
+            przez szybką ścieżkę ({"lines": N, "skipped": M})
+        spans: Spany tagów z offsetami w oryginalnym tekście (z etapów ML/Regex) -
+            gdy podane, oryginalne słowa czytane są wprost (label_spans), bez
+            wyrównywania tekstów; anonymized, num_workers i pool są ignorowane
+        dedup: Tryb dwufazowy z jedną analizą na unikalne słowo w całym
+            dokumencie (process_text_dedup)
+        executor: Wykonawca z EXECUTORS albo "auto" (wybór wg skalibrowanego
+            modelu kosztu); None - trwała pula, jeśli podana, sekwencyjnie
+            dla małej liczby linii, w pozostałych przypadkach nowa pula procesów
+    
+    Returns:
+        Przetworzony tekst z etykietami morfologicznymi
+    """
+    if spans is not None:
+        return label_spans(original, spans, allowed_labels, store_path, stats)
+    if dedup:
+        return process_text_dedup(original, anonymized, allowed_labels, num_workers, pool, store_path, stats,
+                                  executor)
+    return '\n'.join(iter_text_tokenized(original, anonymized, allowed_labels, num_workers, pool, store_path, stats,
+                                          executor))
 
 
 # ================= FUNKCJA DLA PIPELINE =================
@@ -328,8 +1360,6 @@ def process_text_tokenized_with_info(original, anonymized, allowed_labels):
 # ================= TESTY =================
 
 if __name__ == "__main__":
-    import time
-    
     print(f"\n🖥️  Dostępne rdzenie CPU: {get_num_workers()}")
     
     # Test
@@ -0,0 +1,256 @@
+"""
+Skaner ciągów cyfr - alternatywny silnik dla encji numerycznych warstwy Regex.
+
+Zamiast uruchamiać osobny (backtrackujący) regex dla PESEL-u, numerów kont
+i czterech wzorców telefonu, skaner w jednym liniowym przejściu znajduje
+"klastry" cyfr (ciągi cyfr połączone separatorami), odrzuca klastry zbyt
+krótkie dla jakiegokolwiek kształtu, a pozostałe klasyfikuje po długości
+i układzie separatorów.
+
+Wyniki są identyczne z `finditer` odpowiednich wzorców z RegexLayer.
+"""
+
+import re
+from typing import Callable, Dict, List, Tuple
+
+# Klaster: ciągi cyfr rozdzielone 1-2 znakami separatora (np. "48) 123-456 789")
+_CLUSTER_RE = re.compile(r"\d+(?:[ .)\-]{1,2}\d+)*")
+_DIGITS_RE = re.compile(r"\d+")
+
+_PHONE_SEPARATORS = " .-"
+
+# Nazwy kształtów (zgodne z RegexLayer.simple_pattern_keys)
+PESEL = "pesel"
+BANK_ACCOUNT_IBAN = "bank_account_iban"
+BANK_ACCOUNT_GROUPED = "bank_account_grouped"
+PHONE_MOBILE_PREFIXED = "phone_mobile_prefixed"
+PHONE_MOBILE = "phone_mobile"
+PHONE_LANDLINE_PREFIXED = "phone_landline_prefixed"
+PHONE_LANDLINE = "phone_landline"
+
+SHAPES = (
+    PESEL,
+    BANK_ACCOUNT_IBAN,
+    BANK_ACCOUNT_GROUPED,
+    PHONE_MOBILE_PREFIXED,
+    PHONE_MOBILE,
+    PHONE_LANDLINE_PREFIXED,
+    PHONE_LANDLINE,
+)
+
+
+# ================= FUNKCJE POMOCNICZE =================
+
+def _is_word(text: str, i: int) -> bool:
+    """Odpowiednik \\w dla pozycji i (poza tekstem -> False)."""
+    if i < 0 or i >= len(text):
+        return False
+    ch = text[i]
+    return ch.isalnum() or ch == '_'
+
+
+def _has_digits(text: str, i: int, count: int) -> bool:
+    """Czy od pozycji i stoi dokładnie `count` cyfr (\\d{count})."""
+    chunk = text[i:i + count]
+    return len(chunk) == count and chunk.isdecimal()
+
+
+def _skip_optional(text: str, i: int, chars: str) -> int:
+    """Odpowiednik [chars]? - przesuwa i o jeden znak, jeśli pasuje."""
+    if i < len(text) and text[i] in chars:
+        return i + 1
+    return i
+
+
+def _match_groups(text: str, i: int, groups: Tuple[int, ...], separators: str, required: bool) -> int:
+    """
+    Dopasowuje grupy cyfr o zadanych długościach rozdzielone separatorem.
+    Zwraca pozycję końca lub -1.
+    """
+    for idx, size in enumerate(groups):
+        if idx:
+            if i < len(text) and text[i] in separators:
+                i += 1
+            elif required:
+                return -1
+        if not _has_digits(text, i, size):
+            return -1
+        i += size
+    return i
+
+
+# ================= DOPASOWANIA KSZTAŁTÓW =================
+# Każda funkcja odpowiada jednemu wzorcowi z RegexLayer i zwraca koniec
+# dopasowania zaczynającego się w `start` albo -1.
+
+def _match_pesel(text: str, start: int) -> int:
+    # \b\d{11}\b
+    if _is_word(text, start - 1) or not _has_digits(text, start, 11):
+        return -1
+    end = start + 11
+    return -1 if _is_word(text, end) else end
+
+
+def _match_bank_account_iban(text: str, start: int) -> int:
+    # \b(?i:PL)[ ]?\d{2}(?:[ ]?\d{4}){6}\b
+    if _is_word(text, start - 1) or text[start:start + 2] not in ("PL", "Pl", "pL", "pl"):
+        return -1
+    i = _skip_optional(text, start + 2, " ")
+    end = _match_groups(text, i, (2, 4, 4, 4, 4, 4, 4), " ", required=False)
+    if end < 0 or _is_word(text, end):
+        return -1
+    return end
+
+
+def _match_bank_account_grouped(text: str, start: int) -> int:
+    # \b\d{4}[ ]\d{4}[ ]\d{4}[ ]\d{4}\b
+    if _is_word(text, start - 1):
+        return -1
+    end = _match_groups(text, start, (4, 4, 4, 4), " ", required=True)
+    if end < 0 or _is_word(text, end):
+        return -1
+    return end
+
+
+def _match_prefixed(text: str, start: int, tail: Tuple[int, ...]) -> int:
+    """
+    (?<!\\w)(?:(?:\\+|00)\\d{1,3}[ .-]?|\\(\\+?\\d{1,3}\\)[ .-]?) + ogon grup cyfr.
+    Kolejność prób (gałęzie, zachłanne \\d{1,3}) jak w silniku `re`.
+    """
+    if _is_word(text, start - 1):
+        return -1
+
+    def match_tail(i: int) -> int:
+        end = _match_groups(text, _skip_optional(text, i, _PHONE_SEPARATORS), tail,
+                            _PHONE_SEPARATORS, required=False)
+        if end < 0 or _is_word(text, end):
+            return -1
+        return end
+
+    # Gałąź 1: +48 / 0048
+    if text.startswith("+", start):
+        i = start + 1
+    elif text.startswith("00", start):
+        i = start + 2
+    else:
+        i = -1
+    if i >= 0:
+        for size in (3, 2, 1):
+            if _has_digits(text, i, size):
+                end = match_tail(i + size)
+                if end >= 0:
+                    return end
+
+    # Gałąź 2: (48) / (+48)
+    if text.startswith("(", start):
+        i = _skip_optional(text, start + 1, "+")
+        for size in (3, 2, 1):
+            if _has_digits(text, i, size) and text.startswith(")", i + size):
+                end = match_tail(i + size + 1)
+                if end >= 0:
+                    return end
+    return -1
+
+
+def _match_phone_mobile_prefixed(text: str, start: int) -> int:
+    return _match_prefixed(text, start, (3, 3, 3))
+
+
+def _match_phone_landline_prefixed(text: str, start: int) -> int:
+    return _match_prefixed(text, start, (2, 3, 2, 2))
+
+
+def _match_phone_mobile(text: str, start: int) -> int:
+    # (?<!\w)\d{3}[ .-]\d{3}[ .-]\d{3}(?!\w)
+    if _is_word(text, start - 1):
+        return -1
+    end = _match_groups(text, start, (3, 3, 3), _PHONE_SEPARATORS, required=True)
+    if end < 0 or _is_word(text, end):
+        return -1
+    return end
+
+
+def _match_phone_landline(text: str, start: int) -> int:
+    # (?<!\w)\(?\d{2}\)?[ .-]\d{3}[ .-]\d{2}[ .-]\d{2}(?!\w)
+    if _is_word(text, start - 1):
+        return -1
+    i = _skip_optional(text, start, "(")
+    if not _has_digits(text, i, 2):
+        return -1
+    i = _skip_optional(text, i + 2, ")")
+    if i >= len(text) or text[i] not in _PHONE_SEPARATORS:
+        return -1
+    end = _match_groups(text, i + 1, (3, 2, 2), _PHONE_SEPARATORS, required=True)
+    if end < 0 or _is_word(text, end):
+        return -1
+    return end
+
+
+# Kształt -> (funkcja dopasowania, minimalna liczba cyfr w klastrze)
+_SHAPE_MATCHERS: Dict[str, Tuple[Callable[[str, int], int], int]] = {
+    BANK_ACCOUNT_IBAN: (_match_bank_account_iban, 26),
+    BANK_ACCOUNT_GROUPED: (_match_bank_account_grouped, 16),
+    PHONE_MOBILE_PREFIXED: (_match_phone_mobile_prefixed, 10),
+    PHONE_MOBILE: (_match_phone_mobile, 9),
+    PHONE_LANDLINE_PREFIXED: (_match_phone_landline_prefixed, 10),
+    PHONE_LANDLINE: (_match_phone_landline, 9),
+}
+
+_MIN_CLUSTER_LENGTH = 9
+
+
+class DigitRunScanner:
+    """
+    Jednoprzebiegowy skaner encji numerycznych (PESEL, telefon, IBAN).
+    Zwraca zakresy dopasowań w tej samej kolejności co `finditer` wzorców regex.
+    """
+
+    def _candidates(self, text: str, runs: List[Tuple[int, int]], shape: str) -> List[int]:
+        """Możliwe początki dopasowań dla danego kształtu (początek ciągu cyfr lub prefiks)."""
+        starts = set()
+        for run_start, _ in runs:
+            if shape == BANK_ACCOUNT_IBAN:
+                # "PL12..." lub "PL 12..."
+                starts.add(run_start - 2)
+                starts.add(run_start - 3)
+                continue
+            starts.add(run_start)
+            if shape in (PHONE_MOBILE_PREFIXED, PHONE_LANDLINE_PREFIXED, PHONE_LANDLINE):
+                # "+48", "(48", "(+48"
+                starts.add(run_start - 1)
+                starts.add(run_start - 2)
+        return sorted(s for s in starts if s >= 0)
+
+    def scan(self, text: str) -> Dict[str, List[Tuple[int, int]]]:
+        """
+        Skanuje tekst i zwraca słownik kształt -> lista (start, end).
+        """
+        spans: Dict[str, List[Tuple[int, int]]] = {shape: [] for shape in SHAPES}
+        last_end = {shape: 0 for shape in SHAPES}
+
+        for cluster in _CLUSTER_RE.finditer(text):
+            c_start, c_end = cluster.span()
+            if c_end - c_start < _MIN_CLUSTER_LENGTH:
+                continue
+
+            runs = [m.span() for m in _DIGITS_RE.finditer(text, c_start, c_end)]
+            digits = sum(end - start for start, end in runs)
+
+            # PESEL: pojedynczy ciąg dokładnie 11 cyfr
+            for run_start, run_end in runs:
+                if run_end - run_start == 11 and _match_pesel(text, run_start) == run_end:
+                    spans[PESEL].append((run_start, run_end))
+
+            # Pozostałe kształty: liczba cyfr w klastrze + układ separatorów
+            for shape, (matcher, min_digits) in _SHAPE_MATCHERS.items():
+                if digits < min_digits:
+                    continue
+                for start in self._candidates(text, runs, shape):
+                    if start < last_end[shape]:
+                        continue
+                    end = matcher(text, start)
+                    if end >= 0:
+                        spans[shape].append((start, end))
+                        last_end[shape] = end
+
+        return spans
@@ -2,6 +2,8 @@
 
 from typing import Dict, List
 
+from .morph_tags import CASE_BITS, FEMININE, MASCULINE, SUBST, parse_tag
+
 # Próba importu morfeusz2 - opcjonalna zależność
 try:
     import morfeusz2 as m2
@@ -37,7 +39,8 @@ class MorfeuszInflector:
             return lemma
 
         target_tag = CASE_MAP.get(target_case, "nom")
-        gender_codes = ['f'] if is_female else ['m1', 'm2', 'm3']
+        case_bit = CASE_BITS[target_tag]
+        gender_bits = FEMININE if is_female else MASCULINE
 
         if debug:
             print(f"\n--- DEBUG FLEXJA ---")
@@ -62,18 +65,13 @@ class MorfeuszInflector:
             if not tag:
                 continue
 
-            # tylko rzeczowniki, imiona i nazwiska
-            is_valid_type = any(prefix in tag for prefix in ['subst', 'imie', 'nazwisko', 'prop'])
+            mask = parse_tag(tag)
+
+            # tylko rzeczowniki (imiona i nazwiska mają tag subst)
+            is_valid_type = bool(mask & SUBST)
 
             # sprawdzenie czy tag zawiera odpowiedni przypadek i płeć
-            def tag_matches(tag_str: str) -> bool:
-                # Sprawdzenie przypadku
-                case_ok = target_tag in tag_str
-                # Sprawdzenie płci
-                gender_ok = any(g in tag_str for g in gender_codes)
-                return case_ok and gender_ok
-
-            is_correct_inflection = tag_matches(tag)
+            is_correct_inflection = bool(mask & case_bit) and bool(mask & gender_bits)
 
             if is_valid_type and debug:
                 print(f"  > FORMA: {form:<12} | POPRAWNY TYP: {is_valid_type} | POPRAWNA FLEKSJA: {is_correct_inflection} | TAG: {tag}")
@@ -0,0 +1,180 @@
+"""
+Skompilowany leksykon morfologiczny - analizy Morfeusza form imion, nazwisk
+i nazw miejscowości, odczytywane przez mmap.
+
+Etykiety z KEEP_LABELS dotyczą w większości tego samego, skończonego zbioru
+form. build_lexicon() rozwija listę lematów we wszystkie formy
+(morfeusz.generate), analizuje każdą formę raz i zapisuje posortowany plik:
+
+    MAGIC | długość wersji (u32) | wersja słownika | liczba form N (u32)
+    | N + 1 przesunięć rekordów (u32) | rekordy: forma UTF-8, \\0, analizy (JSON)
+
+MorphLexicon mapuje plik (mmap, tylko do odczytu - strony współdzielone przez
+workery) i wyszukuje formę binarnie po bajtach UTF-8, bez wczytywania
+całości do pamięci procesu. Zapisane są pełne wyniki morfeusz.analyse
+(lemat, tag, kwalifikatory), więc wynik Detailed Labels jest taki sam jak
+z Morfeuszem. Analizy są w JSON (analysis_store.encode_analyses), nie
+pickle - odczyt pliku nie może wykonać kodu.
+"""
+
+import logging
+import mmap
+import os
+import struct
+from typing import Iterable, List, Optional, Set
+
+from .analysis_store import decode_analyses, encode_analyses, morfeusz_dict_version
+
+logger = logging.getLogger("morph_lexicon")
+
+MAGIC = b"MORFLEX2"
+
+_U32 = struct.Struct("<I")
+
+
+def lemmas_of(morfeusz, words: Iterable[str]) -> Set[str]:
+    """Lematy rzeczownikowe i przymiotnikowe podanych słów (np. odmienionych wartości z danych)."""
+    lemmas = set()
+    for word in words:
+        try:
+            analyses = morfeusz.analyse(word)
+        except Exception:
+            continue
+        for _, _, (_, lemma, tag, _, _) in analyses:
+            if tag.startswith(("subst", "adj")):
+                lemmas.add(lemma.split(":")[0])
+    return lemmas
+
+
+def expand_forms(morfeusz, lemmas: Iterable[str]) -> Set[str]:
+    """Lematy wraz ze wszystkimi formami wygenerowanymi przez Morfeusza."""
+    forms = set()
+    for lemma in lemmas:
+        lemma = lemma.strip()
+        if not lemma:
+            continue
+        forms.add(lemma)
+        try:
+            generated = morfeusz.generate(lemma)
+        except Exception:
+            continue
+        forms.update(item[0] for item in generated)
+    return forms
+
+
+def build_lexicon(path: str, lemmas: Iterable[str], morfeusz=None) -> int:
+    """
+    Buduje leksykon z form podanych lematów i zapisuje go atomowo pod `path`.
+    Zwraca liczbę form.
+    """
+    if morfeusz is None:
+        import morfeusz2
+        morfeusz = morfeusz2.Morfeusz()
+    entries = sorted(
+        (form.encode("utf-8"), encode_analyses(morfeusz.analyse(form)))
+        for form in expand_forms(morfeusz, lemmas)
+    )
+    version = morfeusz_dict_version(morfeusz).encode("utf-8")
+
+    offsets = []
+    pos = 0
+    for key, data in entries:
+        offsets.append(pos)
+        pos += len(key) + 1 + len(data)
+    offsets.append(pos)
+
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(MAGIC)
+        f.write(_U32.pack(len(version)))
+        f.write(version)
+        f.write(_U32.pack(len(entries)))
+        f.write(struct.pack(f"<{len(offsets)}I", *offsets))
+        for key, data in entries:
+            f.write(key)
+            f.write(b"\0")
+            f.write(data)
+    os.replace(tmp_path, path)
+    return len(entries)
+
+
+class MorphLexicon:
+    """Leksykon zbudowany przez build_lexicon() - wyszukiwanie binarne w mmap."""
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        mm = self._mm
+        if mm[:len(MAGIC)] != MAGIC:
+            mm.close()
+            raise ValueError(f"{path} nie jest leksykonem morfologicznym")
+        pos = len(MAGIC)
+        (version_len,) = _U32.unpack_from(mm, pos)
+        pos += _U32.size
+        self.dict_version = mm[pos:pos + version_len].decode("utf-8")
+        pos += version_len
+        (self._count,) = _U32.unpack_from(mm, pos)
+        self._offsets_pos = pos + _U32.size
+        self._data_pos = self._offsets_pos + (self._count + 1) * _U32.size
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    def _record(self, idx: int):
+        """(początek formy, koniec formy, koniec rekordu) w mmap."""
+        start, end = struct.unpack_from("<2I", self._mm, self._offsets_pos + idx * _U32.size)
+        start += self._data_pos
+        return start, self._mm.find(b"\0", start), end + self._data_pos
+
+    def get(self, word: str) -> Optional[List]:
+        """Analizy formy albo None, gdy jej nie ma w leksykonie."""
+        key = word.encode("utf-8")
+        mm = self._mm
+        lo, hi = 0, self._count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            start, key_end, end = self._record(mid)
+            probe = mm[start:key_end]
+            if probe < key:
+                lo = mid + 1
+            elif probe > key:
+                hi = mid
+            else:
+                try:
+                    analyses = decode_analyses(mm[key_end + 1:end])
+                except ValueError as e:
+                    logger.warning(f"Uszkodzony wpis leksykonu {self.path} dla {word!r}: {e}")
+                    break
+                self.hits += 1
+                return analyses
+        self.misses += 1
+        return None
+
+    def close(self) -> None:
+        self._mm.close()
+
+
+def open_lexicon(path: Optional[str], dict_version: str) -> Optional[MorphLexicon]:
+    """
+    Leksykon spod `path` albo None (brak ścieżki lub pliku, uszkodzony plik,
+    inna wersja słownika niż bieżący Morfeusz).
+    """
+    if not path or not os.path.exists(path):
+        return None
+    try:
+        lexicon = MorphLexicon(path)
+    except (OSError, ValueError, struct.error) as e:
+        logger.warning(f"Nie można wczytać leksykonu {path}: {e}")
+        return None
+    if lexicon.dict_version != dict_version:
+        logger.warning(f"Leksykon {path} zbudowany dla {lexicon.dict_version}, bieżący słownik: "
+                       f"{dict_version} - pomijam")
+        lexicon.close()
+        return None
+    return lexicon
@@ -0,0 +1,78 @@
+"""
+Kodek tagów morfosyntaktycznych Morfeusza - wspólny dla detailed_labels
+i morfeusz_inflector.
+
+Tag (np. "subst:sg:nom.acc:m3") jest parsowany raz (cache) do maski bitowej:
+przypadki, rodzaje, liczby i część mowy. Pytania o tag to potem operacje na
+bitach zamiast wyszukiwania podnapisów w całym tagu przy każdej analizie.
+
+Przypadek to - jak w dawnych testach podnapisów - pierwszy (wg CASES) podnapis
+tagu. Rodzaj pochodzi z pól tagu: "m" w "nom" nie jest rodzajem męskim, a "f"
+w "perf" - żeńskim.
+"""
+
+from functools import lru_cache
+
+# Przypadki w kolejności rozstrzygania (jak PRZYPADKI w detailed_labels)
+CASES = ("nom", "gen", "dat", "acc", "inst", "loc", "voc")
+GENDERS = ("m1", "m2", "m3", "f", "n")
+NUMBERS = ("sg", "pl")
+
+# Części mowy tagsetu SGJP/NKJP (nieznana część mowy - brak bitu)
+POS_TAGS = (
+    "subst", "depr", "adj", "adja", "adjp", "adjc", "adv", "num", "numcol", "ppron12", "ppron3",
+    "siebie", "fin", "bedzie", "aglt", "praet", "impt", "imps", "inf", "pcon", "pant", "ger",
+    "pact", "ppas", "winien", "pred", "prep", "conj", "comp", "part", "qub", "interj", "burk",
+    "brev", "frag", "dig", "romandig", "sym", "interp", "ign", "xxx",
+)
+
+CASE_BITS = {case: 1 << i for i, case in enumerate(CASES)}
+GENDER_BITS = {gender: 1 << (len(CASES) + i) for i, gender in enumerate(GENDERS)}
+NUMBER_BITS = {number: 1 << (len(CASES) + len(GENDERS) + i) for i, number in enumerate(NUMBERS)}
+_POS_SHIFT = 16
+POS_BITS = {pos: 1 << (_POS_SHIFT + i) for i, pos in enumerate(POS_TAGS)}
+
+# Starsze oznaczenia rodzaju nijakiego
+GENDER_BITS_ALIASES = {"n1": GENDER_BITS["n"], "n2": GENDER_BITS["n"]}
+
+CASE_MASK = sum(CASE_BITS.values())
+MASCULINE = GENDER_BITS["m1"] | GENDER_BITS["m2"] | GENDER_BITS["m3"]
+FEMININE = GENDER_BITS["f"]
+SUBST = POS_BITS["subst"]
+ADJ = POS_BITS["adj"] | POS_BITS["adja"] | POS_BITS["adjp"] | POS_BITS["adjc"]
+
+_VALUE_BITS = {**GENDER_BITS, **GENDER_BITS_ALIASES, **NUMBER_BITS}
+
+
+@lru_cache(maxsize=8192)
+def parse_tag(tag):
+    """Maska bitowa tagu (0 dla pustego tagu)."""
+    if not tag:
+        return 0
+    pos, *fields = tag.split(":")
+    mask = POS_BITS.get(pos, 0)
+    for case, bit in CASE_BITS.items():
+        if case in tag:
+            mask |= bit
+    for field in fields:
+        for value in field.split("."):
+            mask |= _VALUE_BITS.get(value, 0)
+    return mask
+
+
+def first_case(mask):
+    """Pierwszy (wg CASES) przypadek z maski albo None."""
+    if mask & CASE_MASK:
+        for case in CASES:
+            if mask & CASE_BITS[case]:
+                return case
+    return None
+
+
+def gender_of(mask):
+    """'man' (rodzaj męski, także gdy tag dopuszcza kilka rodzajów), 'woman' albo None."""
+    if mask & MASCULINE:
+        return "man"
+    if mask & FEMININE:
+        return "woman"
+    return None
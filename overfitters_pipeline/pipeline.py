@@ -16,7 +16,8 @@ import sys
 import os
 import time
 import torch  # Do wykrywania GPU
-from typing import Optional, Dict
+from bisect import bisect_left, bisect_right
+from typing import Optional, Dict, List, Tuple
 from dataclasses import dataclass, field
 
 # === KONFIGURACJA ===
@@ -28,6 +29,20 @@ OUTPUT_SYNTHETIC = "synthetic_generation_Overfitters.txt"
 # Parametry wydajności
 BATCH_SIZE = 32  # Przetwarzanie 32 linii naraz (zwiększ jeśli masz mocne GPU)
 DEVICE = 0 if torch.cuda.is_available() else -1  # 0 = GPU, -1 = CPU
+REGEX_WORKERS = 1  # Procesy warstwy Regex (1 = sekwencyjnie, None = wszystkie rdzenie)
+# Trwały magazyn analiz Morfeusza zapisuje oryginalne słowa (dane osobowe) na dysk - tylko na żądanie,
+# ścieżka z MORFEUSZ_ANALYSIS_STORE (brak = wyłączony)
+ANALYSIS_STORE = os.environ.get("MORFEUSZ_ANALYSIS_STORE")
+PERSISTENT_LABELS_POOL = False  # Trwała pula procesów Detailed Labels (ciepłe Morfeusze i cache między process())
+PREFORK_LABELS_POOL = False  # Morfeusz i cache puli Detailed Labels rozgrzewane przed fork() (współdzielone copy-on-write)
+SHARED_ANALYSIS_TABLE = False  # Analizy Morfeusza wspólne dla workerów puli Detailed Labels (shared_memory)
+UNIFIED_SPANS = False  # ML i Regex na oryginalnym tekście, scalone spany, jedno budowanie tekstu
+OFFSET_LABELS = False  # Detailed Labels ze spanów etapów 1-2 (oryginalne słowa bez wyrównywania tekstów)
+DEDUP_LABELS = False  # Detailed Labels dwufazowo: jedna analiza Morfeusza na unikalne słowo w dokumencie
+LABELS_EXECUTOR = None  # Wykonawca Detailed Labels: sequential/process/persistent, "auto" = model kosztu, None = trwała pula, jeśli włączona
+
+# Span encji: (start, end, tag) w oryginalnym tekście
+Span = Tuple[int, int, str]
 
 
 @dataclass
@@ -53,6 +68,19 @@ class TimingResult:
     avg_detailed_per_sample: float = 0.0
     avg_synthetic_per_sample: float = 0.0
     
+    # Detailed Labels - linie pominięte przez szybką ścieżkę (bez tagów z KEEP_LABELS)
+    detailed_lines: int = 0
+    detailed_skipped_lines: int = 0
+    
+    # Detailed Labels - wybrany wykonawca, przewidywany (model kosztu, tylko "auto") i faktyczny czas
+    detailed_executor: str = ""
+    detailed_predicted_time: float = 0.0
+    detailed_actual_time: float = 0.0
+    
+    @property
+    def detailed_skipped_ratio(self) -> float:
+        return self.detailed_skipped_lines / self.detailed_lines if self.detailed_lines else 0.0
+    
     def calculate_averages(self):
         """Oblicza średnie czasy per sample."""
         if self.num_samples > 0:
@@ -90,6 +118,9 @@ class TimingResult:
 ╠═══════════════════════════════════════════════════════════════════════╣
 ║ 📊 Liczba próbek (linii):      {self.num_samples:>10}                                 ║
 ║ 📊 Średni czas per sample:     {fmt_time(self.avg_time_per_sample):>12}                            ║
+║ 📊 Linie pominięte (Detailed): {self.detailed_skipped_lines:>10} ({self.detailed_skipped_ratio:>6.1%})                        ║
+║ 📊 Wykonawca (Detailed):       {self.detailed_executor:>10} (prognoza: {fmt_time(self.detailed_predicted_time):>12})        ║
+║ 📊 Czas wykonawcy (Detailed):  {fmt_time(self.detailed_actual_time):>12}                            ║
 ╠═══════════════════════════════════════════════════════════════════════╣
 ║ 🏁 CAŁKOWITY CZAS:             {self.total_time:>10.3f} s                            ║
 ╚═══════════════════════════════════════════════════════════════════════╝
@@ -105,7 +136,7 @@ from transformers import pipeline as hf_pipeline
 from .regex_layer import RegexLayer, EntityType
 
 # 3. Detailed Labels
-from .detailed_labels import process_text_tokenized, KEEP_LABELS
+from .detailed_labels import process_text_tokenized, KEEP_LABELS, DetailedLabelsPool, calibrate_executors, calibrate_pool
 
 # 4. Synthetic Generator
 from .synthetic_generator import generate_synthetic_output
@@ -232,17 +263,17 @@ def normalize_tag(tag: str) -> str:
     return tag_mapping.get(clean_tag, clean_tag.lower())
 
 
-def apply_ner_to_line(line: str, results: list) -> str:
+def ner_line_spans(line: str, results: list) -> List[Span]:
     """
-    Nakłada wyniki NER na linię tekstu.
-    Ta funkcja NIE wywołuje modelu, tylko przetwarza wyniki.
+    Zakresy tagów NER w linii: (start, end, tag) po dociągnięciu granic,
+    posortowane i rozłączne - dokładnie te fragmenty, które zastępuje apply_ner_to_line.
     """
     if not line.strip() or not results:
-        return line
+        return []
 
     results = sorted(results, key=lambda x: x['start'])
 
-    output = ""
+    spans = []
     current_idx = 0
     last_processed_end = -1
 
@@ -270,23 +301,27 @@ def apply_ner_to_line(line: str, results: list) -> str:
         # 2. Normalizujemy tag do wyświetlenia
         display_tag = normalize_tag(raw_tag)
 
-        # Przepisujemy tekst PRZED encją
-        output += line[current_idx:new_start]
-
-        # Wstawiamy Tag
-        output += f"[{display_tag}]"
+        # Rozszerzenie wstecz nie może wejść w poprzedni tag (jego tekst jest już zastąpiony)
+        spans.append((max(new_start, current_idx), new_end, display_tag))
 
         current_idx = new_end
         last_processed_end = new_end
 
-    # Doklejamy resztę tekstu
-    output += line[current_idx:]
-    return output
+    return spans
 
 
-def ml_anonymize_text(text: str, nlp_model, show_progress: bool = True) -> str:
+def apply_ner_to_line(line: str, results: list) -> str:
     """
-    ZOPTYMALIZOWANA Anonimizacja: Batch Processing.
+    Nakłada wyniki NER na linię tekstu.
+    Ta funkcja NIE wywołuje modelu, tylko przetwarza wyniki.
+    """
+    return apply_spans(line, ner_line_spans(line, results))
+
+
+def ml_detect_spans(text: str, nlp_model, show_progress: bool = True) -> List[Span]:
+    """
+    Zakresy tagów modelu ML w całym tekście (offsety w oryginalnym tekście).
+    Model wywoływany jest wsadowo na niepustych liniach.
     """
     lines = text.split('\n')
     
@@ -295,7 +330,7 @@ def ml_anonymize_text(text: str, nlp_model, show_progress: bool = True) -> str:
     non_empty_lines = [lines[i] for i in non_empty_indices]
     
     if not non_empty_lines:
-        return text
+        return []
 
     # Uruchamiamy model w trybie wsadowym (Batch)
     # To jest kluczowe przyspieszenie - model dostaje listę, a nie pojedyncze stringi
@@ -303,48 +338,159 @@ def ml_anonymize_text(text: str, nlp_model, show_progress: bool = True) -> str:
         print(f"🚀 Przetwarzanie ML w batchach (Batch size: {BATCH_SIZE}, Device: {DEVICE})...")
     
     batch_results = nlp_model(non_empty_lines, batch_size=BATCH_SIZE)
-    
-    # Rekonstrukcja tekstu
-    processed_lines = lines.copy()
-    
+
+    # Offset początku każdej linii w tekście
+    line_offsets = []
+    offset = 0
+    for line in lines:
+        line_offsets.append(offset)
+        offset += len(line) + 1
+
+    spans = []
     for idx, line_results in zip(non_empty_indices, batch_results):
-        processed_lines[idx] = apply_ner_to_line(lines[idx], line_results)
-    
-    return '\n'.join(processed_lines)
+        line_offset = line_offsets[idx]
+        for start, end, tag in ner_line_spans(lines[idx], line_results):
+            spans.append((line_offset + start, line_offset + end, tag))
+    return spans
+
+
+def ml_anonymize_text(text: str, nlp_model, show_progress: bool = True) -> str:
+    """
+    ZOPTYMALIZOWANA Anonimizacja: Batch Processing.
+    """
+    return apply_spans(text, ml_detect_spans(text, nlp_model, show_progress))
 
 
 # === REGEX LAYER ===
 
-def regex_anonymize_text(text: str, regex_layer: RegexLayer) -> str:
+def regex_detect_spans(text: str, regex_layer: RegexLayer, num_workers: Optional[int] = 1) -> List[Span]:
+    """
+    Zakresy encji warstwy regex: (start, end, tag), posortowane i rozłączne.
+
+    num_workers != 1 włącza tryb równoległy (fragmenty tekstu w puli procesów,
+    None = liczba rdzeni CPU); wynik jest identyczny z trybem sekwencyjnym.
+    """
+    if num_workers == 1:
+        entities = regex_layer.detect(text)
+    else:
+        entities = regex_layer.detect_parallel(text, num_workers=num_workers)
+    return [(entity.start, entity.end, entity.entity_type.value) for entity in entities]
+
+
+def regex_anonymize_text(text: str, regex_layer: RegexLayer, num_workers: Optional[int] = 1) -> str:
     """
     Anonimizacja tekstu przez warstwę regex.
     Łapie: email, PESEL, telefony, numery kont, adresy.
+
+    num_workers != 1 włącza tryb równoległy (fragmenty tekstu w puli procesów,
+    None = liczba rdzeni CPU); wynik jest identyczny z trybem sekwencyjnym.
     """
-    entities = regex_layer.detect(text)
-    
-    if not entities:
+    return apply_spans(text, regex_detect_spans(text, regex_layer, num_workers))
+
+
+# === SCALANIE SPANÓW ===
+
+def merge_spans(primary: List[Span], secondary: List[Span]) -> List[Span]:
+    """
+    Scala dwie posortowane, rozłączne listy spanów. Pierwsza ma priorytet:
+    span z `secondary` nachodzący na którykolwiek z `primary` jest odrzucany.
+    """
+    if not primary:
+        return list(secondary)
+    starts = [start for start, _, _ in primary]
+    merged = list(primary)
+    for span in secondary:
+        # Spany primary są rozłączne, więc ostatni zaczynający się przed końcem
+        # `span` ma też największy koniec spośród nich
+        i = bisect_left(starts, span[1])
+        if i and primary[i - 1][1] > span[0]:
+            continue
+        merged.append(span)
+    merged.sort(key=lambda span: span[0])
+    return merged
+
+
+def compose_spans(inner: List[Span], outer: List[Span]) -> Optional[List[Span]]:
+    """
+    Przenosi spany `outer`, wykryte w tekście apply_spans(text, inner), na offsety
+    w `text`. Span `outer` obejmujący tagi `inner` zastępuje je w całości, więc
+    apply_spans(text, wynik) == apply_spans(apply_spans(text, inner), outer).
+    None, gdy któryś span `outer` zaczyna się lub kończy wewnątrz tagu `inner`.
+    """
+    if not inner:
+        return list(outer)
+    # Pozycje tagów `inner` w tekście z tagami i przesunięcie offsetów za każdym z nich
+    tag_starts = []
+    tag_ends = []
+    shifts = []
+    shift = 0
+    for start, end, tag in inner:
+        tag_starts.append(start + shift)
+        shift += len(tag) + 2 - (end - start)
+        tag_ends.append(end + shift)
+        shifts.append(shift)
+
+    def to_original(pos):
+        i = bisect_right(tag_starts, pos) - 1
+        if i < 0:
+            return pos
+        if pos == tag_starts[i]:
+            return inner[i][0]
+        if pos < tag_ends[i]:
+            return None
+        return pos - shifts[i]
+
+    mapped = []
+    for start, end, tag in outer:
+        orig_start = to_original(start)
+        orig_end = to_original(end)
+        if orig_start is None or orig_end is None:
+            return None
+        mapped.append((orig_start, orig_end, tag))
+    return merge_spans(mapped, inner)
+
+
+def apply_spans(text: str, spans: List[Span]) -> str:
+    """
+    Zastępuje spany tagami [tag] w jednym przebiegu (łączenie listy fragmentów
+    zamiast wielokrotnego cięcia napisu). Spany muszą być posortowane i rozłączne.
+    """
+    if not spans:
         return text
-    
-    # Sortuj od końca, żeby nie psuć indeksów przy zamianie
-    entities_sorted = sorted(entities, key=lambda e: e.start, reverse=True)
-    
-    result = text
-    for entity in entities_sorted:
-        tag = f"[{entity.entity_type.value}]"
-        result = result[:entity.start] + tag + result[entity.end:]
-    
-    return result
+    parts = []
+    pos = 0
+    for start, end, tag in spans:
+        parts.append(text[pos:start])
+        parts.append(f"[{tag}]")
+        pos = end
+    parts.append(text[pos:])
+    return "".join(parts)
 
 
 # === GŁÓWNY PIPELINE ===
 
 class AnonymizationPipeline:
-    def __init__(self, model_path: str = MODEL_PATH, verbose: bool = True, output_dir: str = OUTPUT_DIR):
+    def __init__(self, model_path: str = MODEL_PATH, verbose: bool = True, output_dir: str = OUTPUT_DIR,
+                 regex_workers: Optional[int] = REGEX_WORKERS, profile_regex: bool = False,
+                 unified_spans: bool = UNIFIED_SPANS, persistent_pool: bool = PERSISTENT_LABELS_POOL,
+                 analysis_store: Optional[str] = ANALYSIS_STORE, offset_labels: bool = OFFSET_LABELS,
+                 dedup_labels: bool = DEDUP_LABELS, labels_executor: Optional[str] = LABELS_EXECUTOR,
+                 prefork_pool: bool = PREFORK_LABELS_POOL, shared_analyses: bool = SHARED_ANALYSIS_TABLE):
         self.verbose = verbose
         self.model_path = model_path
         self.output_dir = output_dir
         self.nlp_model = None
         self.regex_layer = None
+        self.regex_workers = regex_workers
+        self.profile_regex = profile_regex
+        self.unified_spans = unified_spans
+        self.analysis_store = analysis_store
+        self.offset_labels = offset_labels
+        self.dedup_labels = dedup_labels
+        self.labels_executor = labels_executor
+        self.labels_pool = (DetailedLabelsPool(store_path=analysis_store, prefork=prefork_pool,
+                                               shared_table=shared_analyses)
+                            if persistent_pool else None)
         self.timing = TimingResult()
         
         os.makedirs(self.output_dir, exist_ok=True)
@@ -353,8 +499,30 @@ class AnonymizationPipeline:
         if self.verbose:
             print(message)
     
+    def close(self):
+        """Zamyka trwałą pulę procesów Detailed Labels."""
+        if self.labels_pool is not None:
+            self.labels_pool.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
     def load_models(self):
         t_start = time.perf_counter()
+        if self.labels_pool is not None:
+            # Workery startują przed załadowaniem modelu ML - fork nie kopiuje jego pamięci
+            self._log(f"📦 Uruchamianie puli Detailed Labels ({self.labels_pool.num_workers} procesów)...")
+            self.labels_pool.start()
+        if self.labels_executor == "auto":
+            # Kalibracja także przed załadowaniem modelu ML (bez trwałej puli - fork puli testowej)
+            self._log("📦 Kalibracja modelu kosztu Detailed Labels...")
+            if self.labels_pool is not None:
+                calibrate_pool(self.labels_pool, store_path=self.analysis_store)
+            else:
+                calibrate_executors(store_path=self.analysis_store)
         self._log("📦 Ładowanie modelu ML...")
         
         if not os.path.exists(self.model_path):
@@ -373,7 +541,7 @@ class AnonymizationPipeline:
         self._log(f"✅ Model ML załadowany ({self.timing.model_load_time:.3f}s) [Device: {DEVICE}]")
         
         self._log("📦 Inicjalizacja warstwy Regex...")
-        self.regex_layer = RegexLayer()
+        self.regex_layer = RegexLayer(profile=self.profile_regex)
         self._log("✅ Warstwa Regex gotowa.")
     
     def process(self, original_text: str, output_anonymized: str = OUTPUT_ANONYMIZED, output_synthetic: str = OUTPUT_SYNTHETIC) -> dict:
@@ -393,22 +561,40 @@ class AnonymizationPipeline:
             'after_regex': None,
             'after_detailed_labels': None,
             'synthetic': None,
-            'timing': None
+            'timing': None,
+            'regex_profile': None
         }
         
         # === ETAP 1: Model ML (BATCHED) ===
         self._log("\n🔹 ETAP 1: Anonimizacja ML (Batch)")
         t_start = time.perf_counter()
-        after_ml = ml_anonymize_text(original_text, self.nlp_model)
+        # Spany ML (offsety w oryginale) - dla trybu scalonych spanów i Detailed Labels
+        ml_spans = ml_detect_spans(original_text, self.nlp_model)
+        after_ml = apply_spans(original_text, ml_spans)
         self.timing.ml_layer_time = time.perf_counter() - t_start
         results['after_ml'] = after_ml
         
         # === ETAP 2: Regex Layer ===
         self._log("🔹 ETAP 2: Regex")
+        profile = self.regex_layer.profile
+        if profile is not None:
+            profile.reset()
         t_start = time.perf_counter()
-        after_regex = regex_anonymize_text(after_ml, self.regex_layer)
+        if self.unified_spans:
+            # Tryb scalonych spanów: regex działa na oryginale, tekst budowany raz
+            regex_spans = regex_detect_spans(original_text, self.regex_layer, self.regex_workers)
+            tag_spans = merge_spans(ml_spans, regex_spans)
+            after_regex = apply_spans(original_text, tag_spans)
+        else:
+            regex_spans = regex_detect_spans(after_ml, self.regex_layer, self.regex_workers)
+            after_regex = apply_spans(after_ml, regex_spans)
+            # Spany regex przeniesione na offsety oryginału (tylko dla Detailed Labels)
+            tag_spans = compose_spans(ml_spans, regex_spans) if self.offset_labels else None
         self.timing.regex_layer_time = time.perf_counter() - t_start
         results['after_regex'] = after_regex
+        if profile is not None:
+            results['regex_profile'] = profile.report()
+            self._log(profile.format())
         
         # ZAPIS 1
         t_io_start = time.perf_counter()
@@ -423,8 +609,29 @@ class AnonymizationPipeline:
         cpu_count = os.cpu_count()
         self._log(f"🖥️  Dostępne rdzenie CPU: {cpu_count}")
         t_start = time.perf_counter()
-        after_detailed = process_text_tokenized(original_text, after_regex, KEEP_LABELS)
+        if self.labels_pool is not None:
+            self.labels_pool.ensure_healthy()
+        labels_stats = {}
+        if not self.offset_labels:
+            tag_spans = None
+        elif tag_spans is None:
+            self._log("OSTRZEŻENIE: encja Regex przecina tag ML - Detailed Labels z wyrównywaniem tekstów")
+        after_detailed = process_text_tokenized(original_text, after_regex, KEEP_LABELS, pool=self.labels_pool,
+                                                store_path=self.analysis_store, stats=labels_stats,
+                                                spans=tag_spans, dedup=self.dedup_labels,
+                                                executor=self.labels_executor)
         self.timing.detailed_labels_time = time.perf_counter() - t_start
+        self.timing.detailed_lines = labels_stats["lines"]
+        self.timing.detailed_skipped_lines = labels_stats["skipped"]
+        if "executor" in labels_stats:
+            self.timing.detailed_executor = labels_stats["executor"]
+            self.timing.detailed_predicted_time = labels_stats["predicted"] or 0.0
+            self.timing.detailed_actual_time = labels_stats["elapsed"]
+            if labels_stats["predicted"] is not None:
+                self._log(f"⚙️  Wykonawca Detailed Labels: {labels_stats['executor']} "
+                          f"(prognoza {labels_stats['predicted']:.3f} s, faktycznie {labels_stats['elapsed']:.3f} s)")
+        self._log(f"⏭️  Linie bez tagów z KEEP_LABELS (pominięte): {self.timing.detailed_skipped_lines}"
+                  f"/{self.timing.detailed_lines} ({self.timing.detailed_skipped_ratio:.1%})")
         results['after_detailed_labels'] = after_detailed
         
         # === ETAP 4: Synthetic ===
@@ -466,13 +673,18 @@ def main():
     print("   🔐 PIPELINE ANONIMIZACJI (OPTIMIZED)")
     print("="*60)
     
-    if len(sys.argv) >= 2:
-        input_file = sys.argv[1]
-        pipeline = AnonymizationPipeline()
-        pipeline.process_file(input_file)
-    else:
-        print("\nTryb interaktywny (wpisz tekst, Ctrl+D lub 'q' by wyjść).")
-        pipeline = AnonymizationPipeline()
+    # --profile-regex: raport kosztu każdego wzorca warstwy Regex
+    args = [arg for arg in sys.argv[1:] if arg != "--profile-regex"]
+    profile_regex = len(args) < len(sys.argv) - 1
+
+    if args:
+        input_file = args[0]
+        with AnonymizationPipeline(profile_regex=profile_regex) as pipeline:
+            pipeline.process_file(input_file)
+        return
+
+    print("\nTryb interaktywny (wpisz tekst, Ctrl+D lub 'q' by wyjść).")
+    with AnonymizationPipeline(profile_regex=profile_regex) as pipeline:
         pipeline.load_models()
         
         while True:
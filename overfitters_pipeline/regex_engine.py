@@ -0,0 +1,487 @@
+"""
+Silniki wyrażeń regularnych dla warstwy Regex.
+
+- "re":   standardowy moduł `re` (backtracking, pełna składnia)
+- "re2":  google-re2 (gwarantowany czas liniowy, bez lookaround i \\b)
+- "auto": "re2", jeśli pakiet jest zainstalowany, w przeciwnym razie "re"
+
+RE2 nie obsługuje lookaround ani unikodowego \\b, więc każdy wzorzec z RegexLayer
+ma tu ręcznie przepisaną formę RE2: asercje (?<!\\w) / (?!\\w) / \\b zastąpione są
+jednym konsumowanym znakiem kontekstu po obu stronach encji, a tekst jest przed
+wyszukiwaniem mapowany na jednobajtowy alfabet, w którym klasy \\w, \\d, \\s mają
+semantykę Unicode modułu `re`. Przy każdej formie zapisane jest źródło, z którego ją
+przepisano - wzorce bez aktualnej formy RE2 (lub gdy re2 nie jest dostępny) wracają
+do `re`.
+"""
+
+import logging
+import re
+import string
+import sys
+import threading
+from functools import lru_cache
+from typing import Callable, Dict, Iterator, Optional, Tuple
+
+logger = logging.getLogger("regex_engine")
+
+# google-re2 - opcjonalna zależność
+try:
+    import re2
+    _RE2_AVAILABLE = True
+except ImportError:
+    re2 = None
+    _RE2_AVAILABLE = False
+
+REGEX_ENGINES = ("re", "re2", "auto")
+
+# ================= ALFABET RE2 =================
+# Tekst przed wyszukiwaniem jest mapowany 1:1 (znak -> bajt) na mały alfabet Latin-1:
+# ASCII bez zmian, znaki występujące literalnie we wzorcach (polskie litery oraz
+# İ/ı/ſ/znak Kelvina, które re.IGNORECASE utożsamia z i/s/k) dostają własne kody, a każdy inny
+# znak - kod reprezentanta swojej klasy (\w, \d, \s, reszta). Offsety bajtowe są więc
+# offsetami znakowymi, a programy RE2 pozostają małe.
+
+_PRESERVED = "ĄĆĘŁŃÓŚŹŻąćęłńóśźż\u0130\u0131\u017f\u212a"
+_CODES = {ch: 0x80 + i for i, ch in enumerate(_PRESERVED)}
+_OTHER_WORD = 0xF0
+_OTHER_DIGIT = 0xF1
+_OTHER_SPACE = 0xF2
+_OTHER = 0xF3  # także strażnik dookoła tekstu (początek/koniec = kontekst spoza \w)
+
+_ASCII_WORD = string.ascii_letters + string.digits + "_"
+_ASCII_SPACE = "\t\n\x0b\x0c\r\x1c\x1d\x1e\x1f "
+
+
+class _Re2Alphabet(dict):
+    """Tablica dla str.translate - kod każdego znaku liczony raz, przy pierwszym wystąpieniu."""
+
+    def __missing__(self, code: int) -> int:
+        ch = chr(code)
+        if code < 0x80:
+            mapped = code
+        elif ch in _CODES:
+            mapped = _CODES[ch]
+        elif ch.isdecimal():
+            mapped = _OTHER_DIGIT
+        elif ch.isalnum():
+            mapped = _OTHER_WORD
+        elif ch.isspace():
+            mapped = _OTHER_SPACE
+        else:
+            mapped = _OTHER
+        self[code] = mapped
+        return mapped
+
+
+_ALPHABET = _Re2Alphabet()
+_SENTINEL = bytes([_OTHER])
+
+# Ostatnio zakodowany tekst - wszystkie wzorce RegexLayer skanują ten sam tekst.
+# Osobno dla każdego wątku, żeby wątki współdzielące warstwę nie wypierały sobie wpisu.
+_last_encoded = threading.local()
+
+
+def encode_for_re2(text: str) -> bytes:
+    """Tekst w alfabecie RE2, otoczony strażnikami (indeks bajtu = indeks znaku + 1)."""
+    if getattr(_last_encoded, "text", None) is text:
+        return _last_encoded.buf
+    buf = _SENTINEL + text.translate(_ALPHABET).encode("latin-1") + _SENTINEL
+    _last_encoded.text, _last_encoded.buf = text, buf
+    return buf
+
+
+class _Latin1Syntax:
+    """Zapis klas znaków form RE2 dla tekstu w alfabecie RE2 (encode_for_re2)."""
+
+    def __init__(self):
+        self.word = self.chars(_WORD_CHARS) + self._codes(_OTHER_WORD, _OTHER_DIGIT)
+        self.digit = self.chars(string.digits) + self._codes(_OTHER_DIGIT)
+        self.space = self.chars(_ASCII_SPACE) + self._codes(_OTHER_SPACE)
+
+    @staticmethod
+    def _codes(*codes: int) -> str:
+        return "".join(f"\\x{{{code:02X}}}" for code in codes)
+
+    def esc(self, ch: str) -> str:
+        return self._codes(_CODES.get(ch, ord(ch)))
+
+    def chars(self, chars: str) -> str:
+        """Zawartość klasy znaków RE2 dla podanych znaków."""
+        return "".join(self.esc(ch) for ch in chars)
+
+    def word_except(self, chars: str) -> str:
+        """Klasa \\w bez podanych znaków."""
+        kept = "".join(ch for ch in _WORD_CHARS if ch not in chars)
+        return self.chars(kept) + self._codes(_OTHER_WORD, _OTHER_DIGIT)
+
+
+@lru_cache(maxsize=None)
+def _codepoint_ranges(kind: str) -> Tuple[Tuple[int, int], ...]:
+    """Zakresy kodów znaków należących do \\w, \\d lub \\s modułu re (Unicode)."""
+    all_chars = "".join(map(chr, range(sys.maxunicode + 1)))
+    pattern = {"word": r"\w+", "digit": r"\d+", "space": r"\s+"}[kind]
+    return tuple((m.start(), m.end() - 1) for m in re.finditer(pattern, all_chars))
+
+
+class _Utf8Syntax:
+    """Zapis klas znaków form RE2 dla surowego tekstu UTF-8 (np. zmapowanego pliku)."""
+
+    def __init__(self):
+        self.word = self._ranges(_codepoint_ranges("word"))
+        self.digit = self._ranges(_codepoint_ranges("digit"))
+        self.space = self._ranges(_codepoint_ranges("space"))
+
+    @staticmethod
+    def _ranges(ranges) -> str:
+        return "".join(
+            f"\\x{{{lo:X}}}" if lo == hi else f"\\x{{{lo:X}}}-\\x{{{hi:X}}}"
+            for lo, hi in ranges
+        )
+
+    def esc(self, ch: str) -> str:
+        return f"\\x{{{ord(ch):X}}}"
+
+    def chars(self, chars: str) -> str:
+        return "".join(self.esc(ch) for ch in chars)
+
+    def word_except(self, chars: str) -> str:
+        excluded = sorted(ord(ch) for ch in set(chars))
+        ranges = []
+        for lo, hi in _codepoint_ranges("word"):
+            for code in excluded:
+                if lo <= code <= hi:
+                    if lo < code:
+                        ranges.append((lo, code - 1))
+                    lo = code + 1
+            if lo <= hi:
+                ranges.append((lo, hi))
+        return self._ranges(ranges)
+
+
+_WORD_CHARS = _ASCII_WORD + _PRESERVED
+LATIN1 = _Latin1Syntax()
+
+# Warianty wielkości liter zgodne z re.IGNORECASE (re dopasowuje też İ/ı do i, ſ do s, znak Kelvina do k)
+_CASE_VARIANTS = {"i": "iI\u0130\u0131", "s": "sS\u017f", "k": "kK\u212a"}
+
+
+def _ci_chars(ch: str) -> str:
+    return _CASE_VARIANTS.get(ch.lower(), ch.lower() + ch.upper())
+
+
+def _ci(syntax, word: str) -> str:
+    """Literał bez rozróżniania wielkości liter (semantyka re.IGNORECASE)."""
+    out = []
+    for ch in word:
+        if ch.isalpha():
+            out.append(f"[{syntax.chars(_ci_chars(ch))}]")
+        else:
+            out.append(syntax.esc(ch))
+    return "".join(out)
+
+
+def _ci_any(syntax, *words: str) -> str:
+    return "(?:" + "|".join(_ci(syntax, w) for w in words) + ")"
+
+
+# ================= FORMY RE2 WZORCÓW REGEXLAYER =================
+# Każda forma to (kontekst przed, encja, kontekst po); kontekst to jeden znak spoza \w
+# (lub odpowiednik \b zależny od skrajnego znaku encji - e-mail).
+
+def _address_form(syntax) -> Tuple[str, str, str]:
+    """
+    Forma RE2 address_regex (IGNORECASE).
+
+    Pierwszy lookahead wzorca jest pusty (pierwszy człon nazwy nigdy nie zaczyna się
+    od spacji). Drugi - dla kolejnych członów - odrzuca człon zaczynający się od prefiksu;
+    kropkowane prefiksy (ul., al., pl., os.) i tak nie dają dopasowania, więc wystarczy
+    wykluczyć słowa zaczynające się od ulica/aleja/plac/osiedle/skwer/rondo.
+    """
+    letters = string.ascii_letters + _PRESERVED
+    ascii_letter = f"[{syntax.chars(string.ascii_letters + _PRESERVED[-4:])}]"
+    word_tail = f"[{syntax.word}\\-]*"
+
+    prefix = _ci_any(syntax, "ul.", "ulica", "al.", "aleja", "aleje", "pl.", "plac",
+                     "os.", "osiedle", "skwer", "rondo")
+    titles = [_ci(syntax, t) for t in ("św.", "gen.", "ks.", "bp.", "abp.", "prof.")]
+    titles += [_ci(syntax, "dr") + r"\.?", _ci(syntax, "im.")]
+    title_first = "(?:" + "|".join(titles + [_ci(syntax, "al."), _ci(syntax, "pl.")]) + ")"
+    title_next = "(?:" + "|".join(titles) + ")"
+    initial = f"{ascii_letter}\\.?"
+    connector = _ci_any(syntax, "i", "w", "z", "nad", "pod", "przy", "ku")
+
+    first_word = f"[{syntax.chars(letters + string.digits)}]{word_tail}"
+
+    # Kolejny człon: słowo, które nie zaczyna się od zakazanego prefiksu
+    forbidden = ("ulica", "aleja", "plac", "osiedle", "skwer", "rondo")
+    forbidden_first = "".join(_ci_chars(w[0]) for w in forbidden)
+    allowed_first = "".join(ch for ch in letters + string.digits if ch not in forbidden_first)
+
+    def not_prefix(rest: str) -> str:
+        # Dalsza część słowa, która nie domyka zakazanego prefiksu `rest`
+        head = _ci_chars(rest[0])
+        other = f"[{syntax.word_except(head)}\\-]{word_tail}"
+        if len(rest) == 1:
+            return f"(?:{other}|)"
+        return f"(?:{other}|[{syntax.chars(head)}]{not_prefix(rest[1:])}|)"
+
+    next_word = "(?:" + "|".join(
+        [f"[{syntax.chars(allowed_first)}]{word_tail}"]
+        + [f"[{syntax.chars(_ci_chars(w[0]))}]{not_prefix(w[1:])}" for w in forbidden]
+    ) + ")"
+
+    first = f"(?:{first_word}|{title_first}|{initial})"
+    following = f"(?:{next_word}|{title_next}|{initial}|{connector})"
+    street = f"(?:{first}(?:[{syntax.space}\\-]{following})*)"
+    number = (
+        f"[{syntax.digit}]+{ascii_letter}?(?:[/\\-][{syntax.digit}]+{ascii_letter}?)?"
+        f"(?:[{syntax.space}]*{_ci_any(syntax, 'm.', 'lok.', 'm', 'lok')}[{syntax.space}]*[{syntax.digit}]+)?"
+    )
+    not_word = f"[^{syntax.word}]"
+    return not_word, f"{prefix}[{syntax.space}]+{street}[{syntax.space}]+{number}", not_word
+
+
+def _bounded(core: str) -> Callable:
+    """Forma (?<!\\w)CORE(?!\\w): kontekst to jeden znak spoza \\w z każdej strony."""
+    def form(syntax) -> Tuple[str, str, str]:
+        not_word = f"[^{syntax.word}]"
+        body = core.replace("{d}", f"[{syntax.digit}]").replace("{pl}", _ci(syntax, "pl"))
+        return not_word, body, not_word
+    return form
+
+
+def _email_form(syntax) -> Tuple[str, str, str]:
+    r"""
+    Forma RE2 dla \b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b.
+    \b na brzegach zależy od tego, czy skrajny znak encji jest znakiem słowa,
+    więc kontekst i skrajny znak encji stanowią jedną alternatywę.
+    """
+    not_word = f"[^{syntax.word}]"
+    return (
+        "",
+        f"(?:{not_word}[A-Za-z0-9_]|[{syntax.word}][.%+\\-])[A-Za-z0-9._%+\\-]*"
+        f"@[A-Za-z0-9.\\-]+\\.[A-Z|a-z]+(?:[A-Za-z]{not_word}|\\|[{syntax.word}])",
+        "",
+    )
+
+
+def _email_bytes_form(syntax) -> str:
+    """Forma e-mail z grupami wokół encji i brzegami tekstu (^/$) zamiast znaku-strażnika."""
+    not_word = f"[^{syntax.word}]"
+    middle = r"[A-Za-z0-9._%+\-]*@[A-Za-z0-9.\-]+\.[A-Z|a-z]+"
+    return (
+        f"(?:(?:^|{not_word})([A-Za-z0-9_]{middle})|[{syntax.word}]([.%+\\-]{middle}))"
+        f"(?:([A-Za-z])(?:{not_word}|$)|(\\|)[{syntax.word}])"
+    )
+
+
+_PHONE_PREFIX = r"(?:(?:\+|00){d}{1,3}[ .\-]?|\(\+?{d}{1,3}\)[ .\-]?)"
+
+# Źródła form RE2 - wzorce `re` z RegexLayer._compile_patterns, z których przepisano formy.
+# Forma, której źródło różni się od wzorca warstwy, jest nieaktualna i nie jest używana.
+_ADDRESS_SOURCE = (
+    r"\b(?i:ul\.|ulica|al\.|aleja|aleje|pl\.|plac|os\.|osiedle|skwer|rondo)\s+"
+    r"((?:(?!\s+(?i:ul\.|ulica|al\.|aleja|pl\.|plac|os\.|osiedle|skwer|rondo))"
+    r"(?:[a-zA-ZĄĆĘŁŃÓŚŹŻąćęłńóśźż0-9][\wą-ż-]*|(?i:św\.|gen\.|ks\.|bp\.|abp\.|prof\.|dr\.?|im\.|al\.|pl\.)|[A-Z]\.?)"
+    r"(?:[\s-](?!\s*(?i:ul\.|ulica|al\.|aleja|pl\.|plac|os\.|osiedle|skwer|rondo))"
+    r"(?:[A-ZĄĆĘŁŃÓŚŹŻ0-9][\wą-ż-]*|(?i:św\.|gen\.|ks\.|bp\.|abp\.|prof\.|dr\.?|im\.)|[A-Z]\.?"
+    r"|(?i:i|w|z|nad|pod|przy|ku)))*))"
+    r"\s+(\d+(?:[a-zA-Z])?(?:[/-]\d+(?:[a-zA-Z])?)?(?:\s*(?i:m\.|lok\.|m|lok)\s*\d+)?)\b"
+)
+_PHONE_PREFIX_SOURCE = r"(?:(?:\+|00)\d{1,3}[ .-]?|\(\+?\d{1,3}\)[ .-]?)"
+
+# Klucz wzorca -> (źródło `re`, funkcja budująca formę RE2); klucze jak RegexLayer.simple_pattern_keys
+RE2_FORMS: Dict[str, Tuple[str, Callable]] = {
+    "address": (_ADDRESS_SOURCE, _address_form),
+    "pesel": (r"\b\d{11}\b", _bounded("{d}{11}")),
+    "email": (r"\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b", _email_form),
+    "bank_account_iban": (r"\b(?i:PL)[ ]?\d{2}(?:[ ]?\d{4}){6}\b",
+                          _bounded("{pl}[ ]?{d}{2}(?:[ ]?{d}{4}){6}")),
+    "bank_account_grouped": (r"\b\d{4}[ ]\d{4}[ ]\d{4}[ ]\d{4}\b",
+                             _bounded("{d}{4}[ ]{d}{4}[ ]{d}{4}[ ]{d}{4}")),
+    "phone_mobile_prefixed": (r"(?<!\w)" + _PHONE_PREFIX_SOURCE + r"\d{3}[ .-]?\d{3}[ .-]?\d{3}(?!\w)",
+                              _bounded(_PHONE_PREFIX + r"{d}{3}[ .\-]?{d}{3}[ .\-]?{d}{3}")),
+    "phone_mobile": (r"(?<!\w)\d{3}[ .-]\d{3}[ .-]\d{3}(?!\w)",
+                     _bounded(r"{d}{3}[ .\-]{d}{3}[ .\-]{d}{3}")),
+    "phone_landline_prefixed": (
+        r"(?<!\w)" + _PHONE_PREFIX_SOURCE + r"\d{2}[ .-]?\d{3}[ .-]?\d{2}[ .-]?\d{2}(?!\w)",
+        _bounded(_PHONE_PREFIX + r"{d}{2}[ .\-]?{d}{3}[ .\-]?{d}{2}[ .\-]?{d}{2}"),
+    ),
+    "phone_landline": (r"(?<!\w)\(?\d{2}\)?[ .-]\d{3}[ .-]\d{2}[ .-]\d{2}(?!\w)",
+                       _bounded(r"\(?{d}{2}\)?[ .\-]{d}{3}[ .\-]{d}{2}[ .\-]{d}{2}")),
+}
+
+
+def has_current_form(key: str, pattern: str) -> bool:
+    """
+    Czy wzorzec ma formę RE2 przepisaną z tego samego źródła. Forma nieaktualna
+    (wzorzec zmieniony w RegexLayer bez aktualizacji RE2_FORMS) - ostrzeżenie i False.
+    """
+    if key not in RE2_FORMS:
+        return False
+    if RE2_FORMS[key][0] != pattern:
+        logger.warning(f"Forma RE2 wzorca {key!r} nie odpowiada wzorcowi RegexLayer. Używam silnika 're'.")
+        return False
+    return True
+
+
+def re2_form(key: str, syntax=LATIN1) -> str:
+    """Forma RE2 wzorca jako jeden regex (kontekst konsumowany po obu stronach)."""
+    before, body, after = RE2_FORMS[key][1](syntax)
+    return before + body + after
+
+
+# ================= WZORZEC RE2 =================
+
+class SpanMatch:
+    """Minimalny odpowiednik re.Match (tylko cała encja)."""
+
+    __slots__ = ("string", "_start", "_end")
+
+    def __init__(self, string: str, start: int, end: int):
+        self.string = string
+        self._start = start
+        self._end = end
+
+    def start(self) -> int:
+        return self._start
+
+    def end(self) -> int:
+        return self._end
+
+    def span(self) -> Tuple[int, int]:
+        return self._start, self._end
+
+    def group(self, index: int = 0) -> str:
+        if index != 0:
+            raise IndexError("SpanMatch przechowuje tylko grupę 0")
+        return self.string[self._start:self._end]
+
+
+class Re2Pattern:
+    """
+    Wzorzec wykonywany przez RE2 z wynikami identycznymi jak `finditer` modułu re.
+    Forma RE2 konsumuje po jednym znaku kontekstu z każdej strony encji; po dopasowaniu
+    wyszukiwanie wznawiane jest od ostatniego znaku encji (kontekst dla następnej).
+    """
+
+    def __init__(self, fallback: "re.Pattern", re2_source: str):
+        self.fallback = fallback
+        self.pattern = fallback.pattern
+        self.flags = fallback.flags
+        self.re2_source = re2_source
+        options = re2.Options()
+        options.encoding = re2.Options.Encoding.LATIN1
+        self._re2 = re2.compile(re2_source.encode("ascii"), options)
+
+    def finditer(self, text: str) -> Iterator[SpanMatch]:
+        buf = encode_for_re2(text)
+        pos = 0
+        while True:
+            match = self._re2.search(buf, pos)
+            if match is None:
+                return
+            # Bufor ma strażnika na początku: bajt i odpowiada znakowi i - 1
+            match_start, match_end = match.span()
+            yield SpanMatch(text, match_start, match_end - 2)
+            pos = match_end - 2
+
+    def match(self, text: str, pos: int = 0) -> Optional[SpanMatch]:
+        """Dopasowanie zakotwiczone na pozycji `pos` (jak re.Pattern.match)."""
+        # Kontekst encji zaczynającej się w pos to bajt pos w buforze
+        match = self._re2.match(encode_for_re2(text), pos)
+        if match is None:
+            return None
+        return SpanMatch(text, pos, match.end() - 2)
+
+
+class Re2BytesPattern:
+    """
+    Forma RE2 wzorca dla surowego tekstu UTF-8 (bytes, mmap) - bez dekodowania.
+    Zwraca zakresy bajtowe; encja to suma grup przechwytujących, kontekst jest poza nimi.
+    """
+
+    def __init__(self, key: str):
+        syntax = _utf8_syntax()
+        if key == "email":
+            source = _email_bytes_form(syntax)
+        else:
+            before, body, after = RE2_FORMS[key][1](syntax)
+            source = f"(?:^|{before})({body})(?:{after}|$)"
+        options = re2.Options()
+        options.max_mem = RE2_BYTES_MAX_MEM
+        options.log_errors = False
+        self.key = key
+        self._re2 = re2.compile(source.encode("ascii"), options)
+        self._groups = range(1, self._re2.groups + 1)
+
+    def spans(self, data, pos: int, endpos: int) -> Iterator[Tuple[int, int]]:
+        """
+        Zakresy bajtowe (start, end) encji w data[pos:endpos]. Bajt data[pos - 1]
+        (jeśli istnieje) jest traktowany jako kontekst poprzedzający.
+        """
+        search_pos = max(pos - 1, 0)
+        while True:
+            match = self._re2.search(data, search_pos, endpos)
+            if match is None:
+                return
+            groups = [span for span in map(match.span, self._groups) if span[0] >= 0]
+            start = min(span[0] for span in groups)
+            end = max(span[1] for span in groups)
+            yield start, end
+            # Następny kontekst to ostatni znak encji (początek jego sekwencji UTF-8)
+            search_pos = end - 1
+            while search_pos > start and data[search_pos] & 0xC0 == 0x80:
+                search_pos -= 1
+
+
+# Limit pamięci RE2 dla form UTF-8 (jawne klasy Unicode dają duże programy)
+RE2_BYTES_MAX_MEM = 256 << 20
+
+
+@lru_cache(maxsize=1)
+def _utf8_syntax() -> "_Utf8Syntax":
+    return _Utf8Syntax()
+
+
+def compile_bytes_pattern(key: str, pattern: str) -> Optional[Re2BytesPattern]:
+    """Forma wzorca `pattern` dla surowych bajtów UTF-8 albo None (brak re2 lub aktualnej formy)."""
+    if not _RE2_AVAILABLE or not has_current_form(key, pattern):
+        return None
+    try:
+        return Re2BytesPattern(key)
+    except re2.error:
+        return None
+
+
+# ================= KOMPILACJA =================
+
+def resolve_engine(engine: str) -> str:
+    """Zamienia "auto" na konkretny silnik; "re2" bez pakietu -> "re" z ostrzeżeniem."""
+    if engine not in REGEX_ENGINES:
+        raise ValueError(f"Nieznany silnik regex: {engine!r} (dostępne: {REGEX_ENGINES})")
+    if engine == "auto":
+        return "re2" if _RE2_AVAILABLE else "re"
+    if engine == "re2" and not _RE2_AVAILABLE:
+        logger.warning("google-re2 nie jest zainstalowany. Używam silnika 're'.")
+        return "re"
+    return engine
+
+
+def compile_pattern(key: str, pattern: str, flags: int = 0, engine: str = "re"):
+    """
+    Kompiluje wzorzec dla wybranego silnika.
+    Zwraca re.Pattern albo Re2Pattern (ten sam interfejs finditer).
+    """
+    compiled = re.compile(pattern, flags)
+    if engine != "re2" or not has_current_form(key, pattern):
+        return compiled
+    try:
+        return Re2Pattern(compiled, re2_form(key))
+    except re2.error:
+        return compiled
+
+
+def pattern_engine(pattern) -> str:
+    """Nazwa silnika, którym faktycznie wykonywany jest skompilowany wzorzec."""
+    return "re2" if isinstance(pattern, Re2Pattern) else "re"
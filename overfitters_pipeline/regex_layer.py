@@ -7,9 +7,69 @@ Zastosowano logikę i kolejność operacji z regex.py.
 
 import re
 from dataclasses import dataclass, field
-from typing import List, Optional, Dict, Set, Tuple
+from typing import Iterable, Iterator, List, Optional, Dict, Set, Tuple
 from enum import Enum
 import hashlib
+import logging
+import mmap
+import os
+import threading
+import time
+from array import array
+from multiprocessing import Pool, cpu_count
+
+from .address_scanner import AddressAnchorScanner
+from .digit_scanner import DigitRunScanner
+from .regex_engine import compile_bytes_pattern, compile_pattern, pattern_engine, resolve_engine
+from .regex_profile import RegexProfile
+
+logger = logging.getLogger("regex_layer")
+
+# NumPy - opcjonalna zależność (wsadowa walidacja PESEL)
+try:
+    import numpy as np
+    _NUMPY_AVAILABLE = True
+except ImportError:
+    np = None
+    _NUMPY_AVAILABLE = False
+
+# Dostępne silniki dla encji numerycznych (PESEL, konta, telefony)
+NUMERIC_ENGINES = ("regex", "scanner")
+
+# Dostępne silniki dla adresów
+ADDRESS_ENGINES = ("regex", "anchored")
+
+# Powyżej tylu kandydatów na PESEL w tekście suma kontrolna liczona jest wsadowo (NumPy)
+PESEL_BATCH_THRESHOLD = 16
+PESEL_WEIGHTS = (1, 3, 7, 9, 1, 3, 7, 9, 1, 3)
+
+# Tryb równoległy: minimalny rozmiar fragmentu tekstu (w znakach) i liczba fragmentów na workera
+PARALLEL_MIN_CHUNK = 65536
+PARALLEL_CHUNKS_PER_WORKER = 4
+
+# Znak, który nie może wystąpić wewnątrz adresu (adres składa się tylko z \w, \s, '.', '-', '/').
+# Żadne dopasowanie adresu nie przechodzi przez taki znak - pozycja za nim to punkt synchronizacji.
+_ADDRESS_BARRIER_RE = re.compile(r"[^\w\s./-]")
+_BARRIER_LOOKBEHIND = 4096
+
+# Cache wyników: liczba pasów (każdy z własną blokadą) przy współdzieleniu warstwy między wątkami
+CACHE_STRIPES = 16
+
+# Strumieniowanie (detect_iter): docelowy rozmiar bufora w znakach
+STREAM_CHUNK_SIZE = 65536
+
+# Znak, którego nie zawiera żaden wzorzec (ani \w, ani \s, ani literał wzorców) -
+# podział tekstu tuż za nim nie zmienia żadnego dopasowania ani asercji
+_HARD_SEPARATOR_RE = re.compile(r"[^\w\s./%+|()@-]")
+
+# Skanowanie plików (detect_file): docelowe okno w bajtach i te same separatory w ASCII
+# (bajt ASCII w UTF-8 zawsze jest całym znakiem)
+FILE_WINDOW_BYTES = 1 << 16
+_HARD_SEPARATOR_BYTES_RE = re.compile(
+    b"[" + re.escape(bytes(c for c in range(128) if _HARD_SEPARATOR_RE.match(chr(c)))) + b"]"
+)
+_UTF8_CONTINUATION_BYTES = bytes(range(0x80, 0xC0))
+_COUNT_PIECE_BYTES = 1 << 20
 
 
 class EntityType(Enum):
@@ -82,16 +142,225 @@ class DetectedEntity:
                 self.end == other.end)
 
 
+def _no_clock() -> float:
+    """Zegar detekcji przy wyłączonym profilowaniu (bez pomiaru)."""
+    return 0.0
+
+
+class _EntityCollector:
+    """Zbiera encje w kolejności priorytetu - encja nachodząca na wcześniejszą jest odrzucana."""
+
+    def __init__(self):
+        self.entities: List[Tuple[int, int, EntityType, float]] = []
+        self.occupied_ranges: Set[Tuple[int, int]] = set()
+
+    def is_occupied(self, start: int, end: int) -> bool:
+        for o_start, o_end in self.occupied_ranges:
+            # Check for overlap
+            if not (end <= o_start or start >= o_end):
+                return True
+        return False
+
+    def add(self, start: int, end: int, entity_type: EntityType, confidence: float) -> bool:
+        if self.is_occupied(start, end):
+            return False
+        self.entities.append((start, end, entity_type, confidence))
+        self.occupied_ranges.add((start, end))
+        return True
+
+    def rows(self) -> List[Tuple[int, int, EntityType, float]]:
+        """Encje posortowane po (start, -end)."""
+        self.entities.sort(key=lambda e: (e[0], -e[1]))
+        return self.entities
+
+
+class _StripedCache:
+    """
+    Cache wyników detekcji bezpieczny dla wątków.
+
+    Klucze rozdzielone są na pasy - każdy z własnym słownikiem i blokadą, więc
+    wątki czekają na siebie tylko przy dostępie do tego samego pasa. Sama
+    detekcja odbywa się poza blokadą (dwa wątki mogą policzyć ten sam tekst,
+    wynik jest identyczny). W pasie usuwane są najstarsze wpisy (FIFO).
+    """
+
+    def __init__(self, max_size: int, stripes: int = CACHE_STRIPES):
+        self._stripe_size = max(1, -(-max_size // stripes))
+        self._stripes = [({}, threading.Lock()) for _ in range(stripes)]
+
+    def _stripe(self, key: str):
+        return self._stripes[hash(key) % len(self._stripes)]
+
+    def get(self, key: str):
+        entries, lock = self._stripe(key)
+        with lock:
+            return entries.get(key)
+
+    def put(self, key: str, value) -> None:
+        entries, lock = self._stripe(key)
+        with lock:
+            entries[key] = value
+            while len(entries) > self._stripe_size:
+                del entries[next(iter(entries))]
+
+    def clear(self) -> None:
+        for entries, lock in self._stripes:
+            with lock:
+                entries.clear()
+
+    def __len__(self) -> int:
+        return sum(len(entries) for entries, _ in self._stripes)
+
+
+# Kod typu encji w formie kompaktowej = indeks w ENTITY_TYPES
+ENTITY_TYPES: Tuple[EntityType, ...] = tuple(EntityType)
+ENTITY_TYPE_CODES: Dict[EntityType, int] = {t: i for i, t in enumerate(ENTITY_TYPES)}
+
+
+class CompactEntity:
+    """
+    Lekka reprezentacja encji (__slots__, bez kopii tekstu i słownika morfologii).
+    Tekst encji odtwarzany jest dopiero przy konwersji do DetectedEntity.
+    """
+    __slots__ = ("start", "end", "type_code", "confidence")
+
+    def __init__(self, start: int, end: int, type_code: int, confidence: float):
+        self.start = start
+        self.end = end
+        self.type_code = type_code
+        self.confidence = confidence
+
+    @property
+    def entity_type(self) -> EntityType:
+        return ENTITY_TYPES[self.type_code]
+
+    def to_entity(self, text: str, source: str = 'regex') -> DetectedEntity:
+        """Konwersja do DetectedEntity (text = tekst źródłowy, z którego pochodzą offsety)."""
+        return DetectedEntity(
+            text=text[self.start:self.end],
+            entity_type=self.entity_type,
+            start=self.start,
+            end=self.end,
+            confidence=self.confidence,
+            source=source
+        )
+
+    def __repr__(self):
+        return f"CompactEntity({self.start}, {self.end}, {self.entity_type.value}, {self.confidence})"
+
+
+class EntityBatch:
+    """
+    Kolumnowy zbiór encji: równoległe tablice początków, końców, kodów typów
+    i pewności (oraz numerów tekstów dla wielu tekstów naraz).
+
+    Indeksowanie i iteracja zwracają DetectedEntity tworzone na żądanie;
+    compact(i) zwraca CompactEntity.
+    """
+    __slots__ = ("texts", "starts", "ends", "type_codes", "confidences", "doc_ids", "source")
+
+    def __init__(self, texts: List[str], starts: array, ends: array, type_codes: array,
+                 confidences: array, doc_ids: Optional[array] = None, source: str = 'regex'):
+        self.texts = texts
+        self.starts = starts
+        self.ends = ends
+        self.type_codes = type_codes
+        self.confidences = confidences
+        self.doc_ids = doc_ids  # None = wszystkie encje z texts[0]
+        self.source = source
+
+    @classmethod
+    def from_rows(cls, texts: List[str], rows_per_text: List[List[Tuple[int, int, EntityType, float]]]) -> "EntityBatch":
+        """Buduje batch z krotek (start, end, typ, pewność) - po jednej liście na tekst."""
+        starts, ends = array('q'), array('q')
+        type_codes, confidences = array('B'), array('d')
+        doc_ids = array('I') if len(texts) > 1 else None
+        for doc_id, rows in enumerate(rows_per_text):
+            for start, end, entity_type, confidence in rows:
+                starts.append(start)
+                ends.append(end)
+                type_codes.append(ENTITY_TYPE_CODES[entity_type])
+                confidences.append(confidence)
+            if doc_ids is not None:
+                doc_ids.extend([doc_id] * len(rows))
+        return cls(list(texts), starts, ends, type_codes, confidences, doc_ids)
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def doc_id(self, i: int) -> int:
+        return self.doc_ids[i] if self.doc_ids is not None else 0
+
+    def compact(self, i: int) -> CompactEntity:
+        return CompactEntity(self.starts[i], self.ends[i], self.type_codes[i], self.confidences[i])
+
+    def __getitem__(self, i: int) -> DetectedEntity:
+        return self.compact(i).to_entity(self.texts[self.doc_id(i)], self.source)
+
+    def __iter__(self) -> Iterator[DetectedEntity]:
+        for i in range(len(self)):
+            yield self[i]
+
+    def to_entities(self) -> List[DetectedEntity]:
+        return list(self)
+
+    def to_entity_lists(self) -> List[List[DetectedEntity]]:
+        """Encje pogrupowane po tekstach (jak wynik detect_many)."""
+        result: List[List[DetectedEntity]] = [[] for _ in self.texts]
+        for i in range(len(self)):
+            result[self.doc_id(i)].append(self[i])
+        return result
+
+
 class RegexLayer:
     """
     Warstwa regułowa do wykrywania encji o stałym formacie.
     Zapewnia wysoką precyzję i szybkość dla danych strukturalnych.
     """
     
-    def __init__(self, cache_size: int = 1024):
+    def __init__(self, cache_size: int = 1024, numeric_engine: str = "regex",
+                 pesel_batch_threshold: int = PESEL_BATCH_THRESHOLD, regex_engine: str = "re",
+                 address_engine: str = "regex", profile: bool = False):
+        """
+        Jedna instancja może być współdzielona przez wiele wątków - cache wyników
+        jest chroniony blokadami, a pozostały stan po konstrukcji jest tylko do odczytu.
+
+        Args:
+            cache_size: Maksymalna liczba wyników w cache
+            numeric_engine: "regex" (osobny wzorzec na każdy typ) lub
+                "scanner" (jednoprzebiegowy DigitRunScanner dla PESEL/kont/telefonów)
+            pesel_batch_threshold: Od ilu kandydatów na PESEL używać walidacji wsadowej
+            regex_engine: "re", "re2" (czas liniowy, google-re2) lub "auto"
+            address_engine: "regex" (wzorzec przy każdej granicy słowa) lub
+                "anchored" (wzorzec tylko od prefiksów znalezionych automatem Aho-Corasick)
+            profile: Zbieraj statystyki każdego wzorca (czas, dopasowania, odrzucenia)
+                w self.profile - także z workerów detect_parallel
+        """
+        if numeric_engine not in NUMERIC_ENGINES:
+            raise ValueError(f"Nieznany silnik numeryczny: {numeric_engine!r} (dostępne: {NUMERIC_ENGINES})")
+        if address_engine not in ADDRESS_ENGINES:
+            raise ValueError(f"Nieznany silnik adresów: {address_engine!r} (dostępne: {ADDRESS_ENGINES})")
         self._cache_size = cache_size
+        self._pesel_batch_threshold = pesel_batch_threshold
+        self.numeric_engine = numeric_engine
+        self._digit_scanner = DigitRunScanner() if numeric_engine == "scanner" else None
+        self.address_engine = address_engine
+        self._address_scanner = AddressAnchorScanner() if address_engine == "anchored" else None
+        self.regex_engine = resolve_engine(regex_engine)
+        self.profile: Optional[RegexProfile] = RegexProfile() if profile else None
+        # Konfiguracja do odtworzenia warstwy w workerach trybu równoległego
+        self._config = {
+            "cache_size": cache_size,
+            "numeric_engine": numeric_engine,
+            "pesel_batch_threshold": pesel_batch_threshold,
+            "regex_engine": self.regex_engine,
+            "address_engine": address_engine,
+            "profile": profile,
+        }
         self._compile_patterns()
-        self._result_cache: Dict[str, List[DetectedEntity]] = {}
+        self._bytes_patterns: Optional[Dict] = None
+        self._bytes_patterns_lock = threading.Lock()
+        self._result_cache = _StripedCache(cache_size)
     
     def _compile_patterns(self):
         """Kompiluje wszystkie wzorce regex."""
@@ -104,7 +373,7 @@ class RegexLayer:
         # 2. Dodano obsługę skrótów [a-zA-Z]{1,3}\. (np. mjr., św., al.).
         # 3. Dodano obsługę cyfr w nazwie ulicy TYLKO jeśli są one częścią nazwy (np. 3 Maja),
         #    sprawdzając lookaheadem czy po cyfrze następuje Wielka Litera (np. 3 Maja -> OK, 5 i ma -> NIE).
-        self.address_regex = re.compile(
+        self.address_regex = self._compile("address",
             r"\b(?i:ul\.|ulica|al\.|aleja|aleje|pl\.|plac|os\.|osiedle|skwer|rondo)\s+"  # Prefiks
             r"("  # Grupa 1: Nazwa ulicy
                 r"(?:"
@@ -141,7 +410,7 @@ class RegexLayer:
         # =================================================================
         # KROK 2: PESEL
         # =================================================================
-        self.pesel_regex = re.compile(r"\b\d{11}\b")
+        self.pesel_regex = self._compile("pesel", r"\b\d{11}\b")
 
         # =================================================================
         # KROK 3: Wiek
@@ -162,15 +431,15 @@ class RegexLayer:
         # =================================================================
         # LEGACY: Model ML radzi sobie lepiej z username, secret, dokumentami i datami.
         self.simple_patterns = [
-            (EntityType.EMAIL, re.compile(r"\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b")),
+            (EntityType.EMAIL, self._compile("email", r"\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b")),
             
             # POPRAWKA 1: Username
             # Wymusza, by ostatni znak NIE był kropką (żeby nie zjadać kropki kończącej zdanie)
             # (EntityType.USERNAME, re.compile(r"(?<![\w])@[\w](?:[\w._-]*[\w_-])?")), 
             
             # (EntityType.SECRET, re.compile(r"Bearer\s+[a-zA-Z0-9\-\._~+/]+=*")),
-            (EntityType.BANK_ACCOUNT, re.compile(r"\b(?i:PL)[ ]?\d{2}(?:[ ]?\d{4}){6}\b")),  # Full Polish IBAN: PL dd dddd dddd dddd dddd dddd dddd
-            (EntityType.BANK_ACCOUNT, re.compile(r"\b\d{4}[ ]\d{4}[ ]\d{4}[ ]\d{4}\b")),  # 4x4 digits with spaces: 1234 0234 9054 0012
+            (EntityType.BANK_ACCOUNT, self._compile("bank_account_iban", r"\b(?i:PL)[ ]?\d{2}(?:[ ]?\d{4}){6}\b")),  # Full Polish IBAN: PL dd dddd dddd dddd dddd dddd dddd
+            (EntityType.BANK_ACCOUNT, self._compile("bank_account_grouped", r"\b\d{4}[ ]\d{4}[ ]\d{4}[ ]\d{4}\b")),  # 4x4 digits with spaces: 1234 0234 9054 0012
             # (EntityType.CREDIT_CARD_NUMBER, re.compile(r"(?<!\d)(?<!\d[ -])(?:(?:\d{4} \d{4} \d{4} \d{4})|(?:\d{4}-\d{4}-\d{4}-\d{4}))(?!\d)")),
             
             # POPRAWKA 2: Telefon
@@ -178,13 +447,13 @@ class RegexLayer:
             # - WITHOUT prefix: requires at least one separator to avoid matching random 9-digit numbers
             
             # Mobile WITH international prefix (separators optional): +48 123456789 or +1 555 123 4567
-            (EntityType.PHONE, re.compile(r"(?<!\w)(?:(?:\+|00)\d{1,3}[ .-]?|\(\+?\d{1,3}\)[ .-]?)\d{3}[ .-]?\d{3}[ .-]?\d{3}(?!\w)")),
+            (EntityType.PHONE, self._compile("phone_mobile_prefixed", r"(?<!\w)(?:(?:\+|00)\d{1,3}[ .-]?|\(\+?\d{1,3}\)[ .-]?)\d{3}[ .-]?\d{3}[ .-]?\d{3}(?!\w)")),
             # Mobile WITHOUT prefix (separators REQUIRED): 123 456 789 or 123-456-789
-            (EntityType.PHONE, re.compile(r"(?<!\w)\d{3}[ .-]\d{3}[ .-]\d{3}(?!\w)")),
+            (EntityType.PHONE, self._compile("phone_mobile", r"(?<!\w)\d{3}[ .-]\d{3}[ .-]\d{3}(?!\w)")),
             # Landline WITH prefix: +48 22 123 45 67
-            (EntityType.PHONE, re.compile(r"(?<!\w)(?:(?:\+|00)\d{1,3}[ .-]?|\(\+?\d{1,3}\)[ .-]?)\d{2}[ .-]?\d{3}[ .-]?\d{2}[ .-]?\d{2}(?!\w)")),
+            (EntityType.PHONE, self._compile("phone_landline_prefixed", r"(?<!\w)(?:(?:\+|00)\d{1,3}[ .-]?|\(\+?\d{1,3}\)[ .-]?)\d{2}[ .-]?\d{3}[ .-]?\d{2}[ .-]?\d{2}(?!\w)")),
             # Landline WITHOUT prefix (separators REQUIRED): 22 123 45 67 or (22) 123-45-67
-            (EntityType.PHONE, re.compile(r"(?<!\w)\(?\d{2}\)?[ .-]\d{3}[ .-]\d{2}[ .-]\d{2}(?!\w)"))
+            (EntityType.PHONE, self._compile("phone_landline", r"(?<!\w)\(?\d{2}\)?[ .-]\d{3}[ .-]\d{2}[ .-]\d{2}(?!\w)"))
 
             # (EntityType.DOCUMENT_NUMBER, re.compile(r"\b[A-Z]{3}\s?\d{6}\b", re.IGNORECASE)), # Dowód
             # (EntityType.DOCUMENT_NUMBER, re.compile(r"\b[A-Z]{2}\s?\d{7}\b")), # Paszport
@@ -192,6 +461,29 @@ class RegexLayer:
             # (EntityType.DATE, re.compile(r"\b\d{4}[-./]\d{1,2}[-./]\d{1,2}\b|\b\d{1,2}[-./]\d{1,2}[-./]\d{4}\b")),
         ]
 
+        # Nazwy wzorców z simple_patterns (ta sama kolejność) - klucze kształtów DigitRunScanner
+        self.simple_pattern_keys = [
+            "email",
+            "bank_account_iban",
+            "bank_account_grouped",
+            "phone_mobile_prefixed",
+            "phone_mobile",
+            "phone_landline_prefixed",
+            "phone_landline",
+        ]
+
+        # Silnik, którym faktycznie wykonywany jest każdy wzorzec (re2 może wrócić do re)
+        self.pattern_engines: Dict[str, str] = {
+            "address": pattern_engine(self.address_regex),
+            "pesel": pattern_engine(self.pesel_regex),
+        }
+        for key, (_, pattern) in zip(self.simple_pattern_keys, self.simple_patterns):
+            self.pattern_engines[key] = pattern_engine(pattern)
+
+    def _compile(self, key: str, pattern: str, flags: int = 0):
+        """Kompiluje wzorzec wybranym silnikiem regex (z powrotem do `re`)."""
+        return compile_pattern(key, pattern, flags, self.regex_engine)
+
     def _validate_pesel_checksum(self, pesel: str) -> bool:
         """
         Walidacja matematyczna numeru PESEL.
@@ -199,7 +491,7 @@ class RegexLayer:
         if len(pesel) != 11:
             return False
         
-        weights = [1, 3, 7, 9, 1, 3, 7, 9, 1, 3]
+        weights = PESEL_WEIGHTS
         
         try:
             checksum = sum(int(pesel[i]) * weights[i] for i in range(10))
@@ -209,6 +501,32 @@ class RegexLayer:
         except ValueError:
             return False
 
+    def _validate_pesel_checksums(self, pesels: List[str]) -> List[bool]:
+        """
+        Wsadowa walidacja PESEL: wszystkie kandydaty jako jedna macierz uint8,
+        wagi 1-3-7-9 nakładane jednym iloczynem macierzowym.
+        Dla małej liczby kandydatów (lub bez NumPy) - walidacja pojedyncza.
+        """
+        if not _NUMPY_AVAILABLE or len(pesels) <= self._pesel_batch_threshold:
+            return [self._validate_pesel_checksum(p) for p in pesels]
+        
+        joined = "".join(pesels)
+        if len(joined) != 11 * len(pesels) or not joined.isascii() or not joined.isdigit():
+            # Cyfry spoza ASCII (\d w Unicode) - walidacja pojedyncza
+            return [self._validate_pesel_checksum(p) for p in pesels]
+        
+        digits = (np.frombuffer(joined.encode("ascii"), dtype=np.uint8) - ord("0")).reshape(-1, 11)
+        checksum = digits[:, :10] @ np.array(PESEL_WEIGHTS, dtype=np.int32)
+        control_digit = (10 - checksum % 10) % 10
+        return (control_digit == digits[:, 10]).tolist()
+
+    @staticmethod
+    def _iter_spans(key: str, pattern, text: str, numeric_spans: Optional[Dict[str, List[Tuple[int, int]]]]):
+        """Zakresy dopasowań wzorca - z wyników skanera (jeśli obsługuje kształt) lub z regex."""
+        if numeric_spans is not None and key in numeric_spans:
+            return numeric_spans[key]
+        return (match.span() for match in pattern.finditer(text))
+
     def _get_text_hash(self, text: str) -> str:
         return hashlib.md5(text.encode()).hexdigest()
     
@@ -223,55 +541,87 @@ class RegexLayer:
         Returns:
             Lista wykrytych encji
         """
-        if use_cache:
-            text_hash = self._get_text_hash(text)
-            if text_hash in self._result_cache:
-                return self._result_cache[text_hash].copy()
-        
-        entities: List[DetectedEntity] = []
-        occupied_ranges: Set[Tuple[int, int]] = set()
-        
-        def is_occupied(start: int, end: int) -> bool:
-            for o_start, o_end in occupied_ranges:
-                # Check for overlap
-                if not (end <= o_start or start >= o_end):
-                    return True
-            return False
-        
-        def add_entity(entity: DetectedEntity) -> bool:
-            if is_occupied(entity.start, entity.end):
-                return False
-            entities.append(entity)
-            occupied_ranges.add((entity.start, entity.end))
-            return True
+        return [
+            DetectedEntity(text=text[start:end], entity_type=entity_type, start=start, end=end,
+                           confidence=confidence, source='regex')
+            for start, end, entity_type, confidence in self._rows(text, use_cache)
+        ]
+
+    def detect_compact(self, text: str, use_cache: bool = True) -> EntityBatch:
+        """detect() w postaci EntityBatch (kolumny offsetów/typów zamiast listy encji)."""
+        return EntityBatch.from_rows([text], [self._rows(text, use_cache)])
+
+    def detect_many(self, texts: List[str], use_cache: bool = True) -> List[List[DetectedEntity]]:
+        """Wykrywa encje w wielu tekstach (np. liniach) - lista list encji, po jednej na tekst."""
+        return [self.detect(text, use_cache=use_cache) for text in texts]
+
+    def detect_batch(self, texts: List[str], use_cache: bool = True) -> EntityBatch:
+        """detect_many() jako jeden EntityBatch z kolumną numerów tekstów (doc_ids)."""
+        return EntityBatch.from_rows(texts, [self._rows(text, use_cache) for text in texts])
+
+    def _rows(self, text: str, use_cache: bool) -> List[Tuple[int, int, EntityType, float]]:
+        """Wynik detekcji w postaci krotek - z cache lub liczony od nowa."""
+        if not use_cache:
+            return self._detect_rows(text)
+
+        text_hash = self._get_text_hash(text)
+        rows = self._result_cache.get(text_hash)
+        if rows is None:
+            rows = self._detect_rows(text)
+            self._result_cache.put(text_hash, rows)
+        return rows
+
+    def _detect_rows(self, text: str) -> List[Tuple[int, int, EntityType, float]]:
+        """Wykrywanie encji jako krotki (start, end, typ, pewność) posortowane po (start, -end)."""
+        collector = _EntityCollector()
+        profile = self.profile
+        # Bez profilowania pomiary czasu i liczniki nic nie robią
+        clock = time.perf_counter if profile is not None else _no_clock
+
+        def add_spans(key: str, spans, t_start: float, entity_type: EntityType, confidence: float,
+                      checksum_failures: int = 0):
+            if profile is None:
+                for start, end in spans:
+                    collector.add(start, end, entity_type, confidence)
+                return
+            # Czas samego skanowania - dodawanie encji poza pomiarem
+            spans = list(spans)
+            scan_time = clock() - t_start
+            rejected = 0
+            for start, end in spans:
+                if not collector.add(start, end, entity_type, confidence):
+                    rejected += 1
+            profile.record(key, scan_time, len(spans) + checksum_failures, rejected, checksum_failures)
 
         # =================================================================
         # KROK 1: Adresy
         # =================================================================
-        for match in self.address_regex.finditer(text):
-            add_entity(DetectedEntity(
-                text=match.group(),
-                entity_type=EntityType.ADDRESS,
-                start=match.start(),
-                end=match.end(),
-                confidence=0.90,
-                source='regex'
-            ))
+        t_start = clock()
+        if self._address_scanner:
+            # Silnik "anchored": wzorzec tylko od wystąpień prefiksów ulic
+            address_spans = self._address_scanner.scan(text, self.address_regex)
+        else:
+            address_spans = (match.span() for match in self.address_regex.finditer(text))
+        add_spans("address", address_spans, t_start, EntityType.ADDRESS, 0.90)
+
+        # Silnik "scanner": jedno przejście po ciągach cyfr zamiast osobnych regexów
+        numeric_spans = None
+        if self._digit_scanner:
+            t_start = clock()
+            numeric_spans = self._digit_scanner.scan(text)
+            if profile is not None:
+                profile.record("digit_scanner", clock() - t_start, 0)
 
         # =================================================================
         # KROK 2: PESEL z Walidacją
         # =================================================================
-        for match in self.pesel_regex.finditer(text):
-            pesel = match.group()
-            if self._validate_pesel_checksum(pesel):
-                add_entity(DetectedEntity(
-                    text=pesel,
-                    entity_type=EntityType.PESEL,
-                    start=match.start(),
-                    end=match.end(),
-                    confidence=0.99,
-                    source='regex'
-                ))
+        t_start = clock()
+        pesel_spans = list(self._iter_spans("pesel", self.pesel_regex, text, numeric_spans))
+        pesel_candidates = [text[start:end] for start, end in pesel_spans]
+        pesel_valid = self._validate_pesel_checksums(pesel_candidates)
+        valid_spans = [span for span, is_valid in zip(pesel_spans, pesel_valid) if is_valid]
+        add_spans("pesel", valid_spans, t_start, EntityType.PESEL, 0.99,
+                  checksum_failures=len(pesel_spans) - len(valid_spans))
 
         # =================================================================
         # KROK 3: Wiek
@@ -302,34 +652,313 @@ class RegexLayer:
         # =================================================================
         # KROK 4: Reszta prostych regexów
         # =================================================================
-        for entity_type, pattern in self.simple_patterns:
-            for match in pattern.finditer(text):
-                add_entity(DetectedEntity(
-                    text=match.group(),
-                    entity_type=entity_type,
-                    start=match.start(),
-                    end=match.end(),
-                    confidence=0.90,
-                    source='regex'
-                ))
-
-        entities.sort(key=lambda e: (e.start, -e.end))
-        
-        if use_cache:
-            self._result_cache[text_hash] = entities.copy()
-            if len(self._result_cache) > self._cache_size:
-                # Simple cleanup
-                keys = list(self._result_cache.keys())
-                for k in keys[:-self._cache_size]:
-                    del self._result_cache[k]
-        
-        return entities
+        for key, (entity_type, pattern) in zip(self.simple_pattern_keys, self.simple_patterns):
+            t_start = clock()
+            add_spans(key, self._iter_spans(key, pattern, text, numeric_spans), t_start, entity_type, 0.90)
+
+        if profile is not None:
+            profile.count_text()
+        return collector.rows()
     
+
     def clear_cache(self):
         """Czyści cache."""
         self._result_cache.clear()
 
+    # =================================================================
+    # TRYB RÓWNOLEGŁY
+    # =================================================================
+
+    def _crosses_split(self, text: str, chunk_start: int, newline: int) -> bool:
+        """
+        Czy jakiekolwiek dopasowanie w tekście przechodzi przez znak nowej linii `newline`.
+
+        Poza adresem żaden wzorzec nie dopasowuje znaku nowej linii, a ich asercje
+        (\\b, (?<!\\w), (?!\\w)) widzą po obu stronach granicy znak spoza \\w - tak samo
+        jak na brzegu fragmentu. Wystarczy więc sprawdzić adresy w oknie między
+        barierami (znakami spoza adresu) wokół granicy; początek bieżącego fragmentu
+        jest bezpieczny, więc również może pełnić rolę bariery.
+        """
+        window_start = chunk_start
+        for barrier in _ADDRESS_BARRIER_RE.finditer(text, max(chunk_start, newline - _BARRIER_LOOKBEHIND), newline):
+            window_start = barrier.end()
+        barrier = _ADDRESS_BARRIER_RE.search(text, newline)
+        window_end = barrier.start() if barrier else len(text)
+
+        for match in self.address_regex.finditer(text[window_start:window_end]):
+            if match.start() + window_start <= newline < match.end() + window_start:
+                return True
+        return False
+
+    def split_chunks(self, text: str, chunk_size: int) -> List[Tuple[int, int]]:
+        """
+        Dzieli tekst na fragmenty (start, end) na granicach linii tak, aby żadna encja
+        nie przechodziła przez granicę fragmentu. Fragmenty pokrywają cały tekst.
+        """
+        chunks = []
+        start = 0
+        while start < len(text):
+            end = len(text)
+            newline = text.find('\n', start + chunk_size)
+            while newline != -1:
+                if not self._crosses_split(text, start, newline):
+                    end = newline + 1
+                    break
+                newline = text.find('\n', newline + 1)
+            chunks.append((start, end))
+            start = end
+        return chunks
+
+    def detect_parallel(self, text: str, num_workers: Optional[int] = None,
+                        chunk_size: Optional[int] = None) -> List[DetectedEntity]:
+        """
+        Wykrywa encje w dużym tekście w puli procesów.
+
+        Tekst dzielony jest na fragmenty na granicach linii, każdy worker kompiluje
+        wzorce raz (przy starcie), a encje wracają z offsetami globalnymi.
+        Wynik jest identyczny z detect(text).
+
+        Args:
+            text: Tekst do analizy
+            num_workers: Liczba procesów (domyślnie = liczba rdzeni CPU)
+            chunk_size: Docelowy rozmiar fragmentu w znakach
+                (domyślnie PARALLEL_CHUNKS_PER_WORKER fragmentów na workera)
+        """
+        if num_workers is None:
+            num_workers = cpu_count() or 1
+        if chunk_size is None:
+            chunk_size = max(PARALLEL_MIN_CHUNK, len(text) // (num_workers * PARALLEL_CHUNKS_PER_WORKER))
+
+        chunks = self.split_chunks(text, chunk_size) if num_workers > 1 else []
+        if len(chunks) < 2:
+            return self.detect(text, use_cache=False)
+
+        args_list = [(start, text[start:end]) for start, end in chunks]
+        with Pool(processes=min(num_workers, len(chunks)), initializer=_init_regex_worker,
+                  initargs=(self._config,)) as pool:
+            results = pool.map(_detect_chunk, args_list, chunksize=1)
+
+        # Fragmenty są rozłączne i uporządkowane - sklejenie zachowuje sortowanie (start, -end)
+        entities: List[DetectedEntity] = []
+        for chunk_entities, chunk_profile in results:
+            entities.extend(chunk_entities)
+            if chunk_profile is not None:
+                self.profile.merge(chunk_profile)
+        return entities
+
+
+    # =================================================================
+    # TRYB STRUMIENIOWY
+    # =================================================================
+
+    def _stream_split(self, buffer: str, start: int = 0, end: Optional[int] = None) -> int:
+        """
+        Bezpieczny punkt podziału bufora strumienia w zakresie (start, end] (0 = brak).
+
+        Najpierw szuka ostatniego separatora, którego nie zawiera żaden wzorzec
+        (np. przecinek). W przeciwnym razie końca linii, przez który nie przechodzi
+        adres - sprawdzane tylko, gdy za linią w buforze jest już bariera adresu,
+        bo dalsza część strumienia mogłaby dopasowanie przedłużyć.
+        """
+        if end is None:
+            end = len(buffer)
+        split = 0
+        for separator in _HARD_SEPARATOR_RE.finditer(buffer, max(start, end - _BARRIER_LOOKBEHIND), end):
+            split = separator.end()
+        if split:
+            return split
+
+        newline = buffer.rfind('\n', start, end)
+        while newline > start + (end - start) // 2:
+            if _ADDRESS_BARRIER_RE.search(buffer, newline) and not self._crosses_split(buffer, start, newline):
+                return newline + 1
+            newline = buffer.rfind('\n', start, newline)
+        return 0
+
+    def _detect_shifted(self, text: str, offset: int) -> List[DetectedEntity]:
+        """detect() fragmentu z offsetami przesuniętymi do pozycji globalnych."""
+        entities = self.detect(text, use_cache=False)
+        for entity in entities:
+            entity.start += offset
+            entity.end += offset
+        return entities
+
+    def detect_iter(self, stream: Iterable[str], chunk_size: int = STREAM_CHUNK_SIZE) -> Iterator[DetectedEntity]:
+        """
+        Wykrywa encje w strumieniu fragmentów tekstu (np. linii pliku).
+
+        Fragmenty są buforowane do `chunk_size` znaków, a bufor dzielony w punkcie,
+        przez który nie przechodzi żadna encja - dopasowania na granicy fragmentów
+        strumienia są więc wykrywane poprawnie. Encje zwracane są w kolejności
+        offsetów (globalnych dla całego strumienia), identycznie jak detect()
+        na połączonym tekście. Pamięć ogranicza rozmiar bufora.
+
+        Args:
+            stream: Iterowalny zbiór fragmentów tekstu
+            chunk_size: Docelowy rozmiar bufora w znakach
+        """
+        pending: List[str] = []
+        pending_len = 0
+        next_attempt = chunk_size
+        offset = 0
+
+        for piece in stream:
+            pending.append(piece)
+            pending_len += len(piece)
+            if pending_len < next_attempt:
+                continue
+
+            # Duży fragment dzielimy na kilka okien - koszt detect() rośnie
+            # szybciej niż liniowo z rozmiarem tekstu
+            buffer = "".join(pending)
+            pos = 0
+            while len(buffer) - pos >= next_attempt:
+                split = self._stream_split(buffer, pos, pos + next_attempt)
+                if not split:
+                    # Brak bezpiecznego punktu - próbujemy z dwa razy większym oknem
+                    next_attempt *= 2
+                    continue
+                yield from self._detect_shifted(buffer[pos:split], offset + pos)
+                pos = split
+                next_attempt = chunk_size
+
+            offset += pos
+            pending = [buffer[pos:]]
+            pending_len = len(buffer) - pos
+
+        tail = "".join(pending)
+        if tail:
+            yield from self._detect_shifted(tail, offset)
+
+
+    # =================================================================
+    # SKANOWANIE PLIKÓW (MMAP)
+    # =================================================================
+
+    def _get_bytes_patterns(self) -> Optional[Dict]:
+        """Formy bajtowe (UTF-8) wszystkich wzorców - kompilowane przy pierwszym użyciu."""
+        if self._bytes_patterns is None:
+            with self._bytes_patterns_lock:
+                if self._bytes_patterns is None:
+                    sources = {"address": self.address_regex, "pesel": self.pesel_regex}
+                    for key, (_, pattern) in zip(self.simple_pattern_keys, self.simple_patterns):
+                        sources[key] = pattern
+                    patterns = {key: compile_bytes_pattern(key, pattern.pattern) for key, pattern in sources.items()}
+                    self._bytes_patterns = patterns if all(patterns.values()) else {}
+        return self._bytes_patterns or None
+
+    @staticmethod
+    def _file_split(data, start: int, window: int) -> int:
+        """Koniec okna pliku: tuż za ostatnim separatorem ASCII (lub koniec pliku)."""
+        end = start + window
+        while end < len(data):
+            split = 0
+            for separator in _HARD_SEPARATOR_BYTES_RE.finditer(data, start, end):
+                split = separator.end()
+            if split:
+                return split
+            # Brak separatora w oknie - powiększamy okno
+            end += window
+        return len(data)
+
+    def _detect_byte_rows(self, data, start: int, end: int, patterns: Dict) -> List[Tuple[int, int, EntityType, float]]:
+        """Odpowiednik _detect_rows na bajtach UTF-8 data[start:end] (offsety bajtowe)."""
+        collector = _EntityCollector()
+
+        for s, e in patterns["address"].spans(data, start, end):
+            collector.add(s, e, EntityType.ADDRESS, 0.90)
+
+        pesel_spans = list(patterns["pesel"].spans(data, start, end))
+        pesel_candidates = [data[s:e].decode("utf-8") for s, e in pesel_spans]
+        for (s, e), is_valid in zip(pesel_spans, self._validate_pesel_checksums(pesel_candidates)):
+            if is_valid:
+                collector.add(s, e, EntityType.PESEL, 0.99)
+
+        for key, (entity_type, _) in zip(self.simple_pattern_keys, self.simple_patterns):
+            for s, e in patterns[key].spans(data, start, end):
+                collector.add(s, e, entity_type, 0.90)
+
+        return collector.rows()
+
+    @staticmethod
+    def _count_chars(data, start: int, end: int) -> int:
+        """Liczba znaków UTF-8 w data[start:end] (bajty poza bajtami kontynuacji)."""
+        count = 0
+        for piece_start in range(start, end, _COUNT_PIECE_BYTES):
+            piece = data[piece_start:min(end, piece_start + _COUNT_PIECE_BYTES)]
+            count += len(piece.translate(None, _UTF8_CONTINUATION_BYTES))
+        return count
+
+    def detect_file(self, path: str, window_bytes: int = FILE_WINDOW_BYTES) -> Iterator[DetectedEntity]:
+        """
+        Wykrywa encje w pliku UTF-8 bez dekodowania go do str.
+
+        Plik jest mapowany do pamięci (mmap), a bajtowe formy wzorców (google-re2)
+        działają bezpośrednio na mapowaniu, oknami podzielonymi za separatorem,
+        przez który nie przechodzi żadna encja. Na znaki przeliczane są tylko offsety
+        dopasowań. Offsety odnoszą się do tekstu data.decode("utf-8") (bez zamiany
+        końców linii) - wynik jest identyczny z detect() na tym tekście.
+
+        Bez google-re2 plik czytany jest strumieniowo przez detect_iter().
+        """
+        patterns = self._get_bytes_patterns()
+        if patterns is None:
+            logger.warning("google-re2 nie jest dostępny - skanowanie pliku przez detect_iter().")
+            with open(path, "r", encoding="utf-8", newline="") as f:
+                yield from self.detect_iter(f)
+            return
+
+        with open(path, "rb") as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                byte_pos = char_pos = 0
+                start = 0
+                while start < len(data):
+                    end = self._file_split(data, start, window_bytes)
+                    for s, e, entity_type, confidence in self._detect_byte_rows(data, start, end, patterns):
+                        char_pos += self._count_chars(data, byte_pos, s)
+                        byte_pos = s
+                        text = data[s:e].decode("utf-8")
+                        yield DetectedEntity(text=text, entity_type=entity_type, start=char_pos,
+                                             end=char_pos + len(text), confidence=confidence, source='regex')
+                    start = end
+
+
+# ================= WORKERY TRYBU RÓWNOLEGŁEGO =================
+
+_worker_layer: Optional[RegexLayer] = None
+
+
+def _init_regex_worker(config: Dict):
+    """Inicjalizacja workera: wzorce kompilowane raz na proces."""
+    global _worker_layer
+    _worker_layer = RegexLayer(**config)
+
+
+def _detect_chunk(args: Tuple[int, str]):
+    """
+    Wykrywa encje we fragmencie i przesuwa offsety do pozycji globalnych.
+    Zwraca (encje, statystyki profilu fragmentu albo None bez profilowania).
+    """
+    offset, chunk = args
+    entities = _worker_layer._detect_shifted(chunk, offset)
+    profile = _worker_layer.profile
+    return entities, profile.take() if profile is not None else None
+
+
 if __name__ == "__main__":
+    import sys
+
+    # python -m overfitters_pipeline.regex_layer --profile-regex plik.txt
+    if len(sys.argv) == 3 and sys.argv[1] == "--profile-regex":
+        layer = RegexLayer(profile=True)
+        with open(sys.argv[2], encoding="utf-8") as f:
+            for line in f:
+                layer.detect(line, use_cache=False)
+        print(layer.profile.format())
+        sys.exit(0)
+
     layer = RegexLayer()
     
     test_cases = [
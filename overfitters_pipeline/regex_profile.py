@@ -0,0 +1,111 @@
+"""
+Profilowanie warstwy Regex - koszt i skuteczność każdego wzorca osobno.
+
+Włączane przez RegexLayer(profile=True). Dla każdego wzorca (adres, PESEL,
+email, konta, telefony) zbierane są:
+- łączny czas skanowania (dla PESEL razem z walidacją sumy kontrolnej),
+- liczba dopasowań,
+- dopasowania odrzucone, bo nachodzą na encję o wyższym priorytecie (is_occupied),
+- kandydaci na PESEL z błędną sumą kontrolną.
+
+Przy wyłączonym profilowaniu pomiary w RegexLayer._detect_rows nic nie robią.
+Workery detect_parallel profilują swoje fragmenty; ich statystyki (take())
+są doliczane do profilu warstwy w procesie głównym (merge()).
+"""
+
+import threading
+from dataclasses import asdict, dataclass
+from typing import Dict, Tuple
+
+
+@dataclass
+class PatternStats:
+    """Skumulowane statystyki jednego wzorca."""
+    scan_time: float = 0.0
+    matches: int = 0
+    rejected: int = 0
+    checksum_failures: int = 0
+
+
+class RegexProfile:
+    """Statystyki wzorców zbierane przez RegexLayer (bezpieczne dla wątków)."""
+
+    def __init__(self):
+        self.texts = 0
+        self.patterns: Dict[str, PatternStats] = {}
+        self._lock = threading.Lock()
+
+    def record(self, key: str, scan_time: float, matches: int,
+               rejected: int = 0, checksum_failures: int = 0) -> None:
+        """Dolicza wynik jednego przebiegu wzorca `key` po jednym tekście."""
+        with self._lock:
+            stats = self.patterns.get(key)
+            if stats is None:
+                stats = self.patterns[key] = PatternStats()
+            stats.scan_time += scan_time
+            stats.matches += matches
+            stats.rejected += rejected
+            stats.checksum_failures += checksum_failures
+
+    def count_text(self) -> None:
+        with self._lock:
+            self.texts += 1
+
+    def take(self) -> Tuple[int, Dict[str, PatternStats]]:
+        """Zebrane statystyki (liczba tekstów, wzorce) - profil zaczyna od zera."""
+        with self._lock:
+            state = (self.texts, self.patterns)
+            self.texts = 0
+            self.patterns = {}
+        return state
+
+    def merge(self, state: Tuple[int, Dict[str, PatternStats]]) -> None:
+        """Dolicza statystyki z take() innego profilu (np. workera)."""
+        texts, patterns = state
+        with self._lock:
+            self.texts += texts
+            for key, other in patterns.items():
+                stats = self.patterns.get(key)
+                if stats is None:
+                    stats = self.patterns[key] = PatternStats()
+                stats.scan_time += other.scan_time
+                stats.matches += other.matches
+                stats.rejected += other.rejected
+                stats.checksum_failures += other.checksum_failures
+
+    def reset(self) -> None:
+        with self._lock:
+            self.texts = 0
+            self.patterns.clear()
+
+    def report(self) -> Dict:
+        """
+        Raport w postaci słownika (np. do zapisu jako JSON):
+        {"texts": N, "total_scan_time": s, "patterns": {klucz: {scan_time, matches,
+        rejected, checksum_failures, time_share}}} - wzorce od najdroższego.
+        """
+        with self._lock:
+            total = sum(stats.scan_time for stats in self.patterns.values())
+            ranked = sorted(self.patterns.items(), key=lambda item: item[1].scan_time, reverse=True)
+            patterns = {}
+            for key, stats in ranked:
+                row = asdict(stats)
+                row["time_share"] = stats.scan_time / total if total else 0.0
+                patterns[key] = row
+            return {"texts": self.texts, "total_scan_time": total, "patterns": patterns}
+
+    def format(self) -> str:
+        """Raport jako tabela tekstowa."""
+        report = self.report()
+        lines = [
+            f"Profil warstwy Regex ({report['texts']} tekstów, "
+            f"skanowanie łącznie {report['total_scan_time'] * 1000:.1f} ms)",
+            f"{'wzorzec':26s} {'czas [ms]':>10s} {'udział':>7s} {'dopasowań':>10s} "
+            f"{'odrzuconych':>12s} {'zła suma':>9s}",
+        ]
+        for key, row in report["patterns"].items():
+            lines.append(
+                f"{key:26s} {row['scan_time'] * 1000:10.1f} {row['time_share']:7.1%} {row['matches']:10d} "
+                f"{row['rejected']:12d} {row['checksum_failures']:9d}"
+            )
+        return "\n".join(lines)
@@ -0,0 +1,168 @@
+"""
+Wspólna dla workerów tablica analiz Morfeusza w multiprocessing.shared_memory.
+
+Cache LRU w LineProcessor jest osobny w każdym procesie, więc słowo
+przeanalizowane przez jednego workera po starcie puli jest chybieniem dla
+pozostałych. Ta tablica jest kolejnym poziomem cache, wspólnym dla puli:
+
+    nagłówek: zajęte bajty areny (u64), liczba wpisów (u64)
+    sloty (adresowanie otwarte, sondowanie liniowe): crc32 słowa, crc32 rekordu,
+        przesunięcie, długość (4 x u32)
+    arena: rekordy - słowo UTF-8, \\0, analizy (JSON, analysis_store.encode_analyses)
+
+- Odczyt bez blokady: slot jest publikowany ostatnim zapisem (długość > 0),
+  a przed dekodowaniem sprawdzane są słowo i suma kontrolna całego rekordu,
+  więc niedokończony (lub widoczny w innej kolejności) zapis daje chybienie,
+  nie niepełne dane.
+- Zapis pod multiprocessing.Lock (przydział miejsca w arenie i slotu). Gdy
+  blokady nie da się uzyskać w LOCK_TIMEOUT (np. worker zginął, trzymając
+  ją), wpis jest pomijany. Po zapełnieniu areny lub slotów (ponad MAX_LOAD)
+  nowe wpisy są pomijane.
+- Wpisów się nie usuwa - rozmiar tablicy ogranicza rozmiar bloku pamięci.
+"""
+
+import multiprocessing
+import os
+import struct
+import zlib
+from multiprocessing import resource_tracker, shared_memory
+from typing import List, Optional
+
+from .analysis_store import decode_analyses, encode_analyses
+
+# Domyślna liczba slotów (potęga dwójki) i rozmiar areny rekordów (bajty) - ok. 100 tys. słów,
+# ok. 18 MB w /dev/shm (strony zajmowane dopiero przy zapisie)
+TABLE_SLOTS = 2 ** 17
+TABLE_ARENA_BYTES = 16 * 2 ** 20
+
+# Najwyższe dopuszczalne wypełnienie slotów
+MAX_LOAD = 0.75
+
+# Maksymalny czas oczekiwania na blokadę zapisu (sekundy) - potem wpis jest pomijany
+LOCK_TIMEOUT = 1.0
+
+_HEADER = struct.Struct("<QQ")
+_SLOT = struct.Struct("<IIII")
+_LENGTH = struct.Struct("<I")
+_LENGTH_OFFSET = 12  # położenie długości w slocie
+
+
+class SharedAnalysisTable:
+    """
+    Tablica słowo -> analizy we wspólnej pamięci (tworzona w procesie głównym
+    puli). context: kontekst multiprocessing procesów, które będą z niej
+    korzystać (domyślny, jak w Pool).
+    """
+
+    def __init__(self, slots: int = TABLE_SLOTS, arena_bytes: int = TABLE_ARENA_BYTES, context=None):
+        if slots & (slots - 1):
+            raise ValueError(f"Liczba slotów musi być potęgą dwójki: {slots}")
+        self.slots = slots
+        self.arena_bytes = arena_bytes
+        self._lock = (context or multiprocessing).Lock()
+        self._shm = shared_memory.SharedMemory(create=True, size=self._size())
+        # Blok usuwa tylko proces, który go utworzył (nie workery odziedziczone przez fork())
+        self._owner_pid = os.getpid()
+        self.hits = 0
+        self.misses = 0
+        self.dropped = 0
+
+    def _size(self) -> int:
+        return _HEADER.size + self.slots * _SLOT.size + self.arena_bytes
+
+    @property
+    def _arena_pos(self) -> int:
+        return _HEADER.size + self.slots * _SLOT.size
+
+    def __getstate__(self):
+        # Przekazanie do workera uruchamianego bez fork() - dołącza do istniejącego bloku
+        return self.slots, self.arena_bytes, self._lock, self._shm.name
+
+    def __setstate__(self, state):
+        self.slots, self.arena_bytes, self._lock, name = state
+        self._shm = shared_memory.SharedMemory(name=name)
+        # Blok należy do procesu głównego - worker nie może go usunąć przy wyjściu
+        resource_tracker.unregister(self._shm._name, "shared_memory")
+        self._owner_pid = None
+        self.hits = self.misses = self.dropped = 0
+
+    def __len__(self) -> int:
+        return _HEADER.unpack_from(self._shm.buf, 0)[1]
+
+    def _find(self, key: bytes, h: int):
+        """
+        (numer slotu, przesunięcie rekordu, długość, crc32 rekordu) - długość 0
+        oznacza wolny slot.
+        """
+        buf = self._shm.buf
+        mask = self.slots - 1
+        idx = h & mask
+        for _ in range(self.slots):
+            pos = _HEADER.size + idx * _SLOT.size
+            slot_hash, checksum, offset, length = _SLOT.unpack_from(buf, pos)
+            if not length:
+                return idx, 0, 0, 0
+            if slot_hash == h:
+                start = self._arena_pos + offset
+                if buf[start:start + len(key) + 1] == key + b"\0":
+                    return idx, start, length, checksum
+            idx = (idx + 1) & mask
+        return None, 0, 0, 0
+
+    def get(self, word: str) -> Optional[List]:
+        """Analizy słowa zapisane przez dowolny proces puli albo None."""
+        key = word.encode("utf-8")
+        _, start, length, checksum = self._find(key, zlib.crc32(key))
+        record = bytes(self._shm.buf[start:start + length]) if length else b""
+        if not length or zlib.crc32(record) != checksum:
+            self.misses += 1
+            return None
+        try:
+            analyses = decode_analyses(record[len(key) + 1:])
+        except ValueError:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return analyses
+
+    def put(self, word: str, analyses: List) -> bool:
+        """
+        Dodaje analizy słowa; False, gdy tablica jest pełna lub blokada zajęta
+        dłużej niż LOCK_TIMEOUT (wpis pominięty).
+        """
+        key = word.encode("utf-8")
+        record = key + b"\0" + encode_analyses(analyses)
+        h = zlib.crc32(key)
+        buf = self._shm.buf
+        if not self._lock.acquire(timeout=LOCK_TIMEOUT):
+            self.dropped += 1
+            return False
+        try:
+            used, count = _HEADER.unpack_from(buf, 0)
+            idx, _, length, _ = self._find(key, h)
+            if length:
+                return True
+            if idx is None or count + 1 > self.slots * MAX_LOAD or used + len(record) > self.arena_bytes:
+                self.dropped += 1
+                return False
+            start = self._arena_pos + used
+            buf[start:start + len(record)] = record
+            pos = _HEADER.size + idx * _SLOT.size
+            # Długość zapisywana na końcu - publikuje slot dla czytających bez blokady
+            _SLOT.pack_into(buf, pos, h, zlib.crc32(record), used, 0)
+            _LENGTH.pack_into(buf, pos + _LENGTH_OFFSET, len(record))
+            _HEADER.pack_into(buf, 0, used + len(record), count + 1)
+        finally:
+            self._lock.release()
+        return True
+
+    def stats(self) -> dict:
+        used, count = _HEADER.unpack_from(self._shm.buf, 0)
+        return {"entries": count, "arena_bytes": used, "hits": self.hits, "misses": self.misses,
+                "dropped": self.dropped}
+
+    def close(self) -> None:
+        """Odłącza blok; w procesie, który go utworzył, także go usuwa."""
+        self._shm.close()
+        if self._owner_pid == os.getpid():
+            self._shm.unlink()
@@ -0,0 +1,163 @@
+"""
+Wyrównywanie tokenów z kotwicami - dla długich linii w Detailed Labels.
+
+Levenshtein.opcodes na całej linii kosztuje czas kwadratowy względem liczby
+tokenów. Tekst zanonimizowany różni się od oryginału tylko w miejscach tagów,
+więc większość linii to długie, identyczne ciągi tokenów:
+- kotwice: ciągi ANCHOR_TOKENS tokenów występujące dokładnie raz w obu
+  liniach (wyszukiwane przez słownik krotek - hashowanie),
+- z kotwic wybierany jest najdłuższy rosnący podciąg (kolejność zgodna w obu liniach),
+- Levenshtein.opcodes liczony jest tylko dla krótkich przerw między kotwicami
+  (poszerzonych o ANCHOR_MARGIN tokenów z każdej strony).
+
+Gdy wyrównanie jest jednoznaczne (np. każdy tag zastępuje jeden token), wynik
+jest taki sam jak Levenshtein.opcodes na całej linii. Przy remisach (tag
+zastępujący kilka tokenów) może wybrać inne wyrównanie o tym samym koszcie.
+"""
+
+from bisect import bisect_left
+from collections import Counter
+from typing import Dict, List, Sequence, Tuple
+
+from rapidfuzz.distance import Levenshtein
+
+# Długość kotwicy (liczba kolejnych identycznych tokenów)
+ANCHOR_TOKENS = 8
+
+# Tokeny na brzegach kotwicy wyrównywane razem z przerwą (remisy przy brzegach)
+ANCHOR_MARGIN = 2
+
+# Od tylu tokenów (dłuższa z linii) używane jest wyrównanie z kotwicami
+ANCHORED_MIN_TOKENS = 10000
+
+Opcode = Tuple[str, int, int, int, int]
+
+# Różne tokeny domykające przerwę: Levenshtein.opcodes nie obcina wtedy wspólnego
+# sufiksu przerwy, więc wyrównuje ją jak w całej linii (przed kotwicą). Tokeny
+# z TOKEN_RE nigdy nie łączą znaku \x00 z literą.
+_GAP_END_A = "\x00a"
+_GAP_END_B = "\x00b"
+
+
+def _kgrams(tokens: Sequence[str], k: int) -> Tuple[List[tuple], Dict[tuple, int]]:
+    """k-gramy tokenów (krotki) i pozycje tych, które występują dokładnie raz."""
+    kgrams = list(zip(*[tokens[shift:] for shift in range(k)]))
+    positions = dict(zip(kgrams, range(len(kgrams))))
+    if len(positions) < len(kgrams):
+        counts = Counter(kgrams)
+        positions = {key: i for key, i in positions.items() if counts[key] == 1}
+    return kgrams, positions
+
+
+def _increasing_pairs(pairs: List[Tuple[int, int]]) -> List[Tuple[int, int]]:
+    """Najdłuższy podciąg par (i, j) posortowanych po i, rosnący także po j."""
+    tails = []       # j ostatniego elementu podciągu długości n + 1
+    tail_idx = []    # indeks tej pary w `pairs`
+    prev = [-1] * len(pairs)
+    for idx, (_, j) in enumerate(pairs):
+        n = bisect_left(tails, j)
+        if n:
+            prev[idx] = tail_idx[n - 1]
+        if n == len(tails):
+            tails.append(j)
+            tail_idx.append(idx)
+        else:
+            tails[n] = j
+            tail_idx[n] = idx
+    result = []
+    idx = tail_idx[-1] if tail_idx else -1
+    while idx != -1:
+        result.append(pairs[idx])
+        idx = prev[idx]
+    result.reverse()
+    return result
+
+
+def _anchor_blocks(a: Sequence[str], b: Sequence[str], k: int) -> List[Tuple[int, int, int]]:
+    """Rozłączne, uporządkowane bloki identycznych tokenów (i, j, długość)."""
+    kgrams_a, unique_a = _kgrams(a, k)
+    _, unique_b = _kgrams(b, k)
+    # Kandydaci co k tokenów w `a` - sąsiednie k-gramy jednej kotwicy łączą się w blok
+    pairs = []
+    for i in range(0, len(kgrams_a), k):
+        key = kgrams_a[i]
+        if key in unique_a:
+            j = unique_b.get(key)
+            if j is not None:
+                pairs.append((i, j))
+    blocks = []
+    for i, j in _increasing_pairs(pairs):
+        if blocks:
+            bi, bj, size = blocks[-1]
+            if i - bi == j - bj and i <= bi + size:
+                # Ta sama przekątna, nachodzące k-gramy - przedłużenie bloku
+                blocks[-1] = (bi, bj, i + k - bi)
+                continue
+            # Inna przekątna - obcięcie początku, by bloki były rozłączne
+            skip = max(bi + size - i, bj + size - j, 0)
+            if skip >= k:
+                continue
+            i, j = i + skip, j + skip
+            blocks.append((i, j, k - skip))
+        else:
+            blocks.append((i, j, k))
+    return blocks
+
+
+def _append(ops: List[Opcode], tag: str, i1: int, i2: int, j1: int, j2: int) -> None:
+    """Dodaje operację, łącząc ją z poprzednią tego samego typu."""
+    if ops and ops[-1][0] == tag and ops[-1][2] == i1 and ops[-1][4] == j1:
+        ops[-1] = (tag, ops[-1][1], i2, ops[-1][3], j2)
+    else:
+        ops.append((tag, i1, i2, j1, j2))
+
+
+def _align_gap(ops: List[Opcode], a, b, i1: int, i2: int, j1: int, j2: int) -> None:
+    if i1 == i2 and j1 == j2:
+        return
+    if j1 == j2:
+        _append(ops, "delete", i1, i2, j1, j2)
+    elif i1 == i2:
+        _append(ops, "insert", i1, i2, j1, j2)
+    else:
+        gap_a = list(a[i1:i2])
+        gap_b = list(b[j1:j2])
+        gap_a.append(_GAP_END_A)
+        gap_b.append(_GAP_END_B)
+        for tag, s1, s2, d1, d2 in Levenshtein.opcodes(gap_a, gap_b):
+            # Pominięcie tokenów domykających (zamiana z nimi staje się wstawieniem/usunięciem)
+            s2 = min(s2, i2 - i1)
+            d2 = min(d2, j2 - j1)
+            if s1 == s2 and d1 == d2:
+                continue
+            if s1 == s2:
+                tag = "insert"
+            elif d1 == d2:
+                tag = "delete"
+            _append(ops, tag, i1 + s1, i1 + s2, j1 + d1, j1 + d2)
+
+
+def anchored_opcodes(a: Sequence[str], b: Sequence[str], k: int = ANCHOR_TOKENS,
+                     margin: int = ANCHOR_MARGIN) -> List[Opcode]:
+    """
+    Operacje przekształcenia `a` w `b` (jak Levenshtein.opcodes) - pełne
+    wyrównanie tylko w przerwach między kotwicami.
+    """
+    ops: List[Opcode] = []
+    pos_a = pos_b = 0
+    for i, j, size in _anchor_blocks(a, b, k):
+        i, j, size = i + margin, j + margin, size - 2 * margin
+        if size <= 0:
+            continue
+        _align_gap(ops, a, b, pos_a, i, pos_b, j)
+        _append(ops, "equal", i, i + size, j, j + size)
+        pos_a, pos_b = i + size, j + size
+    _align_gap(ops, a, b, pos_a, len(a), pos_b, len(b))
+    return ops
+
+
+def align_tokens(a: Sequence[str], b: Sequence[str]):
+    """Levenshtein.opcodes dla krótkich linii, wyrównanie z kotwicami dla długich."""
+    if max(len(a), len(b)) < ANCHORED_MIN_TOKENS:
+        return Levenshtein.opcodes(a, b)
+    return anchored_opcodes(a, b)
@@ -0,0 +1,15 @@
+"""Wspólne pomocniki testów warstwy regex - porównywanie wykrytych encji."""
+
+
+def entity_tuples(entities):
+    """(tekst, typ, start, end) każdej encji - postać porównywana w testach."""
+    return [(e.text, e.entity_type, e.start, e.end) for e in entities]
+
+
+class SameEntitiesMixin:
+    """Dla unittest.TestCase: porównanie wyników detect() dwóch warstw."""
+
+    def assertSameEntities(self, text, expected_layer, actual_layer):
+        expected = expected_layer.detect(text, use_cache=False)
+        actual = actual_layer.detect(text, use_cache=False)
+        self.assertEqual(entity_tuples(expected), entity_tuples(actual), f"Engines differ for: {text!r}")
@@ -0,0 +1,52 @@
+import unittest
+import sys
+import os
+
+# Ensure the parent directory is in the python path so we can import overfitters_pipeline
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from entity_helpers import SameEntitiesMixin
+from overfitters_pipeline.regex_layer import RegexLayer, EntityType
+from overfitters_pipeline.address_scanner import AddressAnchorScanner, ADDRESS_PREFIXES, _trie_regex
+
+
+class TestAddressAnchorScanner(SameEntitiesMixin, unittest.TestCase):
+    def setUp(self):
+        self.regex_layer = RegexLayer(address_engine="regex")
+        self.anchored_layer = RegexLayer(address_engine="anchored")
+
+    def test_equivalence_with_regex_engine(self):
+        test_texts = [
+            "Mieszkam na ul. Długa 15/3 m. 4 w Krakowie.",
+            "Adres: al. Jana Pawła II 12a, os. Złotego Wieku 3, pl. gen. Andersa 7",
+            "ULICA 3 Maja 5, Aleje Ujazdowskie 10b lok 2, rondo ONZ 1, skwer im. J. Kowalskiego 8",
+            "kapl. Nowa 5, xul. Długa 3, na ul.ul. Polna 7",
+            "ıulica Leśna 4, İ ulıca Leśna 4, ſkwer Abc 4",
+            "Brak adresów w tym zdaniu, tylko plac zabaw.",
+            "",
+        ]
+        for text in test_texts:
+            self.assertSameEntities(text, self.regex_layer, self.anchored_layer)
+
+    def test_anchors_only_at_word_boundary(self):
+        scanner = AddressAnchorScanner()
+        text = "ul. A 1, kapl. B 2, Plac C 3"
+        self.assertEqual(scanner.anchors(text), [0, 20])
+
+    def test_trie_regex_finds_all_prefixes(self):
+        import re
+        trie = re.compile(_trie_regex(ADDRESS_PREFIXES))
+        for prefix in ADDRESS_PREFIXES:
+            self.assertEqual(trie.match(prefix).group(), prefix)
+
+    def test_detects_address(self):
+        entities = self.anchored_layer.detect("Mieszkam przy ul. Długiej 5.")
+        self.assertEqual([e.entity_type for e in entities], [EntityType.ADDRESS])
+
+    def test_unknown_engine(self):
+        with self.assertRaises(ValueError):
+            RegexLayer(address_engine="unknown")
+
+
+if __name__ == '__main__':
+    unittest.main()
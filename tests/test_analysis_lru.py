@@ -0,0 +1,52 @@
+import unittest
+import sys
+import os
+
+# Ensure the parent directory is in the python path so we can import overfitters_pipeline
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from overfitters_pipeline.detailed_labels import AnalysisLRU, LineProcessor
+
+
+ANALYSIS = [(0, 1, ('Kraków', 'Kraków', 'subst:sg:nom:m3', ['nazwa_geograficzna'], []))]
+
+
+class TestAnalysisLRU(unittest.TestCase):
+    def test_entry_limit_evicts_least_recently_used(self):
+        cache = AnalysisLRU(max_entries=2, max_bytes=None)
+        cache.put("a", ANALYSIS)
+        cache.put("b", ANALYSIS)
+        cache.get("a")
+        cache.put("c", ANALYSIS)
+
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("a"), ANALYSIS)
+        self.assertEqual(cache.get("c"), ANALYSIS)
+        self.assertEqual(cache.stats()["evictions"], 1)
+        self.assertEqual((cache.stats()["hits"], cache.stats()["misses"]), (3, 1))
+
+    def test_byte_limit(self):
+        cache = AnalysisLRU(max_entries=None, max_bytes=3000)
+        for i in range(100):
+            cache.put(f"słowo{i}", ANALYSIS)
+        stats = cache.stats()
+        self.assertLessEqual(stats["resident_bytes"], 3000)
+        self.assertGreater(stats["entries"], 0)
+        self.assertEqual(stats["entries"] + stats["evictions"], 100)
+
+    def test_empty_analysis_is_cached(self):
+        cache = AnalysisLRU()
+        cache.put("xyz", [])
+        self.assertEqual(cache.get("xyz"), [])
+
+    def test_line_processor_stats(self):
+        LineProcessor.init_worker()
+        LineProcessor.analyse_with_cache("Krakowie")
+        LineProcessor.analyse_with_cache("Krakowie")
+        stats = LineProcessor.cache_stats()
+        self.assertEqual((stats["hits"], stats["misses"], stats["entries"]), (1, 1, 1))
+        self.assertGreater(stats["resident_bytes"], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
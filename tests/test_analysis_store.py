@@ -0,0 +1,77 @@
+import unittest
+import sys
+import os
+import sqlite3
+import tempfile
+
+# Ensure the parent directory is in the python path so we can import overfitters_pipeline
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from overfitters_pipeline.analysis_store import MorfeuszAnalysisStore, decode_analyses, encode_analyses
+from overfitters_pipeline.detailed_labels import LineProcessor
+
+
+class FailingMorfeusz:
+    def analyse(self, word):
+        raise AssertionError(f"Morfeusz nie powinien być wywołany dla {word!r}")
+
+
+class TestAnalysisStore(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "store", "analyses.sqlite")
+
+    def tearDown(self):
+        if LineProcessor._store is not None:
+            LineProcessor._store.close()
+        LineProcessor._morfeusz = None
+        LineProcessor._store = None
+        LineProcessor._store_path = None
+        self.tmp.cleanup()
+
+    def test_roundtrip_keeps_tuples(self):
+        analyses = [(0, 1, ('Kowalski', 'Kowalski:Sm1', 'subst:sg:nom:m1', ['nazwisko'], []))]
+        store = MorfeuszAnalysisStore(self.path, "v1")
+        store.put("Kowalski", analyses)
+        store.close()
+
+        reloaded = MorfeuszAnalysisStore(self.path, "v1")
+        self.assertEqual(reloaded.get("Kowalski"), analyses)
+        self.assertIsInstance(reloaded.get("Kowalski")[0][2], tuple)
+        # Inna wersja słownika nie widzi wpisów
+        self.assertIsNone(MorfeuszAnalysisStore(self.path, "v2").get("Kowalski"))
+
+    def test_data_only_format(self):
+        analyses = [(0, 1, ('Krakowie', 'Kraków', 'subst:sg:loc:m3', ['nazwa_geograficzna'], []))]
+        self.assertEqual(decode_analyses(encode_analyses(analyses)), analyses)
+        with self.assertRaises(ValueError):
+            decode_analyses(b"\x80\x05N.")  # pickle
+
+        store = MorfeuszAnalysisStore(self.path, "v1")
+        store.put("Krakowie", analyses)
+        store.close()
+        conn = sqlite3.connect(self.path)
+        with conn:
+            conn.execute("UPDATE analyses_json SET data = ? WHERE word = ?", (b"\x80\x05N.", "Krakowie"))
+        conn.close()
+        with self.assertLogs("analysis_store", level="WARNING"):
+            self.assertIsNone(MorfeuszAnalysisStore(self.path, "v1").get("Krakowie"))
+
+    def test_missing_file(self):
+        store = MorfeuszAnalysisStore(self.path, "v1")
+        self.assertEqual(len(store), 0)
+        self.assertFalse(os.path.exists(self.path))
+
+    def test_line_processor_reuses_store(self):
+        LineProcessor.init_worker(self.path)
+        expected = LineProcessor.analyse_with_cache("Krakowie")
+        LineProcessor._store.close()
+
+        # Nowy "proces": analiza pochodzi z magazynu, bez wywołania Morfeusza
+        LineProcessor.init_worker(self.path)
+        LineProcessor._morfeusz = FailingMorfeusz()
+        self.assertEqual(LineProcessor.analyse_with_cache("Krakowie"), expected)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,49 @@
+import unittest
+import sys
+import os
+
+# Ensure the parent directory is in the python path so we can import overfitters_pipeline
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from entity_helpers import SameEntitiesMixin
+from overfitters_pipeline.regex_layer import RegexLayer, EntityType
+
+
+class TestDigitRunScanner(SameEntitiesMixin, unittest.TestCase):
+    def setUp(self):
+        self.regex_layer = RegexLayer(numeric_engine="regex")
+        self.scanner_layer = RegexLayer(numeric_engine="scanner")
+
+    def test_equivalence_with_regex_engine(self):
+        test_texts = [
+            "Mój PESEL to 90010112345.",
+            "PESEL: 02070803628, drugi 0207080362812 i a02070803628",
+            "Zadzwoń: +48 123 456 789 albo 0048123456789",
+            "Tel. (+48) 600-500-400, (22) 123-45-67, 22 123 45 67",
+            "Numer +1 555 123 4567 lub 123.456.789",
+            "Konto: PL61 1090 1014 0000 0712 1981 2874",
+            "Konto: pl 61109010140000071219812874 oraz 1234 0234 9054 0012",
+            "Ciąg 1234 5678 9012 3456 7890 i 111 222 333 444",
+            "a+48 123 456 789, 123 456 789abc, (22)123-45-67",
+            "ul. Długa 15/3, tel. 600 500 400",
+            "Brak liczb w tym zdaniu.",
+        ]
+        for text in test_texts:
+            self.assertSameEntities(text, self.regex_layer, self.scanner_layer)
+
+    def test_detects_numeric_types(self):
+        entities = self.scanner_layer.detect(
+            "PESEL 02070803628, tel. +48 600 500 400, konto PL61 1090 1014 0000 0712 1981 2874"
+        )
+        types = {e.entity_type for e in entities}
+        self.assertIn(EntityType.PESEL, types)
+        self.assertIn(EntityType.PHONE, types)
+        self.assertIn(EntityType.BANK_ACCOUNT, types)
+
+    def test_unknown_engine(self):
+        with self.assertRaises(ValueError):
+            RegexLayer(numeric_engine="unknown")
+
+
+if __name__ == '__main__':
+    unittest.main()
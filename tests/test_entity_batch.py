@@ -0,0 +1,52 @@
+import unittest
+import sys
+import os
+
+# Ensure the parent directory is in the python path so we can import overfitters_pipeline
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from overfitters_pipeline.regex_layer import RegexLayer, EntityType, EntityBatch, CompactEntity
+
+
+class TestEntityBatch(unittest.TestCase):
+    def setUp(self):
+        self.layer = RegexLayer()
+        self.texts = [
+            "PESEL 02070803628, tel. +48 600 500 400",
+            "Brak danych.",
+            "ul. Długa 15/3, email: jan.kowalski@example.com",
+        ]
+
+    def test_detect_compact_matches_entities(self):
+        for text in self.texts:
+            entities = self.layer.detect(text)
+            batch = self.layer.detect_compact(text)
+            self.assertIsInstance(batch, EntityBatch)
+            self.assertEqual(len(batch), len(entities))
+            self.assertEqual(batch.to_entities(), entities)
+            self.assertEqual([e.confidence for e in batch], [e.confidence for e in entities])
+        # detect() zawsze zwraca listę encji
+        self.assertIsInstance(self.layer.detect(self.texts[0]), list)
+
+    def test_detect_batch(self):
+        expected = self.layer.detect_many(self.texts)
+        batch = self.layer.detect_batch(self.texts)
+        self.assertEqual(batch.to_entity_lists(), expected)
+        self.assertEqual(list(batch.doc_ids), [0, 0, 2, 2])
+
+    def test_columns(self):
+        batch = self.layer.detect_compact("PESEL 02070803628, tel. +48 600 500 400")
+        self.assertEqual(list(batch.starts), [6, 24])
+        self.assertEqual(list(batch.ends), [17, 39])
+        self.assertEqual(batch.compact(0).entity_type, EntityType.PESEL)
+        self.assertEqual(batch.compact(1).entity_type, EntityType.PHONE)
+
+    def test_compact_entity_has_no_dict(self):
+        entity = CompactEntity(0, 3, 0, 0.9)
+        self.assertFalse(hasattr(entity, "__dict__"))
+        with self.assertRaises(AttributeError):
+            entity.text = "abc"
+
+
+if __name__ == '__main__':
+    unittest.main()
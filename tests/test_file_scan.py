@@ -0,0 +1,64 @@
+import unittest
+import sys
+import os
+import tempfile
+
+# Ensure the parent directory is in the python path so we can import overfitters_pipeline
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from entity_helpers import entity_tuples
+from overfitters_pipeline.regex_layer import RegexLayer
+from overfitters_pipeline.regex_engine import _RE2_AVAILABLE
+
+
+LINES = [
+    "Mój PESEL to 02070803628, tel. +48 600 500 400.",
+    "Mieszkam na ul. Długa 15/3 m. 4, email: żaneta.kowalska@example.com",
+    "Konto: PL61 1090 1014 0000 0712 1981 2874\r",
+    "Adres: ul.",
+    "Źródłowa 7",
+    "os. Złotego Wieku",
+    "3",
+    "Zażółć gęślą jaźń - bez danych osobowych",
+    "(22) 123-45-67 i 1234 0234 9054 0012",
+]
+
+
+class TestDetectFile(unittest.TestCase):
+    def setUp(self):
+        self.layer = RegexLayer()
+        self.text = "\n".join(LINES * 40)
+        with tempfile.NamedTemporaryFile("wb", suffix=".txt", delete=False) as f:
+            f.write(self.text.encode("utf-8"))
+            self.path = f.name
+
+    def tearDown(self):
+        os.unlink(self.path)
+
+    def test_matches_detect(self):
+        # Offsety znakowe (nie bajtowe) mimo polskich znaków i \r\n
+        expected = entity_tuples(self.layer.detect(self.text, use_cache=False))
+        for window_bytes in (16, 300, 1 << 16):
+            actual = entity_tuples(self.layer.detect_file(self.path, window_bytes=window_bytes))
+            self.assertEqual(expected, actual, f"window_bytes={window_bytes}")
+
+    @unittest.skipUnless(_RE2_AVAILABLE, "google-re2 nie jest zainstalowany")
+    def test_bytes_patterns_compiled(self):
+        self.assertTrue(self.layer._get_bytes_patterns())
+
+    def test_fallback_without_bytes_patterns(self):
+        # Jak bez google-re2: strumieniowo przez detect_iter(), ostrzeżenie w logu (nie na stdout)
+        self.layer._get_bytes_patterns = lambda: None
+        expected = entity_tuples(self.layer.detect(self.text, use_cache=False))
+        with self.assertLogs("regex_layer", level="WARNING"):
+            actual = entity_tuples(self.layer.detect_file(self.path))
+        self.assertEqual(expected, actual)
+
+    def test_empty_file(self):
+        with open(self.path, "wb"):
+            pass
+        self.assertEqual(list(self.layer.detect_file(self.path)), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,54 @@
+import unittest
+import sys
+import os
+
+# Ensure the parent directory is in the python path so we can import overfitters_pipeline
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from overfitters_pipeline.detailed_labels import (
+    KEEP_LABELS, DetailedLabelsPool, _label_slot, process_text_tokenized, tokenize_keep_delimiters,
+)
+
+
+LINES = [
+    ("Jan Kowalski mieszka w Krakowie.", "[name] [surname] mieszka w [city]."),
+    ("Pan Kowalski dzwonił, tel. 600 500 400", "Pan [surname] dzwonił, tel. [phone]"),
+    ("", ""),
+    ("Anna Nowak z Nowego Sącza", "[name] [surname] z [city]"),
+    ("Kowalski odpisał.", "[surname] odpisał."),
+]
+
+
+class TestLabelsDedup(unittest.TestCase):
+    def setUp(self):
+        self.original = "\n".join(orig for orig, _ in LINES * 4)
+        self.anonymized = "\n".join(anon for _, anon in LINES * 4)
+        self.expected = process_text_tokenized(self.original, self.anonymized, KEEP_LABELS, num_workers=1)
+
+    def test_label_slot(self):
+        tokens = tokenize_keep_delimiters("z Nowego Sącza, Kowalski.")
+        self.assertEqual(_label_slot("city", tokens, 2), ("city", ("Nowego",)))
+        self.assertEqual(_label_slot("surname", tokens, 7), ("surname", "Kowalski"))
+
+    def test_sequential_same_result(self):
+        stats = {}
+        result = process_text_tokenized(self.original, self.anonymized, KEEP_LABELS, num_workers=1,
+                                        dedup=True, stats=stats)
+        self.assertEqual(result, self.expected)
+        self.assertEqual(stats["lines"], 20)
+        self.assertEqual(stats["skipped"], 4)
+        self.assertEqual(stats["tags"], 32)
+        # Jan, Kowalski, Krakowie, Anna, Nowak, Nowego - każde analizowane raz
+        self.assertEqual(stats["unique"], 6)
+
+    def test_pool_same_result(self):
+        stats = {}
+        with DetailedLabelsPool(num_workers=2) as pool:
+            result = process_text_tokenized(self.original, self.anonymized, KEEP_LABELS, pool=pool,
+                                            dedup=True, stats=stats)
+        self.assertEqual(result, self.expected)
+        self.assertEqual(stats["unique"], 6)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,79 @@
+import unittest
+import sys
+import os
+
+# Ensure the parent directory is in the python path so we can import overfitters_pipeline
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from overfitters_pipeline import detailed_labels
+from overfitters_pipeline.detailed_labels import (
+    EXECUTORS, KEEP_LABELS, DetailedLabelsPool, ExecutorCostModel, choose_executor, make_executor,
+    process_text_tokenized,
+)
+
+
+LINES = [
+    ("Jan Kowalski mieszka w Krakowie.", "[name] [surname] mieszka w [city]."),
+    ("Tel. 600 500 400", "Tel. [phone]"),
+    ("Anna Nowak z Nowego Sącza", "[name] [surname] z [city]"),
+]
+
+
+class TestLabelsExecutor(unittest.TestCase):
+    def setUp(self):
+        self.original = "\n".join(orig for orig, _ in LINES * 5)
+        self.anonymized = "\n".join(anon for _, anon in LINES * 5)
+        self.expected = process_text_tokenized(self.original, self.anonymized, KEEP_LABELS, num_workers=1)
+
+    def test_all_executors_same_result(self):
+        with DetailedLabelsPool(num_workers=2) as pool:
+            for name in EXECUTORS:
+                for dedup in (False, True):
+                    stats = {}
+                    result = process_text_tokenized(self.original, self.anonymized, KEEP_LABELS, num_workers=2,
+                                                    pool=pool, stats=stats, dedup=dedup, executor=name)
+                    self.assertEqual(result, self.expected, name)
+                    self.assertEqual(stats["executor"], name)
+                    self.assertIsNone(stats["predicted"])
+                    self.assertGreaterEqual(stats["elapsed"], 0.0)
+
+    def test_choose_executor(self):
+        model = ExecutorCostModel(char_cost=1e-5, process_startup=0.5,
+                                  ipc_char_cost=1e-7, cores=8)
+        name, predictions = choose_executor(model, 1000, 10, 8)
+        self.assertEqual(name, "sequential")
+        self.assertEqual(set(predictions), {"sequential", "process"})
+        name, _ = choose_executor(model, 10 ** 7, 100000, 8)
+        self.assertEqual(name, "process")
+
+    def test_choose_running_pool(self):
+        model = ExecutorCostModel(char_cost=1e-5, process_startup=0.5,
+                                  ipc_char_cost=1e-7, cores=8)
+        with DetailedLabelsPool(num_workers=2) as pool:
+            self.assertEqual(choose_executor(model, 10 ** 6, 10000, 2, pool)[0], "persistent")
+        self.assertEqual(choose_executor(model, 1000, 10, 1)[0], "sequential")
+
+    def test_auto_with_pool_calibrates_on_pool(self):
+        models = dict(detailed_labels._cost_models)
+        original, anonymized = LINES[0]
+        with DetailedLabelsPool(num_workers=3) as pool:
+            stats = {}
+            result = process_text_tokenized(original, anonymized, KEEP_LABELS, num_workers=3,
+                                            pool=pool, stats=stats, executor="auto")
+            self.assertIn(("persistent", 3), detailed_labels._cost_models)
+        # Jedna linia - narzut puli większy niż zysk z równoległości
+        self.assertEqual(result, process_text_tokenized(original, anonymized, KEEP_LABELS, num_workers=1))
+        self.assertEqual(stats["executor"], "sequential")
+        self.assertGreater(stats["predicted"], 0.0)
+        # Bez drugiej puli - kalibracja tylko na trwałej
+        self.assertEqual(set(detailed_labels._cost_models) - set(models), {("persistent", 3)})
+
+    def test_unknown_executor(self):
+        with self.assertRaises(ValueError):
+            make_executor("gpu")
+        with self.assertRaises(ValueError):
+            make_executor("persistent")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,79 @@
+import unittest
+import sys
+import os
+
+# Ensure the parent directory is in the python path so we can import overfitters_pipeline
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from overfitters_pipeline.detailed_labels import (
+    KEEP_LABELS, DetailedLabelsPool, _passthrough_line, _process_single_line, _relevant_tag_re,
+    iter_lines_tokenized, process_text_tokenized, tokenize_keep_delimiters,
+)
+
+
+ORIGINAL = "\n".join([
+    "Zadzwoń pod 600 500 400 albo napisz na jan@example.com",
+    "Zwykła linia [bez] tagów",
+    "samotny ] nawias i [ drugi",
+    "",
+    "Jan Kowalski mieszka w Krakowie",
+    "Tel. 600 500 400",
+])
+ANONYMIZED = "\n".join([
+    "Zadzwoń pod [phone] albo napisz na [email]",
+    "Zwykła linia [bez] tagów",
+    "samotny ] nawias i [ drugi",
+    "",
+    "[name] [surname] mieszka w [city]",
+    "Tel. [phone]",
+])
+
+
+class TestLabelsFastPath(unittest.TestCase):
+    def test_relevant_tag_check(self):
+        tag_re = _relevant_tag_re(frozenset(KEEP_LABELS))
+        self.assertIsNotNone(tag_re.search("Pan [name] dzwonił"))
+        self.assertIsNotNone(tag_re.search("[job-title] w firmie"))
+        self.assertIsNone(tag_re.search("[phone], [email], [pesel]"))
+        self.assertIsNone(tag_re.search("name surname [names]"))
+
+    def test_passthrough_matches_tokenization(self):
+        for line in ("bez tagów", "[phone] i [email]", "samotny ] nawias i [ drugi", "[x[y]]"):
+            self.assertEqual(_passthrough_line(line, line), "".join(tokenize_keep_delimiters(line)))
+
+    def test_blank_original_keeps_brackets(self):
+        # Pusta linia oryginału - zanonimizowana wraca bez zmian, razem z samotnymi nawiasami
+        original = "\n".join(["Jan Kowalski", "", "   ", "Tel. 600 500 400"])
+        anonymized = "\n".join(["[name] [surname]", "samotny ] nawias", "[ i [phone]", "Tel. [phone]"])
+        for orig, anon in zip(original.split("\n")[1:3], anonymized.split("\n")[1:3]):
+            self.assertEqual(_passthrough_line(orig, anon), anon)
+            self.assertEqual(_process_single_line((orig, anon, KEEP_LABELS)), anon)
+        for dedup in (False, True):
+            lines = process_text_tokenized(original, anonymized, KEEP_LABELS, num_workers=1, dedup=dedup).split("\n")
+            self.assertEqual(lines[1:3], ["samotny ] nawias", "[ i [phone]"])
+        streamed = list(iter_lines_tokenized(original.split("\n"), anonymized.split("\n"), KEEP_LABELS,
+                                             num_workers=1))
+        self.assertEqual(streamed[1:3], ["samotny ] nawias", "[ i [phone]"])
+
+    def test_skipped_lines_reported(self):
+        stats = {}
+        result = process_text_tokenized(ORIGINAL, ANONYMIZED, KEEP_LABELS, num_workers=1, stats=stats)
+        self.assertEqual(stats, {"lines": 6, "skipped": 5})
+        lines = result.split("\n")
+        self.assertEqual(lines[0], "Zadzwoń pod [phone] albo napisz na [email]")
+        self.assertEqual(lines[2], "samotny  nawias i  drugi")
+        self.assertTrue(lines[4].startswith("[name]["))
+
+    def test_pool_receives_only_relevant_lines(self):
+        original = "\n".join([ORIGINAL] * 10)
+        anonymized = "\n".join([ANONYMIZED] * 10)
+        expected = process_text_tokenized(original, anonymized, KEEP_LABELS, num_workers=1)
+        stats = {}
+        with DetailedLabelsPool(num_workers=2) as pool:
+            result = process_text_tokenized(original, anonymized, KEEP_LABELS, pool=pool, stats=stats)
+        self.assertEqual(result, expected)
+        self.assertEqual(stats, {"lines": 60, "skipped": 50})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,87 @@
+import unittest
+import sys
+import os
+import time
+
+# Ensure the parent directory is in the python path so we can import overfitters_pipeline
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from overfitters_pipeline.detailed_labels import (
+    DetailedLabelsPool, KEEP_LABELS, iter_text_tokenized, process_text_tokenized,
+)
+
+
+ORIGINAL = "\n".join([
+    "Nazywam się Anna Kowalska i mieszkam w Krakowie.",
+    "Jan Nowak pracuje jako lekarz.",
+    "Spotkałem Piotra w Warszawie.",
+] * 5)
+ANONYMIZED = "\n".join([
+    "Nazywam się [name] [surname] i mieszkam w [city].",
+    "[name] [surname] pracuje jako [job-title].",
+    "Spotkałem [name] w [city].",
+] * 5)
+
+
+class TestDetailedLabelsPool(unittest.TestCase):
+    def setUp(self):
+        self.pool = DetailedLabelsPool(num_workers=2)
+
+    def tearDown(self):
+        self.pool.close()
+
+    def test_same_result_as_sequential(self):
+        expected = process_text_tokenized(ORIGINAL, ANONYMIZED, KEEP_LABELS, num_workers=1)
+        for _ in range(2):
+            self.assertEqual(process_text_tokenized(ORIGINAL, ANONYMIZED, KEEP_LABELS, pool=self.pool), expected)
+
+    def test_workers_and_caches_survive_calls(self):
+        process_text_tokenized(ORIGINAL, ANONYMIZED, KEEP_LABELS, pool=self.pool)
+        workers = {process.pid for process in self.pool._pool._pool}
+        process_text_tokenized("Anna", "[name]", KEEP_LABELS, pool=self.pool)
+        status = self.pool.status()
+        self.assertEqual({process.pid for process in self.pool._pool._pool}, workers)
+        self.assertTrue(any(size > 0 for _, size in status))
+
+    def test_health_check_and_shutdown(self):
+        self.assertFalse(self.pool.is_healthy())
+        self.pool.start()
+        self.assertTrue(self.pool.is_healthy())
+        self.pool.close()
+        self.assertFalse(self.pool.running)
+        # Po zamknięciu ensure_healthy uruchamia pulę od nowa
+        self.assertTrue(self.pool.ensure_healthy().is_healthy())
+
+    def test_every_worker_answers(self):
+        pool = DetailedLabelsPool(num_workers=3, store_path=None).start()
+        try:
+            workers = {process.pid for process in pool._pool._pool}
+            for _ in range(3):
+                self.assertEqual({pid for pid, _ in pool.status()}, workers)
+            self.assertEqual(set(pool.cache_stats()), workers)
+            self.assertEqual(set(pool.startup_times()), workers)
+            # Zajęty worker - pozostałe nie mogą odpowiedzieć za niego
+            busy = pool.apply_async(time.sleep, (3,))
+            time.sleep(0.2)
+            with self.assertLogs("detailed_labels", level="WARNING"):
+                self.assertIsNone(pool.status(timeout=0.5))
+                self.assertEqual(pool.cache_stats(timeout=0.5), {})
+            busy.get()
+        finally:
+            pool.terminate()
+
+    def test_streamed_lines(self):
+        expected = process_text_tokenized(ORIGINAL, ANONYMIZED, KEEP_LABELS, num_workers=1).split("\n")
+        self.assertEqual(list(iter_text_tokenized(ORIGINAL, ANONYMIZED, KEEP_LABELS, pool=self.pool)), expected)
+        self.assertEqual(list(iter_text_tokenized(ORIGINAL, ANONYMIZED, KEEP_LABELS, num_workers=2)), expected)
+
+    def test_labels_other_than_pool_labels(self):
+        # Etykiety inne niż przy starcie puli są wysyłane w jednostkach pracy
+        labels = {"city"}
+        expected = process_text_tokenized(ORIGINAL, ANONYMIZED, labels, num_workers=1)
+        self.assertEqual(process_text_tokenized(ORIGINAL, ANONYMIZED, labels, pool=self.pool), expected)
+        self.assertNotIn("[name][", expected)
+
+
+if __name__ == '__main__':
+    unittest.main()
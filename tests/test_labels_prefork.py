@@ -0,0 +1,58 @@
+import unittest
+import sys
+import os
+import gc
+import sqlite3
+import tempfile
+
+# Ensure the parent directory is in the python path so we can import overfitters_pipeline
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from overfitters_pipeline.detailed_labels import (
+    ANALYSIS_STORE_PATH, KEEP_LABELS, DetailedLabelsPool, LineProcessor, process_text_tokenized,
+)
+
+
+ORIGINAL = "\n".join(["Jan Kowalski mieszka w Krakowie.", "Anna Nowak z Nowego Sącza"] * 10)
+ANONYMIZED = "\n".join(["[name] [surname] mieszka w [city].", "[name] [surname] z [city]"] * 10)
+
+
+def _freeze_count(_):
+    return gc.get_freeze_count()
+
+
+class TestLabelsPrefork(unittest.TestCase):
+    def tearDown(self):
+        LineProcessor.init_worker(ANALYSIS_STORE_PATH)
+
+    def test_same_result_and_inherited_cache(self):
+        expected = process_text_tokenized(ORIGINAL, ANONYMIZED, KEEP_LABELS, num_workers=1)
+        with DetailedLabelsPool(num_workers=2, store_path=None, prefork=True, warm_words=["Krakowie"]) as pool:
+            result = process_text_tokenized(ORIGINAL, ANONYMIZED, KEEP_LABELS, pool=pool)
+            sizes = [size for _, size in pool.status()]
+        self.assertEqual(result, expected)
+        # Słowo z rozgrzewania jest w cache każdego workera od startu
+        self.assertTrue(all(size >= 1 for size in sizes))
+
+    def test_freeze_only_in_workers(self):
+        with DetailedLabelsPool(num_workers=2, store_path=None, prefork=True, warm_words=["Krakowie"]) as pool:
+            self.assertEqual(gc.get_freeze_count(), 0)
+            self.assertTrue(all(pool.map(_freeze_count, range(2))))
+            pool.terminate()
+            pool.ensure_healthy()
+            self.assertEqual(gc.get_freeze_count(), 0)
+
+    def test_inherited_store_writes_in_workers(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            store_path = os.path.join(tmp, "analyses.sqlite")
+            with DetailedLabelsPool(num_workers=2, store_path=store_path, prefork=True) as pool:
+                process_text_tokenized(ORIGINAL, ANONYMIZED, KEEP_LABELS, pool=pool)
+            LineProcessor._store.close()
+            conn = sqlite3.connect(store_path)
+            words = {word for (word,) in conn.execute("SELECT word FROM analyses_json")}
+            conn.close()
+        self.assertIn("Kowalski", words)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,65 @@
+import unittest
+import sys
+import os
+
+# Ensure the parent directory is in the python path so we can import overfitters_pipeline
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from overfitters_pipeline.detailed_labels import (
+    KEEP_LABELS, DetailedLabelsPool, iter_lines_tokenized, process_text_tokenized,
+)
+
+
+LINES = [
+    ("Jan Kowalski mieszka w Krakowie.", "[name] [surname] mieszka w [city]."),
+    ("Tel. 600 500 400", "Tel. [phone]"),
+    ("", ""),
+    ("Anna Nowak z Nowego Sącza", "[name] [surname] z [city]"),
+    ("Zwykła linia", "Zwykła linia"),
+]
+
+
+class TestLabelsStreaming(unittest.TestCase):
+    def setUp(self):
+        self.orig_lines = [orig for orig, _ in LINES * 8]
+        self.anon_lines = [anon for _, anon in LINES * 8]
+        self.expected = process_text_tokenized("\n".join(self.orig_lines), "\n".join(self.anon_lines),
+                                               KEEP_LABELS, num_workers=1).split("\n")
+
+    def test_same_result_as_text(self):
+        stats = {}
+        result = list(iter_lines_tokenized(iter(self.orig_lines), iter(self.anon_lines), KEEP_LABELS,
+                                           num_workers=1, stats=stats, chunk_lines=3))
+        self.assertEqual(result, self.expected)
+        self.assertEqual(stats, {"lines": 40, "skipped": 24})
+
+    def test_file_lines_and_uneven_lengths(self):
+        orig = [line + "\n" for line in self.orig_lines] + ["Dodatkowa linia\n"]
+        anon = [line + "\n" for line in self.anon_lines]
+        result = list(iter_lines_tokenized(orig, anon, KEEP_LABELS, num_workers=1))
+        self.assertEqual(result, self.expected + [""])
+
+    def test_pool(self):
+        with DetailedLabelsPool(num_workers=2) as pool:
+            result = list(iter_lines_tokenized(self.orig_lines, self.anon_lines, KEEP_LABELS, pool=pool,
+                                               chunk_lines=4))
+        self.assertEqual(result, self.expected)
+
+    def test_bounded_window(self):
+        consumed = []
+
+        def lines():
+            for line in self.orig_lines:
+                consumed.append(line)
+                yield line
+
+        stream = iter_lines_tokenized(lines(), iter(self.anon_lines), KEEP_LABELS, num_workers=1,
+                                      chunk_lines=5, window=2)
+        self.assertEqual(next(stream), self.expected[0])
+        # Paczka oddawana + najwyżej `window` paczek przeczytanych z wyprzedzeniem
+        self.assertEqual(len(consumed), 15)
+        self.assertEqual([self.expected[0]] + list(stream), self.expected)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,73 @@
+import unittest
+import sys
+import os
+import tempfile
+
+# Ensure the parent directory is in the python path so we can import overfitters_pipeline
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import morfeusz2
+
+from overfitters_pipeline.detailed_labels import (
+    ANALYSIS_STORE_PATH, KEEP_LABELS, LineProcessor, process_text_tokenized,
+)
+from overfitters_pipeline.morph_lexicon import MorphLexicon, build_lexicon, expand_forms, open_lexicon
+
+
+ORIGINAL = "Jan Kowalski mieszka w Krakowie.\nAnna Nowak pojechała do Warszawy, brat Piotra też."
+ANONYMIZED = "[name] [surname] mieszka w [city].\n[name] [surname] pojechała do [city], [relative] [name] też."
+
+
+class TestMorphLexicon(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.morfeusz = morfeusz2.Morfeusz()
+        cls.tmp = tempfile.TemporaryDirectory()
+        cls.path = os.path.join(cls.tmp.name, "lexicon.bin")
+        cls.lemmas = ["Jan", "Kowalski", "Kraków", "Anna", "Warszawa", "brat", ""]
+        cls.count = build_lexicon(cls.path, cls.lemmas, cls.morfeusz)
+
+    @classmethod
+    def tearDownClass(cls):
+        LineProcessor.init_worker(ANALYSIS_STORE_PATH)
+        cls.tmp.cleanup()
+
+    def test_same_analyses_as_morfeusz(self):
+        forms = expand_forms(self.morfeusz, self.lemmas)
+        self.assertIn("Krakowie", forms)
+        lexicon = MorphLexicon(self.path)
+        self.assertEqual(len(lexicon), self.count)
+        for form in forms:
+            self.assertEqual(lexicon.get(form), self.morfeusz.analyse(form), form)
+        self.assertIsNone(lexicon.get("Nowak"))
+        self.assertIsNone(lexicon.get(""))
+        self.assertEqual(lexicon.misses, 2)
+        lexicon.close()
+
+    def test_open_lexicon(self):
+        self.assertIsNone(open_lexicon(None, "x"))
+        self.assertIsNone(open_lexicon(os.path.join(self.tmp.name, "brak.bin"), "x"))
+        self.assertIsNone(open_lexicon(self.path, "inna-wersja"))
+        bad = os.path.join(self.tmp.name, "bad.bin")
+        with open(bad, "wb") as f:
+            f.write(b"nie leksykon")
+        self.assertIsNone(open_lexicon(bad, "x"))
+        # Leksykon w dawnym formacie (analizy w pickle) nie jest wczytywany
+        with open(self.path, "rb") as f:
+            data = f.read()
+        old = os.path.join(self.tmp.name, "old.bin")
+        with open(old, "wb") as f:
+            f.write(b"MORFLEX1" + data[8:])
+        self.assertIsNone(open_lexicon(old, MorphLexicon(self.path).dict_version))
+
+    def test_labels_with_lexicon(self):
+        LineProcessor.init_worker(None, None)
+        expected = process_text_tokenized(ORIGINAL, ANONYMIZED, KEEP_LABELS, num_workers=1, store_path=None)
+        LineProcessor.init_worker(None, self.path)
+        result = process_text_tokenized(ORIGINAL, ANONYMIZED, KEEP_LABELS, num_workers=1, store_path=None)
+        self.assertEqual(result, expected)
+        self.assertGreater(LineProcessor.cache_stats()["lexicon_hits"], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,136 @@
+import unittest
+import sys
+import os
+
+# Ensure the parent directory is in the python path so we can import overfitters_pipeline
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import morfeusz2
+
+from overfitters_pipeline.detailed_labels import (
+    ANALYSIS_STORE_PATH, PRZYPADKI, LineProcessor, extract_przypadek, extract_rodzaj_from_tagparts,
+)
+from overfitters_pipeline.morfeusz_inflector import MorfeuszInflector
+from overfitters_pipeline.morph_tags import (
+    ADJ, CASE_BITS, CASE_MASK, FEMININE, GENDER_BITS, MASCULINE, NUMBER_BITS, SUBST, first_case, gender_of, parse_tag,
+)
+
+
+# Próbka słów, których analizy i formy dają tagy różnych części mowy
+SAMPLE_WORDS = [
+    "Anna", "Jan", "Magdy", "Kowalski", "Kowalskiej", "Kraków", "Krakowie", "Warszawy", "matka",
+    "ojcem", "lekarz", "nauczycielką", "córce", "pracował", "pisała", "biegnie", "zrobić", "czytając",
+    "zrobiwszy", "pisanie", "napisany", "dobry", "lepszej", "szybko", "dwa", "pięciu", "oboje",
+    "ja", "jego", "siebie", "w", "na", "i", "że", "się", "nie", "och", "trzeba", "by", "byłem",
+    "będzie", "warto", "ul", "np", "123", "XIV", ",", "państwo", "Polacy",
+]
+
+
+# Dawne testy podnapisów (sprzed kodeka)
+
+def old_extract_przypadek(tag_string):
+    if not tag_string:
+        return None
+    for case_key, case_name in PRZYPADKI.items():
+        if case_key in tag_string:
+            return case_name
+    return None
+
+
+def old_extract_rodzaj(tag_parts):
+    for t in tag_parts:
+        if 'f' in t:
+            return "woman"
+        if any(m in t for m in ('m1', 'm2', 'm3', 'm')):
+            return "man"
+    return None
+
+
+def old_tag_parts(tags):
+    tag_parts = []
+    for part in tags.split(":"):
+        tag_parts.extend(part.split("."))
+    return tag_parts
+
+
+class TestMorphTags(unittest.TestCase):
+    @classmethod
+    def tearDownClass(cls):
+        LineProcessor.init_worker(ANALYSIS_STORE_PATH)
+
+    def test_parse_tag(self):
+        mask = parse_tag("subst:sg.pl:nom.acc:m3")
+        self.assertTrue(mask & SUBST)
+        self.assertFalse(mask & ADJ)
+        self.assertTrue(mask & CASE_BITS["nom"] and mask & CASE_BITS["acc"])
+        self.assertFalse(mask & CASE_BITS["gen"])
+        self.assertTrue(mask & NUMBER_BITS["sg"] and mask & NUMBER_BITS["pl"])
+        self.assertEqual(mask & (MASCULINE | FEMININE), GENDER_BITS["m3"])
+        self.assertTrue(parse_tag("adj:sg:nom.voc:f:pos") & ADJ)
+        self.assertEqual(parse_tag(""), 0)
+        self.assertEqual(parse_tag(None), 0)
+
+    def test_gender_from_fields(self):
+        # "m" w "nom" nie jest rodzajem męskim, "f" w "perf" - żeńskim
+        self.assertEqual(gender_of(parse_tag("subst:sg:nom:f")), "woman")
+        self.assertIsNone(gender_of(parse_tag("fin:sg:ter:perf")))
+        self.assertIsNone(gender_of(parse_tag("subst:sg:nom:n")))
+        self.assertEqual(gender_of(parse_tag("adj:pl:nom:m2.m3.f.n:pos")), "man")
+        self.assertEqual(extract_rodzaj_from_tagparts(["subst", "sg", "nom", "f"]), "woman")
+        self.assertIsNone(extract_rodzaj_from_tagparts([]))
+
+    def test_same_decisions_as_substring_tests(self):
+        morfeusz = morfeusz2.Morfeusz()
+        tags = set()
+        for word in SAMPLE_WORDS:
+            for item in morfeusz.analyse(word):
+                tags.add(item[2][2])
+                for form in morfeusz.generate(item[2][1].split(":")[0]):
+                    tags.add(form[2])
+        self.assertGreater(len(tags), 200)
+        for tag in sorted(tags):
+            mask = parse_tag(tag)
+            tag_parts = old_tag_parts(tag)
+            self.assertEqual(extract_przypadek(tag), old_extract_przypadek(tag), tag)
+            # Rodzaj celowo różni się od dawnego testu - tylko pola rodzaju
+            genders = [value for value in tag_parts[1:] if value in ("m1", "m2", "m3", "f")]
+            expected = "man" if any(g != "f" for g in genders) else ("woman" if genders else None)
+            self.assertEqual(gender_of(mask), expected, tag)
+            self.assertEqual(bool(mask & (SUBST | ADJ)), "subst" in tag or "adj" in tag, tag)
+            for case, case_bit in CASE_BITS.items():
+                # Test fleksji z MorfeuszInflector
+                self.assertEqual(bool(mask & SUBST and mask & case_bit and mask & FEMININE),
+                                 "subst" in tag and case in tag and "f" in tag, tag)
+                self.assertEqual(bool(mask & SUBST and mask & case_bit and mask & MASCULINE),
+                                 "subst" in tag and case in tag and any(g in tag for g in ("m1", "m2", "m3")), tag)
+
+    def test_first_case(self):
+        self.assertEqual(first_case(parse_tag("subst:pl:acc.voc.nom:f")), "nom")
+        self.assertIsNone(first_case(parse_tag("prep:gen:nwok") & ~CASE_BITS["gen"]))
+        self.assertEqual(extract_przypadek("subst:sg:dat.loc:f"), "celownik")
+        self.assertIsNone(extract_przypadek("interp"))
+        self.assertIsNone(extract_przypadek(""))
+
+    def test_analizuj_slowo_gender(self):
+        LineProcessor.init_worker(None)
+        self.assertEqual(LineProcessor.analizuj_slowo("Anna", "name"), ("Anna", "woman", "mianownik"))
+        self.assertEqual(LineProcessor.analizuj_slowo("Kamila", "name")[1:], ("woman", "mianownik"))
+        self.assertEqual(LineProcessor.analizuj_slowo("Magdy", "name")[1:], ("woman", "dopełniacz"))
+
+    def test_indeclinable_reading_is_fallback(self):
+        LineProcessor.init_worker(None)
+        # Pierwsza analiza "Jan"/"Kowalski" jest nieodmienna żeńska - rozstrzyga analiza męska
+        first = parse_tag(LineProcessor.analyse_with_cache("Jan")[0][2][2])
+        self.assertEqual((first & CASE_MASK, gender_of(first)), (CASE_MASK, "woman"))
+        self.assertEqual(LineProcessor.analizuj_slowo("Jan", "name"), ("Jan", "man", "mianownik"))
+        self.assertEqual(LineProcessor.analizuj_slowo("Kowalski", "surname")[1:], ("man", "mianownik"))
+
+    def test_inflector(self):
+        inflector = MorfeuszInflector()
+        self.assertEqual(inflector.inflect_word("Kraków", "miejscownik", False), "Krakowie")
+        self.assertEqual(inflector.inflect_word("Anna", "dopełniacz", True), "Anny")
+        self.assertEqual(inflector.inflect_word("Jan", "celownik", False), "Janowi")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,63 @@
+import unittest
+import sys
+import os
+
+# Ensure the parent directory is in the python path so we can import overfitters_pipeline
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from overfitters_pipeline.detailed_labels import KEEP_LABELS, process_text_tokenized
+from overfitters_pipeline.pipeline import apply_spans, compose_spans, regex_anonymize_text, regex_detect_spans
+from overfitters_pipeline.regex_layer import RegexLayer
+
+
+def span(text, word, tag):
+    start = text.index(word)
+    return start, start + len(word), tag
+
+
+class TestComposeSpans(unittest.TestCase):
+    def test_matches_two_pass_text(self):
+        text = ("Jan Kowalski, PESEL 02070803628, tel. +48 600 500 400\n\n"
+                "Pisz na jan.kowalski@example.com z Krakowa, ul. Długa 5")
+        layer = RegexLayer()
+        ml_spans = [span(text, "Jan", "name"), span(text, "Kowalski", "surname"), span(text, "Krakowa", "city")]
+        after_ml = apply_spans(text, ml_spans)
+        regex_spans = regex_detect_spans(after_ml, layer)
+        composed = compose_spans(ml_spans, regex_spans)
+        self.assertEqual(apply_spans(text, composed), regex_anonymize_text(after_ml, layer))
+
+    def test_outer_span_covering_tags(self):
+        text = "aa bb cc dd"
+        inner = [(3, 5, "name")]             # "aa [name] cc dd"
+        outer = [(0, 12, "address")]         # "aa [name] cc" -> jeden tag
+        composed = compose_spans(inner, outer)
+        self.assertEqual(composed, [(0, 8, "address")])
+        self.assertEqual(apply_spans(text, composed), "[address] dd")
+
+    def test_outer_span_inside_tag(self):
+        self.assertIsNone(compose_spans([(3, 5, "name")], [(4, 7, "x")]))
+
+
+class TestOffsetLabels(unittest.TestCase):
+    def test_same_result_as_alignment(self):
+        original = "Jan Kowalski mieszka w Krakowie.\nTel. 600 500 400\n\nDzwoniła Anna"
+        spans = [(0, 3, "name"), (4, 12, "surname"), (23, 31, "city"), (38, 49, "phone"), (60, 64, "name")]
+        anonymized = apply_spans(original, spans)
+        expected = process_text_tokenized(original, anonymized, KEEP_LABELS, num_workers=1)
+        stats = {}
+        result = process_text_tokenized(original, anonymized, KEEP_LABELS, spans=spans, stats=stats)
+        self.assertEqual(result, expected)
+        self.assertEqual(stats, {"lines": 4, "skipped": 2})
+
+    def test_span_across_lines(self):
+        # Adres obejmujący znak nowej linii - wyrównywanie linii rozjeżdża się, spany nie
+        original = "Adres: ul.\nPolna 7\nDzwoni Anna"
+        spans = [(7, 18, "address"), (26, 30, "name")]
+        result = process_text_tokenized(original, apply_spans(original, spans), KEEP_LABELS, spans=spans)
+        expected_last = process_text_tokenized("Dzwoni Anna", "Dzwoni [name]", KEEP_LABELS, num_workers=1)
+        self.assertTrue(expected_last.startswith("Dzwoni [name]["))
+        self.assertEqual(result, "Adres: [address]\n" + expected_last)
+
+
+if __name__ == '__main__':
+    unittest.main()
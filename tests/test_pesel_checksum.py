@@ -0,0 +1,40 @@
+import unittest
+import random
+import sys
+import os
+
+# Ensure the parent directory is in the python path so we can import overfitters_pipeline
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from overfitters_pipeline.regex_layer import RegexLayer, EntityType
+
+
+class TestPeselBatchValidation(unittest.TestCase):
+    def setUp(self):
+        self.layer = RegexLayer(pesel_batch_threshold=0)
+
+    def test_batch_matches_single_validation(self):
+        rng = random.Random(0)
+        pesels = ["".join(rng.choice("0123456789") for _ in range(11)) for _ in range(2000)]
+        pesels += ["02070803628", "90010112345", "00211504470"]
+
+        expected = [self.layer._validate_pesel_checksum(p) for p in pesels]
+        self.assertEqual(self.layer._validate_pesel_checksums(pesels), expected)
+
+    def test_detect_uses_same_result_above_threshold(self):
+        text = " ".join(["02070803628", "02070803629"] * 50)
+        single = RegexLayer(pesel_batch_threshold=10**6).detect(text, use_cache=False)
+        batch = self.layer.detect(text, use_cache=False)
+
+        self.assertEqual([(e.start, e.end) for e in single], [(e.start, e.end) for e in batch])
+        self.assertEqual(len([e for e in batch if e.entity_type == EntityType.PESEL]), 50)
+
+    def test_non_ascii_digits_fall_back(self):
+        # \d dopasowuje także cyfry spoza ASCII - wynik musi być zgodny z walidacją pojedynczą
+        pesels = ["٠٢٠٧٠٨٠٣٦٢٨", "02070803628"]
+        expected = [self.layer._validate_pesel_checksum(p) for p in pesels]
+        self.assertEqual(self.layer._validate_pesel_checksums(pesels), expected)
+
+
+if __name__ == '__main__':
+    unittest.main()
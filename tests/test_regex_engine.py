@@ -0,0 +1,86 @@
+import unittest
+import sys
+import os
+import re
+import time
+
+# Ensure the parent directory is in the python path so we can import overfitters_pipeline
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from entity_helpers import SameEntitiesMixin
+from overfitters_pipeline.regex_layer import RegexLayer
+from overfitters_pipeline.regex_engine import (
+    _RE2_AVAILABLE, RE2_FORMS, compile_bytes_pattern, compile_pattern, resolve_engine,
+)
+
+
+class TestRegexEngineSelection(unittest.TestCase):
+    def test_unknown_engine(self):
+        with self.assertRaises(ValueError):
+            RegexLayer(regex_engine="pcre")
+
+    def test_default_engine_is_re(self):
+        layer = RegexLayer()
+        self.assertEqual(layer.regex_engine, "re")
+        self.assertEqual(set(layer.pattern_engines.values()), {"re"})
+
+    def test_auto_engine(self):
+        self.assertEqual(resolve_engine("auto"), "re2" if _RE2_AVAILABLE else "re")
+
+    @unittest.skipIf(_RE2_AVAILABLE, "google-re2 jest zainstalowany")
+    def test_missing_re2_warns(self):
+        with self.assertLogs("regex_engine", level="WARNING"):
+            self.assertEqual(resolve_engine("re2"), "re")
+
+    def test_re2_forms_match_layer_patterns(self):
+        # Zmiana wzorca w RegexLayer wymaga przepisania jego formy RE2 (i źródła w RE2_FORMS)
+        layer = RegexLayer()
+        patterns = {"address": layer.address_regex, "pesel": layer.pesel_regex}
+        patterns.update((key, pattern) for key, (_, pattern) in zip(layer.simple_pattern_keys, layer.simple_patterns))
+        self.assertEqual(set(RE2_FORMS), set(patterns))
+        for key, (source, _) in RE2_FORMS.items():
+            self.assertEqual(patterns[key].pattern, source, f"Nieaktualna forma RE2: {key}")
+
+
+@unittest.skipUnless(_RE2_AVAILABLE, "google-re2 nie jest zainstalowany")
+class TestRe2Engine(SameEntitiesMixin, unittest.TestCase):
+    def setUp(self):
+        self.re_layer = RegexLayer(regex_engine="re")
+        self.re2_layer = RegexLayer(regex_engine="re2")
+
+    def test_all_patterns_use_re2(self):
+        self.assertEqual(set(self.re2_layer.pattern_engines.values()), {"re2"})
+
+    def test_stale_form_falls_back(self):
+        changed = r"\b\d{12}\b"
+        with self.assertLogs("regex_engine", level="WARNING"):
+            self.assertIsInstance(compile_pattern("pesel", changed, engine="re2"), re.Pattern)
+        with self.assertLogs("regex_engine", level="WARNING"):
+            self.assertIsNone(compile_bytes_pattern("pesel", changed))
+
+    def test_equivalence_with_re_engine(self):
+        test_texts = [
+            "Mieszkam na ul. Długa 15/3 m. 4 w Krakowie.",
+            "Adres: al. Jana Pawła II 12a, os. Złotego Wieku 3, pl. gen. Andersa 7",
+            "ulica 3 Maja 5, Ulica Nad Wisłą 10b lok 2, rondo ONZ 1",
+            "na ul. Polnej ulica Leśna 5 oraz skwer im. J. Kowalskiego 8",
+            "ſkwer Abc 4 i ul. Kościuszki 2",
+            "Email: jan.kowalski@example.com, _x@y.pl, a.b@c.d.pl|K oraz ą@ą.pl",
+            "PESEL 02070803628, tel. +48 600 500 400, (22) 123-45-67",
+            "Konto: PL61 1090 1014 0000 0712 1981 2874 i 1234 0234 9054 0012",
+            "Cyfry arabskie ١٢٣ ٤٥٦ ٧٨٩ i spacja ul. Ab 1",
+            "",
+        ]
+        for text in test_texts:
+            self.assertSameEntities(text, self.re_layer, self.re2_layer)
+
+    def test_adversarial_address_is_linear(self):
+        # Dla silnika "re" ta linia wymaga kilkudziesięciu sekund (backtracking)
+        text = "ul. " + "i " * 40 + "x"
+        start = time.perf_counter()
+        self.re2_layer.detect(text, use_cache=False)
+        self.assertLess(time.perf_counter() - start, 1.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
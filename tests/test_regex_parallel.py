@@ -0,0 +1,61 @@
+import unittest
+import sys
+import os
+
+# Ensure the parent directory is in the python path so we can import overfitters_pipeline
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from entity_helpers import entity_tuples
+from overfitters_pipeline.regex_layer import RegexLayer
+
+
+LINES = [
+    "Mój PESEL to 02070803628, tel. +48 600 500 400.",
+    "Mieszkam na ul. Długa 15/3 m. 4, email: jan.kowalski@example.com",
+    "Konto: PL61 1090 1014 0000 0712 1981 2874",
+    # Adresy przechodzące przez znak nowej linii
+    "Adres: ul.",
+    "Polna 7",
+    "al. Jana",
+    "Pawła 12a",
+    "os. Złotego Wieku",
+    "3",
+    "pl. Wolności 5",
+    "lok 2",
+    "Zwykła linia bez danych osobowych.",
+    "(22) 123-45-67 i 1234 0234 9054 0012",
+]
+
+
+class TestParallelDetection(unittest.TestCase):
+    def setUp(self):
+        self.layer = RegexLayer()
+        self.text = "\n".join(LINES * 40)
+
+    def test_chunks_cover_text(self):
+        chunks = self.layer.split_chunks(self.text, 100)
+        self.assertGreater(len(chunks), 10)
+        self.assertEqual(chunks[0][0], 0)
+        self.assertEqual(chunks[-1][1], len(self.text))
+        for (_, end), (start, _) in zip(chunks, chunks[1:]):
+            self.assertEqual(end, start)
+            self.assertEqual(self.text[end - 1], "\n")
+
+    def test_no_entity_crosses_chunk_boundary(self):
+        boundaries = {start for start, _ in self.layer.split_chunks(self.text, 50)}
+        for e in self.layer.detect(self.text, use_cache=False):
+            self.assertFalse(any(e.start < b < e.end for b in boundaries), e)
+
+    def test_identical_to_sequential(self):
+        expected = entity_tuples(self.layer.detect(self.text, use_cache=False))
+        for chunk_size in (1, 50, 333, 5000):
+            actual = entity_tuples(self.layer.detect_parallel(self.text, num_workers=2, chunk_size=chunk_size))
+            self.assertEqual(expected, actual, f"chunk_size={chunk_size}")
+
+    def test_single_worker_falls_back(self):
+        expected = entity_tuples(self.layer.detect(self.text, use_cache=False))
+        self.assertEqual(expected, entity_tuples(self.layer.detect_parallel(self.text, num_workers=1)))
+
+
+if __name__ == '__main__':
+    unittest.main()
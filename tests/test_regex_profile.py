@@ -0,0 +1,68 @@
+import unittest
+import sys
+import os
+
+# Ensure the parent directory is in the python path so we can import overfitters_pipeline
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from overfitters_pipeline.regex_layer import RegexLayer
+
+
+TEXTS = [
+    "PESEL 02070803628 i błędny 02070803627, tel. 600 500 400",
+    "email: jan.kowalski@example.com, ul. Długa 15/3",
+    "Konto: PL61 1090 1014 0000 0712 1981 2874",
+]
+
+
+class TestRegexProfile(unittest.TestCase):
+    def test_same_results_as_unprofiled(self):
+        for numeric_engine in ("regex", "scanner"):
+            plain = RegexLayer(numeric_engine=numeric_engine)
+            profiled = RegexLayer(numeric_engine=numeric_engine, profile=True)
+            for text in TEXTS:
+                self.assertEqual(plain.detect(text, use_cache=False), profiled.detect(text, use_cache=False))
+
+    def test_report(self):
+        layer = RegexLayer(profile=True)
+        for text in TEXTS:
+            layer.detect(text)
+        report = layer.profile.report()
+        patterns = report["patterns"]
+
+        self.assertEqual(report["texts"], len(TEXTS))
+        self.assertEqual(patterns["pesel"]["matches"], 2)
+        self.assertEqual(patterns["pesel"]["checksum_failures"], 1)
+        self.assertEqual(patterns["email"]["matches"], 1)
+        self.assertGreaterEqual(patterns["address"]["scan_time"], 0.0)
+        self.assertAlmostEqual(sum(row["time_share"] for row in patterns.values()), 1.0)
+        self.assertIn("pesel", layer.profile.format())
+
+    def test_rejected_overlaps(self):
+        # Numer z prefiksem +48 wykrywa phone_mobile_prefixed, a phone_mobile
+        # dopasowuje jego część - dopasowanie jest odrzucone
+        layer = RegexLayer(profile=True)
+        layer.detect("tel. +48 600 500 400")
+        patterns = layer.profile.report()["patterns"]
+        self.assertEqual((patterns["phone_mobile_prefixed"]["matches"], patterns["phone_mobile_prefixed"]["rejected"]), (1, 0))
+        self.assertEqual((patterns["phone_mobile"]["matches"], patterns["phone_mobile"]["rejected"]), (1, 1))
+
+    def test_parallel_workers(self):
+        text = "\n".join(TEXTS * 200)
+        sequential = RegexLayer(profile=True)
+        expected = sequential.detect(text, use_cache=False)
+        layer = RegexLayer(profile=True)
+        self.assertEqual(layer.detect_parallel(text, num_workers=2, chunk_size=4096), expected)
+        chunks = len(layer.split_chunks(text, 4096))
+        report = layer.profile.report()
+        self.assertEqual(report["texts"], chunks)
+        for key, row in sequential.profile.report()["patterns"].items():
+            self.assertEqual((report["patterns"][key]["matches"], report["patterns"][key]["rejected"]),
+                             (row["matches"], row["rejected"]), key)
+
+    def test_disabled_by_default(self):
+        self.assertIsNone(RegexLayer().profile)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,70 @@
+import unittest
+import sys
+import os
+import random
+
+# Ensure the parent directory is in the python path so we can import overfitters_pipeline
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from entity_helpers import entity_tuples
+from overfitters_pipeline.regex_layer import RegexLayer
+
+
+LINES = [
+    "Mój PESEL to 02070803628, tel. +48 600 500 400.",
+    "Mieszkam na ul. Długa 15/3 m. 4, email: jan.kowalski@example.com",
+    "Konto: PL61 1090 1014 0000 0712 1981 2874",
+    "Adres: ul.",
+    "Polna 7",
+    "os. Złotego Wieku",
+    "3",
+    "Zwykła linia bez danych osobowych",
+    "(22) 123-45-67 i 1234 0234 9054 0012",
+]
+
+
+def random_pieces(text, seed, max_len):
+    rnd = random.Random(seed)
+    i = 0
+    while i < len(text):
+        size = rnd.randint(1, max_len)
+        yield text[i:i + size]
+        i += size
+
+
+class TestDetectIter(unittest.TestCase):
+    def setUp(self):
+        self.layer = RegexLayer()
+        self.text = "\n".join(LINES * 30)
+        self.expected = entity_tuples(self.layer.detect(self.text, use_cache=False))
+
+    def test_lines_stream(self):
+        stream = iter(self.text.splitlines(keepends=True))
+        self.assertEqual(self.expected, entity_tuples(self.layer.detect_iter(stream, chunk_size=100)))
+
+    def test_chunks_straddling_matches(self):
+        # Fragmenty tną encje w dowolnych miejscach
+        for seed, chunk_size in ((1, 16), (2, 200), (3, 5000)):
+            stream = random_pieces(self.text, seed, 40)
+            actual = entity_tuples(self.layer.detect_iter(stream, chunk_size=chunk_size))
+            self.assertEqual(self.expected, actual, f"chunk_size={chunk_size}")
+
+    def test_without_separators(self):
+        # Bez przecinków/kropek podział możliwy tylko na końcach linii
+        text = "\n".join(["ul. Długa 15", "tel 600 500 400", "ul.", "Polna 7 m 2"] * 50)
+        expected = entity_tuples(self.layer.detect(text, use_cache=False))
+        actual = entity_tuples(self.layer.detect_iter(random_pieces(text, 4, 30), chunk_size=64))
+        self.assertEqual(expected, actual)
+
+    def test_is_lazy_generator(self):
+        def stream():
+            yield "PESEL 02070803628, "
+            yield "x" * 200
+            raise AssertionError("Strumień nie powinien być czytany dalej")
+
+        first = next(self.layer.detect_iter(stream(), chunk_size=100))
+        self.assertEqual(first.text, "02070803628")
+
+
+if __name__ == '__main__':
+    unittest.main()
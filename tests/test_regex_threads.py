@@ -0,0 +1,55 @@
+import unittest
+import sys
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+# Ensure the parent directory is in the python path so we can import overfitters_pipeline
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from entity_helpers import entity_tuples
+from overfitters_pipeline.regex_layer import RegexLayer, _StripedCache
+from overfitters_pipeline.regex_engine import _RE2_AVAILABLE
+
+
+TEXTS = [
+    f"Linia {i}: PESEL 02070803628, tel. +48 600 500 {i:03d}, ul. Długa {i}/3, jan{i}@example.com"
+    for i in range(200)
+]
+
+
+class TestConcurrentDetect(unittest.TestCase):
+    def assertSameUnderContention(self, layer):
+        expected = [entity_tuples(layer.detect(text, use_cache=False)) for text in TEXTS]
+        # Mały cache - wątki jednocześnie odczytują, wstawiają i usuwają wpisy
+        work = [i % len(TEXTS) for i in range(4000)]
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            results = list(executor.map(lambda i: (i, entity_tuples(layer.detect(TEXTS[i]))), work))
+        for i, actual in results:
+            self.assertEqual(expected[i], actual)
+
+    def test_shared_layer(self):
+        self.assertSameUnderContention(RegexLayer(cache_size=32))
+
+    @unittest.skipUnless(_RE2_AVAILABLE, "google-re2 nie jest zainstalowany")
+    def test_shared_layer_re2(self):
+        self.assertSameUnderContention(RegexLayer(cache_size=32, regex_engine="re2"))
+
+
+class TestStripedCache(unittest.TestCase):
+    def test_bounded(self):
+        cache = _StripedCache(64, stripes=4)
+        for i in range(1000):
+            cache.put(str(i), i)
+        self.assertLessEqual(len(cache), 64)
+        self.assertEqual(cache.get("999"), 999)
+        self.assertIsNone(cache.get("0"))
+
+    def test_clear(self):
+        cache = _StripedCache(8)
+        cache.put("a", 1)
+        cache.clear()
+        self.assertEqual(len(cache), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
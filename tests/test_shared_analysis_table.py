@@ -0,0 +1,89 @@
+import unittest
+import sys
+import os
+import multiprocessing
+
+# Ensure the parent directory is in the python path so we can import overfitters_pipeline
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from overfitters_pipeline.detailed_labels import KEEP_LABELS, DetailedLabelsPool, process_text_tokenized
+from overfitters_pipeline import shared_analysis_table
+from overfitters_pipeline.shared_analysis_table import SharedAnalysisTable
+
+
+ANALYSES = [(0, 1, ('Krakowie', 'Kraków', 'subst:sg:loc:m3', ['nazwa_geograficzna'], []))]
+
+
+class TestSharedAnalysisTable(unittest.TestCase):
+    def setUp(self):
+        self.table = SharedAnalysisTable(slots=8, arena_bytes=4096)
+
+    def tearDown(self):
+        self.table.close()
+
+    def test_put_get(self):
+        self.assertIsNone(self.table.get("Krakowie"))
+        self.assertTrue(self.table.put("Krakowie", ANALYSES))
+        self.assertTrue(self.table.put("Krakowie", ANALYSES))
+        self.assertEqual(self.table.get("Krakowie"), ANALYSES)
+        self.assertEqual(self.table.get("Kraków"), None)
+        self.assertEqual(len(self.table), 1)
+        self.assertEqual((self.table.hits, self.table.misses), (1, 2))
+
+    def test_full_table_drops(self):
+        for i in range(6):
+            self.assertTrue(self.table.put(f"słowo{i}", []))
+        # 8 slotów, MAX_LOAD = 0.75
+        self.assertFalse(self.table.put("słowo6", []))
+        self.assertEqual([self.table.get(f"słowo{i}") for i in range(6)], [[]] * 6)
+        self.assertEqual(self.table.stats()["dropped"], 1)
+
+    def test_full_arena_drops(self):
+        self.assertFalse(self.table.put("długie", ["x" * 5000]))
+        self.assertIsNone(self.table.get("długie"))
+
+    def test_torn_record_is_miss(self):
+        self.assertTrue(self.table.put("Krakowie", ANALYSES))
+        # Rekord zmieniony po publikacji slotu (np. zapis widoczny w innej kolejności)
+        arena = self.table._arena_pos
+        self.table._shm.buf[arena + len("Krakowie".encode()) + 2] ^= 0xFF
+        self.assertIsNone(self.table.get("Krakowie"))
+        self.assertEqual(self.table.misses, 1)
+
+    def test_lock_timeout_drops(self):
+        timeout = shared_analysis_table.LOCK_TIMEOUT
+        shared_analysis_table.LOCK_TIMEOUT = 0.05
+        self.table._lock.acquire()  # jak worker, który zginął, trzymając blokadę
+        try:
+            self.assertFalse(self.table.put("Krakowie", ANALYSES))
+        finally:
+            self.table._lock.release()
+            shared_analysis_table.LOCK_TIMEOUT = timeout
+        self.assertEqual(self.table.stats()["dropped"], 1)
+        self.assertTrue(self.table.put("Krakowie", ANALYSES))
+
+    def test_visible_across_processes(self):
+        for method in ("fork", "spawn"):
+            context = multiprocessing.get_context(method)
+            table = SharedAnalysisTable(slots=8, arena_bytes=4096, context=context)
+            process = context.Process(target=table.put, args=("Krakowie", ANALYSES))
+            process.start()
+            process.join()
+            self.assertEqual(table.get("Krakowie"), ANALYSES, method)
+            table.close()
+
+
+class TestPoolSharedTable(unittest.TestCase):
+    def test_same_result(self):
+        original = "\n".join(["Jan Kowalski mieszka w Krakowie.", "Anna Nowak z Nowego Sącza"] * 20)
+        anonymized = "\n".join(["[name] [surname] mieszka w [city].", "[name] [surname] z [city]"] * 20)
+        expected = process_text_tokenized(original, anonymized, KEEP_LABELS, num_workers=1)
+        with DetailedLabelsPool(num_workers=2, store_path=None, shared_table=True) as pool:
+            result = process_text_tokenized(original, anonymized, KEEP_LABELS, pool=pool)
+            entries = pool.shared_stats()["entries"]
+        self.assertEqual(result, expected)
+        self.assertGreaterEqual(entries, 6)
+
+
+if __name__ == '__main__':
+    unittest.main()
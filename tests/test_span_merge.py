@@ -0,0 +1,75 @@
+import unittest
+import sys
+import os
+import tempfile
+
+# Ensure the parent directory is in the python path so we can import overfitters_pipeline
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from overfitters_pipeline.pipeline import (
+    AnonymizationPipeline, apply_ner_to_line, apply_spans, merge_spans, ml_anonymize_text, regex_anonymize_text,
+)
+from overfitters_pipeline.regex_layer import RegexLayer
+
+
+class FakeNerModel:
+    """Zwraca zadane wyniki NER dla linii (bez ładowania modelu)."""
+
+    def __init__(self, results):
+        self.results = results
+
+    def __call__(self, lines, batch_size=None):
+        return [self.results.get(line, []) for line in lines]
+
+
+def ner(line, word, group):
+    start = line.index(word)
+    return {'start': start, 'end': start + len(word), 'entity_group': group, 'word': word}
+
+
+class TestSpanMerge(unittest.TestCase):
+    def test_apply_spans(self):
+        self.assertEqual(apply_spans("abc def ghi", [(0, 3, "x"), (8, 11, "y")]), "[x] def [y]")
+        self.assertEqual(apply_spans("abc", []), "abc")
+
+    def test_merge_priority(self):
+        primary = [(0, 5, "name"), (10, 15, "city")]
+        secondary = [(3, 7, "phone"), (6, 9, "email"), (14, 20, "pesel"), (20, 25, "address")]
+        self.assertEqual(
+            merge_spans(primary, secondary),
+            [(0, 5, "name"), (6, 9, "email"), (10, 15, "city"), (20, 25, "address")],
+        )
+
+    def test_apply_ner_to_line(self):
+        line = "Jan Kowalski dzwonił z Krakowa"
+        results = [ner(line, "Jan", "B-NAME"), ner(line, "Kowalski", "SURNAME"), ner(line, "Krakow", "CITY")]
+        self.assertEqual(apply_ner_to_line(line, results), "[name] [surname] dzwonił z [city]")
+
+    def test_unified_matches_two_pass(self):
+        lines = [
+            "Jan Kowalski, PESEL 02070803628, tel. +48 600 500 400",
+            "",
+            "Pisz na jan.kowalski@example.com z Krakowa",
+        ]
+        text = "\n".join(lines)
+        model = FakeNerModel({
+            lines[0]: [ner(lines[0], "Jan", "B-NAME"), ner(lines[0], "Kowalski", "SURNAME")],
+            lines[2]: [ner(lines[2], "Krakowa", "CITY")],
+        })
+        two_pass = regex_anonymize_text(ml_anonymize_text(text, model, show_progress=False), RegexLayer())
+        results = {}
+        for unified_spans in (False, True):
+            with tempfile.TemporaryDirectory() as output_dir:
+                pipeline = AnonymizationPipeline(verbose=False, output_dir=output_dir, unified_spans=unified_spans,
+                                                 persistent_pool=False)
+                pipeline.nlp_model = model
+                pipeline.regex_layer = RegexLayer()
+                results[unified_spans] = pipeline.process(text)
+        self.assertEqual(results[True]["after_regex"], two_pass)
+        self.assertEqual(results[False]["after_regex"], two_pass)
+        self.assertEqual(results[True]["after_detailed_labels"], results[False]["after_detailed_labels"])
+        self.assertEqual(two_pass.split("\n")[0], "[name] [surname], PESEL [pesel], tel. [phone]")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,69 @@
+import unittest
+import sys
+import os
+import random
+
+# Ensure the parent directory is in the python path so we can import overfitters_pipeline
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from rapidfuzz.distance import Levenshtein
+
+from overfitters_pipeline.token_alignment import _increasing_pairs, anchored_opcodes
+
+
+def synthetic_line(num_tokens, seed, multi_token_tags=False):
+    rnd = random.Random(seed)
+    words = [f"w{i}" for i in range(2000)]
+    orig = []
+    while len(orig) < num_tokens:
+        orig += [rnd.choice(words), rnd.choice((" ", ", "))]
+    anon = []
+    i = 0
+    while i < len(orig):
+        if orig[i].strip(", ") and rnd.random() < 0.05:
+            anon.append("[name]")
+            i += 1
+        elif multi_token_tags and orig[i].strip(", ") and rnd.random() < 0.02:
+            anon.append("[address]")
+            i += 5
+        else:
+            anon.append(orig[i])
+            i += 1
+    return anon, orig
+
+
+class TestAnchoredOpcodes(unittest.TestCase):
+    def assertValidOpcodes(self, ops, a, b):
+        pos_a = pos_b = 0
+        for tag, i1, i2, j1, j2 in ops:
+            self.assertEqual((i1, j1), (pos_a, pos_b))
+            if tag == "equal":
+                self.assertEqual(a[i1:i2], b[j1:j2])
+            pos_a, pos_b = i2, j2
+        self.assertEqual((pos_a, pos_b), (len(a), len(b)))
+
+    def test_same_as_levenshtein(self):
+        for num_tokens, seed in ((50, 1), (1000, 2), (5000, 3), (20000, 4)):
+            anon, orig = synthetic_line(num_tokens, seed)
+            expected = [tuple(op) for op in Levenshtein.opcodes(anon, orig)]
+            self.assertEqual(anchored_opcodes(anon, orig), expected, f"{num_tokens} tokenów")
+
+    def test_valid_with_multi_token_tags(self):
+        for seed in range(5):
+            anon, orig = synthetic_line(3000, seed, multi_token_tags=True)
+            ops = anchored_opcodes(anon, orig)
+            self.assertValidOpcodes(ops, anon, orig)
+            cost = sum(max(i2 - i1, j2 - j1) for tag, i1, i2, j1, j2 in ops if tag != "equal")
+            self.assertEqual(cost, Levenshtein.distance(anon, orig))
+
+    def test_edge_cases(self):
+        for a, b in (([], []), ([], ["x"]), (["x"], []), (["a", "b"], ["a", "b"])):
+            self.assertEqual(anchored_opcodes(a, b), [tuple(op) for op in Levenshtein.opcodes(a, b)])
+
+    def test_increasing_pairs(self):
+        pairs = [(0, 5), (1, 1), (2, 2), (3, 9), (4, 3), (5, 4)]
+        self.assertEqual(_increasing_pairs(pairs), [(1, 1), (2, 2), (4, 3), (5, 4)])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Benchmark silników adresów warstwy Regex ("regex" vs "anchored").
+
+Mierzy sam krok wykrywania adresów na dwóch tekstach zbudowanych z pliku danych:
+- bez adresów: linie bez żadnego prefiksu ulicy,
+- gęsty w adresy: każda linia z dopisanymi adresami.
+
+Użycie:
+    python utils/bench_address_engine.py [plik_danych] [powtórzenia]
+"""
+
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from overfitters_pipeline.address_scanner import _AHOCORASICK_AVAILABLE
+from overfitters_pipeline.regex_layer import RegexLayer
+
+ADDRESSES = (
+    "ul. Długa 15/3 m. 4",
+    "al. Jana Pawła II 12a",
+    "os. Złotego Wieku 3",
+    "pl. gen. Andersa 7",
+    "rondo ONZ 1",
+)
+
+
+def build_texts(path: Path):
+    lines = path.read_text(encoding="utf-8").splitlines()
+    anchors = RegexLayer(address_engine="anchored")._address_scanner
+    free = [line for line in lines if not anchors.anchors(line)]
+    dense = [f"{line} {ADDRESSES[i % len(ADDRESSES)]}, {ADDRESSES[(i + 1) % len(ADDRESSES)]}."
+             for i, line in enumerate(free)]
+    return "\n".join(free), "\n".join(dense)
+
+
+def time_addresses(layer: RegexLayer, text: str, repeats: int):
+    """Najlepszy czas z `repeats` przebiegów samego kroku adresów."""
+    best = float("inf")
+    spans = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        if layer._address_scanner:
+            spans = layer._address_scanner.scan(text, layer.address_regex)
+        else:
+            spans = [m.span() for m in layer.address_regex.finditer(text)]
+        best = min(best, time.perf_counter() - start)
+    return best, spans
+
+
+def main():
+    data = Path(sys.argv[1]) if len(sys.argv) > 1 else Path(__file__).resolve().parent.parent / "data" / "orig.txt"
+    repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+
+    free, dense = build_texts(data)
+    print(f"Automat prefiksów: {'Aho-Corasick (pyahocorasick)' if _AHOCORASICK_AVAILABLE else 'regex trie'}")
+
+    regex_engines = ["re"]
+    if RegexLayer(regex_engine="auto").regex_engine == "re2":
+        regex_engines.append("re2")
+
+    for name, text in (("bez adresów", free), ("gęsty w adresy", dense)):
+        print(f"\n=== {name}: {len(text)} znaków ===")
+        for regex_engine in regex_engines:
+            baseline = None
+            for address_engine in ("regex", "anchored"):
+                layer = RegexLayer(regex_engine=regex_engine, address_engine=address_engine)
+                elapsed, spans = time_addresses(layer, text, repeats)
+                if baseline is None:
+                    baseline = (elapsed, spans)
+                    speedup = ""
+                else:
+                    assert spans == baseline[1], "Silniki zwróciły różne adresy"
+                    speedup = f"  (x{baseline[0] / elapsed:.1f})"
+                print(f"  [{regex_engine:3s} / {address_engine:8s}] {len(spans):5d} adresów  "
+                      f"{elapsed * 1000:8.1f} ms{speedup}")
+
+
+if __name__ == "__main__":
+    main()
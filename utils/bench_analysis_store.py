@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Benchmark trwałego magazynu analiz Morfeusza (Detailed Labels).
+
+Uruchamia Detailed Labels kilka razy, każdorazowo w nowym procesie (jak kolejne
+uruchomienia pipeline'u): bez magazynu, z pustym magazynem i z magazynem
+wypełnionym przez poprzednie uruchomienie, a z podanym leksykonem
+(utils/build_morph_lexicon.py) także z leksykonem form. Dla każdego przebiegu
+podaje czas startu workera, czas przetwarzania, liczbę wywołań
+morfeusz.analyse i czas spędzony w tych wywołaniach.
+
+Użycie:
+    python utils/bench_analysis_store.py [plik_oryginalny] [plik_zanonimizowany] [leksykon]
+"""
+
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+CHILD = """
+import json, sys, time
+sys.path.insert(0, {root!r})
+from overfitters_pipeline.detailed_labels import KEEP_LABELS, LineProcessor, process_text_tokenized
+
+store_path = {store!r}
+t = time.perf_counter()
+LineProcessor.init_worker(store_path, {lexicon!r})
+startup = time.perf_counter() - t
+morfeusz = LineProcessor._morfeusz
+stats = {{"calls": 0, "analyse_time": 0.0, "startup": startup}}
+analyse = morfeusz.analyse
+
+class Counting:
+    def analyse(self, word):
+        t = time.perf_counter()
+        try:
+            return analyse(word)
+        finally:
+            stats["calls"] += 1
+            stats["analyse_time"] += time.perf_counter() - t
+
+LineProcessor._morfeusz = Counting()
+orig = open({orig!r}, encoding="utf-8").read()
+anon = open({anon!r}, encoding="utf-8").read()
+t = time.perf_counter()
+process_text_tokenized(orig, anon, KEEP_LABELS, num_workers=1, store_path=store_path)
+stats["time"] = time.perf_counter() - t
+stats["stored"] = len(LineProcessor._store) if LineProcessor._store is not None else 0
+stats["lexicon_hits"] = LineProcessor.cache_stats().get("lexicon_hits", 0)
+if LineProcessor._store is not None:
+    LineProcessor._store.close()
+print(json.dumps(stats))
+"""
+
+
+def run(orig, anon, store, lexicon=None):
+    code = CHILD.format(root=str(ROOT), store=store, lexicon=lexicon, orig=str(orig), anon=str(anon))
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def main():
+    orig = Path(sys.argv[1]) if len(sys.argv) > 1 else ROOT / "data" / "orig.txt"
+    anon = Path(sys.argv[2]) if len(sys.argv) > 2 else ROOT / "data" / "anonymized.txt"
+    lexicon = sys.argv[3] if len(sys.argv) > 3 else None
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = os.path.join(tmp, "analyses.sqlite")
+        runs = [("bez magazynu", None, None), ("pusty magazyn", store, None),
+                ("ciepły magazyn", store, None), ("ciepły magazyn (2)", store, None)]
+        if lexicon:
+            runs += [("leksykon", None, lexicon), ("leksykon + magazyn", store, lexicon)]
+        for name, path, lexicon_path in runs:
+            stats = run(orig, anon, path, lexicon_path)
+            print(f"  {name:20s} start {stats['startup'] * 1000:7.1f} ms  {stats['time']:6.2f} s   "
+                  f"analyse: {stats['calls']:6d} wywołań, {stats['analyse_time'] * 1000:8.1f} ms   "
+                  f"wczytanych wpisów: {stats['stored']}   z leksykonu: {stats['lexicon_hits']}")
+
+
+if __name__ == "__main__":
+    main()
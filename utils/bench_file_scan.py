@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Benchmark skanowania plików warstwy Regex: detect() na zdekodowanym tekście
+vs RegexLayer.detect_file() na mapowaniu pliku (mmap).
+
+Plik danych jest powielany do kilku rozmiarów; dla każdego mierzony jest czas
+i (w osobnym przebiegu) szczytowa pamięć Pythona (tracemalloc).
+
+Użycie:
+    python utils/bench_file_scan.py [plik_danych] [krotności...]
+"""
+
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from overfitters_pipeline.regex_layer import FILE_WINDOW_BYTES, RegexLayer
+
+
+def measure(func):
+    """Czas (bez śledzenia pamięci, które go zawyża) i osobno szczyt pamięci."""
+    start = time.perf_counter()
+    count = func()
+    elapsed = time.perf_counter() - start
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return count, elapsed, peak
+
+
+def main():
+    data = Path(sys.argv[1]) if len(sys.argv) > 1 else Path(__file__).resolve().parent.parent / "data" / "orig.txt"
+    factors = [int(f) for f in sys.argv[2:]] or [1, 4, 16]
+    content = data.read_bytes()
+    layer = RegexLayer()
+
+    # Formy UTF-8 wzorców kompilowane są raz, przy pierwszym detect_file()
+    start = time.perf_counter()
+    if layer._get_bytes_patterns() is None:
+        print("OSTRZEŻENIE: brak google-re2 - detect_file() przetwarza plik przez detect_iter()")
+    print(f"Kompilacja wzorców bajtowych: {time.perf_counter() - start:.2f} s")
+
+    def decoded(path):
+        # Wariant referencyjny: cały plik jako str, przetwarzany oknami jak detect_file
+        with open(path, "r", encoding="utf-8", newline="") as f:
+            return sum(1 for _ in layer.detect_iter([f.read()], chunk_size=FILE_WINDOW_BYTES))
+
+    def mapped(path):
+        return sum(1 for _ in layer.detect_file(path))
+
+    for factor in factors:
+        with tempfile.NamedTemporaryFile("wb", suffix=".txt", delete=False) as f:
+            for _ in range(factor):
+                f.write(content)
+            path = f.name
+        try:
+            size_mb = os.path.getsize(path) / 2 ** 20
+            print(f"\n=== {size_mb:.1f} MiB ===")
+            for name, func in (("str + detect_iter", decoded), ("mmap detect_file", mapped)):
+                count, elapsed, peak = measure(lambda: func(path))
+                print(f"  {name:18s} {count:7d} encji  {elapsed:6.2f} s  szczyt pamięci {peak / 2 ** 20:7.1f} MiB")
+        finally:
+            os.unlink(path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Test długotrwały (soak) cache analiz Morfeusza w Detailed Labels.
+
+Przepuszcza przez _process_single_line miliony syntetycznych linii, w których
+imiona i miasta się powtarzają, a nazwiska są ciągle nowe (jak w długo
+działającym workerze zasilanym danymi użytkowników), i co pewną liczbę linii wypisuje pamięć
+procesu (RSS) oraz liczniki cache. Każdy wariant działa w osobnym procesie:
+- ograniczony: AnalysisLRU z domyślnymi limitami,
+- nieograniczony: bez limitów (dotychczasowe zachowanie).
+
+Użycie:
+    python utils/bench_labels_cache_soak.py [liczba_linii] [co_ile_raport]
+"""
+
+import os
+import random
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from overfitters_pipeline.detailed_labels import KEEP_LABELS, AnalysisLRU, LineProcessor, _process_single_line
+
+SYLLABLES = ["ka", "ro", "mi", "le", "now", "ski", "cz", "ew", "ta", "bo", "rz", "wi", "ło", "ga", "pa"]
+TEMPLATES = (
+    ("Spotkałem {0} {1} w {2}.", "Spotkałem [name] [surname] w [city]."),
+    ("Pani {1} mieszka w {2}, a {0} pracuje.", "Pani [surname] mieszka w [city], a [name] pracuje."),
+)
+
+
+def word(rnd):
+    return "".join(rnd.choice(SYLLABLES) for _ in range(rnd.randint(2, 4))).capitalize()
+
+
+def unique_word(i):
+    """Słowo zbudowane z sylab zapisujących liczbę i - każde inne."""
+    syllables = []
+    while True:
+        i, digit = divmod(i, len(SYLLABLES))
+        syllables.append(SYLLABLES[digit])
+        if not i:
+            return "".join(syllables).capitalize()
+
+
+def lines(count, seed=0):
+    """Imiona i miasta z ograniczonego słownika (powtarzają się), nazwiska zawsze nowe."""
+    rnd = random.Random(seed)
+    for i in range(count):
+        orig, anon = TEMPLATES[i % len(TEMPLATES)]
+        yield orig.format(word(rnd), unique_word(i) + "ska", word(rnd) + "owie"), anon
+
+
+def rss_mib():
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2 ** 20
+
+
+def soak(mode, count, every):
+    LineProcessor.init_worker()
+    if mode == "nieograniczony":
+        LineProcessor._cache = AnalysisLRU(max_entries=None, max_bytes=None)
+    start = time.perf_counter()
+    for i, (orig, anon) in enumerate(lines(count), 1):
+        _process_single_line((orig, anon, KEEP_LABELS))
+        if i % every == 0:
+            stats = LineProcessor.cache_stats()
+            print(f"  {mode:15s} {i:9d} linii  {time.perf_counter() - start:7.1f} s  RSS {rss_mib():7.1f} MiB  "
+                  f"cache {stats['entries']:8d} słów / {stats['resident_bytes'] / 2 ** 20:6.1f} MiB  "
+                  f"trafienia {stats['hits']:9d}  chybienia {stats['misses']:9d}  usunięte {stats['evictions']:9d}",
+                  flush=True)
+
+
+def main():
+    if len(sys.argv) > 1 and sys.argv[1] == "--mode":
+        soak(sys.argv[2], int(sys.argv[3]), int(sys.argv[4]))
+        return
+
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 2_000_000
+    every = int(sys.argv[2]) if len(sys.argv) > 2 else max(1, count // 10)
+    for mode in ("ograniczony", "nieograniczony"):
+        print(f"\n=== {mode} ===", flush=True)
+        subprocess.run([sys.executable, __file__, "--mode", mode, str(count), str(every)], check=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""
+Benchmark deduplikacji analiz Morfeusza w Detailed Labels: przetwarzanie
+linia po linii (każdy worker analizuje swoje słowa, cache osobny w każdym
+procesie) vs tryb dwufazowy (process_text_dedup - jedna analiza na unikalny
+slot w całym dokumencie).
+
+Dla każdego trybu nowa pula (puste cache); podawany jest czas oraz łączna
+liczba analiz Morfeusza (chybień cache) i odwołań do cache we wszystkich workerach.
+
+Użycie:
+    python utils/bench_labels_dedup.py [liczba_workerów] [krotność_danych]
+"""
+
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from overfitters_pipeline.detailed_labels import KEEP_LABELS, DetailedLabelsPool, process_text_tokenized
+
+DATA_DIR = Path(__file__).resolve().parent.parent / "data"
+
+
+def main():
+    num_workers = int(sys.argv[1]) if len(sys.argv) > 1 else 8
+    factor = int(sys.argv[2]) if len(sys.argv) > 2 else 1
+    orig = "\n".join([(DATA_DIR / "orig.txt").read_text(encoding="utf-8")] * factor)
+    anon = "\n".join([(DATA_DIR / "anonymized.txt").read_text(encoding="utf-8")] * factor)
+
+    print(f"{num_workers} workerów, {orig.count(chr(10)) + 1} linii")
+    results = {}
+    for name, dedup in (("linia po linii", False), ("dwufazowo", True)):
+        with DetailedLabelsPool(num_workers=num_workers, store_path=None) as pool:
+            pool.status()  # start workerów poza pomiarem
+            info = {}
+            start = time.perf_counter()
+            results[name] = process_text_tokenized(orig, anon, KEEP_LABELS, pool=pool, stats=info, dedup=dedup)
+            elapsed = time.perf_counter() - start
+            stats = pool.cache_stats()
+        misses = sum(s["misses"] for s in stats.values())
+        lookups = sum(s["hits"] + s["misses"] for s in stats.values())
+        extra = f"  slotów {info['tags']}, unikalnych {info['unique']}" if dedup else ""
+        print(f"  {name:15s} {elapsed:6.2f} s  analiz Morfeusza {misses:6d}  odwołań do cache {lookups:6d}"
+              f"  (odpowiedziało {len(stats)}/{num_workers} workerów){extra}")
+    print(f"  wyniki identyczne: {'tak' if len(set(results.values())) == 1 else 'NIE'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Benchmark wykonawców Detailed Labels: czas każdego wykonawcy (sequential,
+process, persistent) na danych z data/ (lub ich wycinku) i porównanie
+z prognozą skalibrowanego modelu kosztu oraz z wyborem trybu "auto"
+(z trwałą pulą - model skalibrowany na niej, calibrate_pool).
+
+Dla danego wycinka wszystkie wykonawcy startują z ciepłym cache w procesie
+głównym (przebieg rozgrzewający), pula trwała jest uruchomiona przed pomiarem.
+
+Użycie:
+    python utils/bench_labels_executor.py [liczba_workerów] [liczba_linii ...]
+"""
+
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from overfitters_pipeline.detailed_labels import (
+    EXECUTORS, KEEP_LABELS, DetailedLabelsPool, calibrate_executors, calibrate_pool, choose_executor, process_text_tokenized,
+)
+
+DATA_DIR = Path(__file__).resolve().parent.parent / "data"
+
+
+def main():
+    num_workers = int(sys.argv[1]) if len(sys.argv) > 1 else 8
+    sizes = [int(arg) for arg in sys.argv[2:]] or [20, 200, 2000]
+    orig_lines = (DATA_DIR / "orig.txt").read_text(encoding="utf-8").split("\n")
+    anon_lines = (DATA_DIR / "anonymized.txt").read_text(encoding="utf-8").split("\n")
+
+    start = time.perf_counter()
+    model = calibrate_executors(num_workers, store_path=None)
+    print(f"Kalibracja: {time.perf_counter() - start:.2f} s  {model}")
+
+    with DetailedLabelsPool(num_workers=num_workers, store_path=None) as pool:
+        pool.status()  # start workerów poza pomiarem
+        start = time.perf_counter()
+        pool_model = calibrate_pool(pool, store_path=None)
+        print(f"Kalibracja na puli: {time.perf_counter() - start:.2f} s  {pool_model}")
+        for size in sizes:
+            orig = "\n".join(orig_lines[:size])
+            anon = "\n".join(anon_lines[:size])
+            process_text_tokenized(orig, anon, KEEP_LABELS, num_workers=1, store_path=None)
+            chars = len(orig) + len(anon)
+            predictions = choose_executor(model, chars, size, num_workers)[1]
+            choice, pool_predictions = choose_executor(pool_model, chars, size, num_workers, pool)
+            predictions["persistent"] = pool_predictions["persistent"]
+            print(f"{size} linii ({chars} znaków), auto -> {choice}")
+            results = set()
+            for name in EXECUTORS:
+                start = time.perf_counter()
+                results.add(process_text_tokenized(orig, anon, KEEP_LABELS, num_workers=num_workers, pool=pool,
+                                                   store_path=None, executor=name))
+                elapsed = time.perf_counter() - start
+                print(f"  {name:12s} {elapsed:8.3f} s  prognoza {predictions.get(name, float('nan')):8.3f} s")
+            print(f"  wyniki identyczne: {'tak' if len(results) == 1 else 'NIE'}")
+
+
+if __name__ == "__main__":
+    main()
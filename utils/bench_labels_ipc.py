@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Benchmark wysyłki pracy do workerów Detailed Labels.
+
+Porównuje dotychczasowy schemat (krotka (linia_oryg, linia_anon, etykiety)
+na każdą linię, pool.map z domyślnym podziałem) z zakresami linii
+(_process_line_range, etykiety raz przy starcie workera, imap, linie
+bez zmian wracają jako None).
+Dla każdego rozmiaru mierzony jest czas i liczba bajtów zadań oraz wyników
+przesłanych przez IPC (rozmiar pickle).
+
+Użycie:
+    python utils/bench_labels_ipc.py [liczba_workerów] [liczby_linii...]
+"""
+
+import pickle
+import sys
+import time
+from multiprocessing import Pool
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from overfitters_pipeline.detailed_labels import (
+    KEEP_LABELS, DetailedLabelsPool, _init_pool_worker, _line_ranges,
+    _iter_unit_results, _process_line_range, _process_single_line,
+)
+
+DATA_DIR = Path(__file__).resolve().parent.parent / "data"
+
+
+def load_lines(num_lines):
+    orig = (DATA_DIR / "orig.txt").read_text(encoding="utf-8").split("\n")
+    anon = (DATA_DIR / "anonymized.txt").read_text(encoding="utf-8").split("\n")
+    size = min(len(orig), len(anon))
+    repeats = -(-num_lines // size)
+    # Sklejenie i podział daje osobne obiekty napisów - pickle nie deduplikuje powtórzeń
+    orig = "\n".join((orig[:size] * repeats)[:num_lines]).split("\n")
+    anon = "\n".join((anon[:size] * repeats)[:num_lines]).split("\n")
+    return orig, anon
+
+
+def pickled_size(tasks):
+    return sum(len(pickle.dumps(task, pickle.HIGHEST_PROTOCOL)) for task in tasks)
+
+
+def run_per_line(orig_lines, anon_lines, num_workers):
+    """Dotychczasowy schemat: zadanie na linię, pool.map."""
+    args_list = [(o, a, KEEP_LABELS) for o, a in zip(orig_lines, anon_lines)]
+    # pool.map dzieli listę na paczki po chunksize zadań - tyle trafia do jednego pickle
+    chunksize = max(1, -(-len(args_list) // (num_workers * 4)))
+    sent = pickled_size(args_list[i:i + chunksize] for i in range(0, len(args_list), chunksize))
+    with Pool(processes=num_workers, initializer=_init_pool_worker) as pool:
+        start = time.perf_counter()
+        results = pool.map(_process_single_line, args_list)
+        elapsed = time.perf_counter() - start
+    received = pickled_size(results[i:i + chunksize] for i in range(0, len(results), chunksize))
+    return results, elapsed, sent, received
+
+
+def run_ranges(orig_lines, anon_lines, num_workers):
+    """Zakresy linii, etykiety przy starcie workera, imap."""
+    units = list(_line_ranges(orig_lines, anon_lines, None, num_workers))
+    sent = pickled_size(units) + len(pickle.dumps(frozenset(KEEP_LABELS))) * num_workers
+    with DetailedLabelsPool(num_workers) as pool:
+        start = time.perf_counter()
+        chunks = list(pool.imap(_process_line_range, units))
+        results = list(_iter_unit_results(units, chunks))
+        elapsed = time.perf_counter() - start
+    return results, elapsed, sent, pickled_size(chunks)
+
+
+def main():
+    num_workers = int(sys.argv[1]) if len(sys.argv) > 1 else 4
+    sizes = [int(n) for n in sys.argv[2:]] or [10_000, 100_000]
+
+    for num_lines in sizes:
+        orig_lines, anon_lines = load_lines(num_lines)
+        print(f"\n=== {num_lines} linii, {num_workers} workerów ===")
+        reference = None
+        for name, run in (("linia na zadanie", run_per_line), ("zakresy linii", run_ranges)):
+            results, elapsed, sent, received = run(orig_lines, anon_lines, num_workers)
+            reference = reference or results
+            status = "OK" if results == reference else "RÓŻNE WYNIKI!"
+            print(f"  {name:17s} {elapsed:7.2f} s   wysłano {sent / 2 ** 20:7.2f} MiB   "
+                  f"odebrano {received / 2 ** 20:6.2f} MiB   {status}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Benchmark startu puli Detailed Labels z rozgrzewaniem przed fork() (prefork)
+i bez niego.
+
+Każdy tryb uruchamiany jest w nowym procesie (czysty stan rodzica). Podawane są:
+czas od utworzenia puli do odpowiedzi wszystkich workerów, czasy inicjalizacji
+poszczególnych workerów oraz ich unikalna pamięć (USS: Private_Clean +
+Private_Dirty z /proc/<pid>/smaps_rollup) - tuż po starcie i po przetworzeniu
+danych.
+
+Użycie:
+    python utils/bench_labels_prefork.py [liczba_workerów] [magazyn_analiz]
+"""
+
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+CHILD = """
+import json, sys, time
+sys.path.insert(0, {root!r})
+from overfitters_pipeline.detailed_labels import KEEP_LABELS, DetailedLabelsPool, process_text_tokenized
+
+def uss_mb(pid):
+    total = 0
+    with open(f"/proc/{{pid}}/smaps_rollup") as f:
+        for line in f:
+            if line.startswith(("Private_Clean:", "Private_Dirty:")):
+                total += int(line.split()[1])
+    return total / 1024
+
+orig = open({orig!r}, encoding="utf-8").read()
+anon = open({anon!r}, encoding="utf-8").read()
+start = time.perf_counter()
+with DetailedLabelsPool(num_workers={workers}, store_path={store!r}, prefork={prefork}) as pool:
+    startup = pool.startup_times()
+    ready = time.perf_counter() - start
+    uss_start = [uss_mb(pid) for pid in startup]
+    process_text_tokenized(orig, anon, KEEP_LABELS, pool=pool)
+    uss_done = [uss_mb(pid) for pid in startup]
+print(json.dumps({{"ready": ready, "startup": list(startup.values()), "uss_start": uss_start, "uss_done": uss_done}}))
+"""
+
+
+def run(num_workers, store, prefork):
+    code = CHILD.format(root=str(ROOT), workers=num_workers, store=store, prefork=prefork,
+                        orig=str(ROOT / "data" / "orig.txt"), anon=str(ROOT / "data" / "anonymized.txt"))
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def main():
+    num_workers = int(sys.argv[1]) if len(sys.argv) > 1 else 8
+    store = sys.argv[2] if len(sys.argv) > 2 else None
+
+    print(f"{num_workers} workerów, magazyn analiz: {store or 'brak'}")
+    for name, prefork in (("osobno w workerach", False), ("prefork", True)):
+        stats = run(num_workers, store, prefork)
+        startup = stats["startup"]
+        print(f"  {name:20s} gotowe po {stats['ready'] * 1000:7.1f} ms   "
+              f"inicjalizacja workera: śr. {sum(startup) / len(startup) * 1000:6.2f} ms, "
+              f"maks. {max(startup) * 1000:6.2f} ms")
+        print(f"  {'':20s} USS workera po starcie: śr. {sum(stats['uss_start']) / len(startup):6.1f} MB, "
+              f"po przetworzeniu danych: śr. {sum(stats['uss_done']) / len(startup):6.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""
+Benchmark wspólnej tablicy analiz (SharedAnalysisTable) w puli Detailed Labels:
+przetwarzanie danych z osobnym cache w każdym workerze vs z tablicą
+analiz we wspólnej pamięci.
+
+Dla każdego trybu nowa pula (puste cache, bez magazynu analiz); podawany jest
+czas, łączna liczba analiz Morfeusza we wszystkich workerach i trafień
+w tablicy wspólnej.
+
+Użycie:
+    python utils/bench_labels_shared.py [liczba_workerów] [krotność_danych]
+"""
+
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from overfitters_pipeline.detailed_labels import KEEP_LABELS, DetailedLabelsPool, process_text_tokenized
+
+DATA_DIR = Path(__file__).resolve().parent.parent / "data"
+
+
+def main():
+    num_workers = int(sys.argv[1]) if len(sys.argv) > 1 else 8
+    factor = int(sys.argv[2]) if len(sys.argv) > 2 else 1
+    orig = "\n".join([(DATA_DIR / "orig.txt").read_text(encoding="utf-8")] * factor)
+    anon = "\n".join([(DATA_DIR / "anonymized.txt").read_text(encoding="utf-8")] * factor)
+
+    print(f"{num_workers} workerów, {orig.count(chr(10)) + 1} linii")
+    results = {}
+    for name, shared in (("osobne cache", False), ("tablica wspólna", True)):
+        with DetailedLabelsPool(num_workers=num_workers, store_path=None, shared_table=shared) as pool:
+            pool.status()  # start workerów poza pomiarem
+            start = time.perf_counter()
+            results[name] = process_text_tokenized(orig, anon, KEEP_LABELS, pool=pool)
+            elapsed = time.perf_counter() - start
+            stats = pool.cache_stats()
+            table = pool.shared_stats()
+        misses = sum(s["misses"] for s in stats.values())
+        shared_hits = sum(s.get("shared_hits", 0) for s in stats.values())
+        extra = f"  wpisów w tablicy {table['entries']} ({table['arena_bytes'] / 1024:.0f} KB)" if shared else ""
+        print(f"  {name:16s} {elapsed:6.2f} s  analiz Morfeusza {misses - shared_hits:6d}  "
+              f"trafień w tablicy wspólnej {shared_hits:6d}  (odpowiedziało {len(stats)}/{num_workers} workerów)"
+              f"{extra}")
+    print(f"  wyniki identyczne: {'tak' if len(set(results.values())) == 1 else 'NIE'}")
+
+
+if __name__ == "__main__":
+    main()
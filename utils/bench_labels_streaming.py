@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Benchmark strumieniowego Detailed Labels: szczytowa pamięć procesu głównego
+(tracemalloc) przy process_text_tokenized na całych tekstach vs
+iter_lines_tokenized na liniach czytanych z plików i zapisywanych na bieżąco.
+
+Pliki wejściowe to data/orig.txt i data/anonymized.txt powielone `krotność`
+razy (pliki tymczasowe, zakończone znakiem nowej linii - wtedy zapis linii
+ze znakiem nowej linii daje ten sam plik co zapis całego wyniku). Przetwarzanie sekwencyjne - tracemalloc nie widzi
+pamięci workerów.
+
+Użycie:
+    python utils/bench_labels_streaming.py [krotność_danych]
+"""
+
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from overfitters_pipeline.detailed_labels import (
+    KEEP_LABELS, LineProcessor, iter_lines_tokenized, process_text_tokenized,
+)
+
+DATA_DIR = Path(__file__).resolve().parent.parent / "data"
+
+
+def measure(func):
+    tracemalloc.start()
+    start = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def main():
+    factor = int(sys.argv[1]) if len(sys.argv) > 1 else 4
+    LineProcessor.init_worker(None)
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = {}
+        for name in ("orig.txt", "anonymized.txt"):
+            paths[name] = os.path.join(tmp, name)
+            text = (DATA_DIR / name).read_text(encoding="utf-8")
+            Path(paths[name]).write_text("\n".join([text] * factor), encoding="utf-8")
+        out_path = os.path.join(tmp, "out.txt")
+        size = os.path.getsize(paths["orig.txt"]) + os.path.getsize(paths["anonymized.txt"])
+        print(f"Wejście: {size / 2 ** 20:.1f} MB")
+
+        def whole():
+            orig = Path(paths["orig.txt"]).read_text(encoding="utf-8")
+            anon = Path(paths["anonymized.txt"]).read_text(encoding="utf-8")
+            result = process_text_tokenized(orig, anon, KEEP_LABELS, num_workers=1, store_path=None)
+            Path(out_path).write_text(result, encoding="utf-8")
+
+        def streaming():
+            with open(paths["orig.txt"], encoding="utf-8") as orig, \
+                    open(paths["anonymized.txt"], encoding="utf-8") as anon, \
+                    open(out_path + ".stream", "w", encoding="utf-8") as out:
+                for line in iter_lines_tokenized(orig, anon, KEEP_LABELS, num_workers=1, store_path=None):
+                    out.write(line + "\n")
+
+        for name, func in (("całe teksty", whole), ("strumieniowo", streaming)):
+            elapsed, peak = measure(func)
+            print(f"  {name:14s} {elapsed:6.2f} s  szczyt pamięci {peak / 2 ** 20:8.1f} MB")
+        same = Path(out_path).read_text(encoding="utf-8") == Path(out_path + ".stream").read_text(encoding="utf-8")
+        print(f"  wyniki identyczne: {'tak' if same else 'NIE'}")
+
+
+if __name__ == "__main__":
+    main()
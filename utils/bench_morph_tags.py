@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Mikrobenchmark kodeka tagów (overfitters_pipeline/morph_tags.py): pytania
+o przypadek, rodzaj i część mowy zadawane tagom z analiz słów z data/orig.txt
+- dawne testy podnapisów (kopie poniżej) kontra maski z parse_tag.
+
+Podaje czasy obu wariantów i liczbę tagów, dla których odpowiedzi się różnią
+(przypadki i części mowy jak dawniej - różnice to tylko rodzaj, bo dawny test
+znajdował np. "m" w "nom").
+
+Użycie:
+    python utils/bench_morph_tags.py [liczba_powtórzeń]
+"""
+
+import re
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import morfeusz2
+
+from overfitters_pipeline.detailed_labels import PRZYPADKI
+from overfitters_pipeline.morph_tags import ADJ, CASE_BITS, MASCULINE, SUBST, first_case, gender_of, parse_tag
+
+DATA_DIR = Path(__file__).resolve().parent.parent / "data"
+
+
+# ================= DAWNE TESTY PODNAPISÓW =================
+
+def old_przypadek(tag_string):
+    for case_key, case_name in PRZYPADKI.items():
+        if case_key in tag_string:
+            return case_name
+    return None
+
+
+def old_rodzaj(tags):
+    tag_parts = []
+    for part in tags.split(":"):
+        tag_parts.extend(part.split("."))
+    for t in tag_parts:
+        if 'f' in t:
+            return 'woman'
+        if any(m in t for m in ('m1', 'm2', 'm3', 'm')):
+            return 'man'
+    return None
+
+
+def old_questions(tag):
+    return (old_przypadek(tag), old_rodzaj(tag), "subst" in tag or "adj" in tag,
+            "gen" in tag and any(g in tag for g in ('m1', 'm2', 'm3')))
+
+
+def new_questions(tag):
+    mask = parse_tag(tag)
+    case = first_case(mask)
+    return (PRZYPADKI[case] if case else None, gender_of(mask), bool(mask & (SUBST | ADJ)),
+            bool(mask & CASE_BITS["gen"]) and bool(mask & MASCULINE))
+
+
+def main():
+    repeats = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    morfeusz = morfeusz2.Morfeusz()
+    words = set(re.findall(r"\w+", (DATA_DIR / "orig.txt").read_text(encoding="utf-8")))
+    # Tagi w kolejności wystąpień w analizach (z powtórzeniami - jak w gorącej pętli)
+    tags = [item[2][2] for word in sorted(words) for item in morfeusz.analyse(word)]
+    print(f"{len(words)} słów, {len(tags)} analiz, {len(set(tags))} różnych tagów")
+
+    for name, questions in (("podnapisy", old_questions), ("kodek", new_questions)):
+        parse_tag.cache_clear()
+        start = time.perf_counter()
+        for _ in range(repeats):
+            for tag in tags:
+                questions(tag)
+        elapsed = time.perf_counter() - start
+        print(f"  {name:10s} {elapsed:8.3f} s  ({elapsed / (repeats * len(tags)) * 1e9:6.0f} ns/tag)")
+
+    distinct = sorted(set(tags))
+    differ = [tag for tag in distinct if old_questions(tag) != new_questions(tag)]
+    print(f"  różne odpowiedzi: {len(differ)} z {len(distinct)} tagów, np. {differ[:3]}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Benchmark silników regex warstwy Regex ("re" vs "re2").
+
+Mierzy najgorszy czas pojedynczej linii dla złośliwych wejść adresowych
+(katastrofalny backtracking wzorca address_regex) w rosnących rozmiarach
+oraz łączny czas detect() na pliku danych.
+
+Użycie:
+    python utils/bench_regex_engines.py [plik_danych] [budżet_na_linię_s]
+"""
+
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from overfitters_pipeline.regex_layer import RegexLayer
+
+# Złośliwe linie: prefiks ulicy + długi ciąg członów bez numeru domu
+ADVERSARIAL = {
+    "łączniki": lambda n: "ul. " + "i " * n + "x",
+    "inicjały": lambda n: "ul. " + "A " * n,
+    "myślniki": lambda n: "ul. " + "A-" * n,
+    "człony": lambda n: "ul. " + "Abc-" * n,
+}
+SIZES = (4, 8, 12, 16, 20, 24, 200, 2000)
+
+
+def time_line(layer: RegexLayer, line: str) -> float:
+    start = time.perf_counter()
+    layer.detect(line, use_cache=False)
+    return time.perf_counter() - start
+
+
+def bench_adversarial(engine: str, budget: float):
+    """Czas na linię dla każdego wejścia; po przekroczeniu budżetu większe rozmiary są pomijane."""
+    layer = RegexLayer(regex_engine=engine)
+    print(f"\n[{engine}] silniki wzorców: {sorted(set(layer.pattern_engines.values()))}")
+    worst = 0.0
+    for name, make in ADVERSARIAL.items():
+        row = []
+        for n in SIZES:
+            elapsed = time_line(layer, make(n))
+            worst = max(worst, elapsed)
+            row.append(f"{n}:{elapsed * 1000:.2f}ms")
+            if elapsed > budget:
+                row.append("(pominięto większe)")
+                break
+        print(f"  {name:10s} " + "  ".join(row))
+    print(f"  najgorszy czas linii: {worst * 1000:.2f} ms")
+    return worst
+
+
+def bench_file(engine: str, path: Path):
+    layer = RegexLayer(regex_engine=engine)
+    lines = path.read_text(encoding="utf-8").splitlines()
+    start = time.perf_counter()
+    worst = 0.0
+    total = 0
+    for line in lines:
+        t = time.perf_counter()
+        total += len(layer.detect(line, use_cache=False))
+        worst = max(worst, time.perf_counter() - t)
+    elapsed = time.perf_counter() - start
+    print(f"  [{engine}] {path.name}: {len(lines)} linii, {total} encji, "
+          f"{elapsed:.2f}s, najgorsza linia {worst * 1000:.2f} ms")
+    return elapsed
+
+
+def main():
+    data = Path(sys.argv[1]) if len(sys.argv) > 1 else Path(__file__).resolve().parent.parent / "data" / "orig.txt"
+    budget = float(sys.argv[2]) if len(sys.argv) > 2 else 1.0
+
+    engines = ["re"]
+    if RegexLayer(regex_engine="auto").regex_engine == "re2":
+        engines.append("re2")
+    else:
+        print("OSTRZEŻENIE: google-re2 nie jest zainstalowany - mierzę tylko silnik 're'.")
+
+    print("=== Złośliwe wejścia adresowe (czas na linię) ===")
+    for engine in engines:
+        bench_adversarial(engine, budget)
+
+    if data.exists():
+        print("\n=== Dane rzeczywiste ===")
+        for engine in engines:
+            bench_file(engine, data)
+
+
+if __name__ == "__main__":
+    main()
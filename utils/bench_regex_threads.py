@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Benchmark wielowątkowy warstwy Regex: jedna instancja RegexLayer współdzielona
+przez N wątków (jak w serwisie obsługującym równoległe żądania).
+
+Dla każdej liczby wątków mierzona jest przepustowość (linie/s) w dwóch
+scenariuszach - z cache (90% żądań to powtarzające się "gorące" linie,
+pozostałe wymuszają ciągłe usuwanie wpisów z małego cache) i bez cache - oraz sprawdzane, czy wyniki są identyczne
+z przebiegiem jednowątkowym.
+
+W CPython z GIL (ani `re`, ani google-re2 go nie zwalniają) przepustowość
+pozostaje w przybliżeniu stała - skalowanie na wiele rdzeni daje
+detect_parallel(); benchmark pokazuje brak regresji i poprawność przy
+współbieżnym dostępie (oraz zysk na buildach bez GIL).
+
+Użycie:
+    python utils/bench_regex_threads.py [plik_danych] [liczby_wątków...]
+"""
+
+import random
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from overfitters_pipeline.regex_layer import RegexLayer
+
+CACHE_SIZE = 256
+HOT_RATIO = 0.9
+
+
+def entities(layer, line, use_cache):
+    return [(e.start, e.end, e.entity_type) for e in layer.detect(line, use_cache=use_cache)]
+
+
+def run(layer, lines, threads, use_cache):
+    """Czas i wyniki przetworzenia `lines` przez `threads` wątków."""
+    layer.clear_cache()
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        results = list(executor.map(lambda line: entities(layer, line, use_cache), lines, chunksize=64))
+    return time.perf_counter() - start, results
+
+
+def main():
+    data = Path(sys.argv[1]) if len(sys.argv) > 1 else Path(__file__).resolve().parent.parent / "data" / "orig.txt"
+    thread_counts = [int(n) for n in sys.argv[2:]] or [1, 2, 4, 8]
+    lines = [line for line in data.read_text(encoding="utf-8").splitlines() if line.strip()]
+
+    regex_engines = ["re"]
+    if RegexLayer(regex_engine="auto").regex_engine == "re2":
+        regex_engines.append("re2")
+
+    rnd = random.Random(0)
+    hot = lines[:CACHE_SIZE // 2]
+    mixed = [rnd.choice(hot) if rnd.random() < HOT_RATIO else rnd.choice(lines) for _ in range(3 * len(lines))]
+
+    for regex_engine in regex_engines:
+        layer = RegexLayer(cache_size=CACHE_SIZE, regex_engine=regex_engine)
+        for use_cache, work in ((True, mixed), (False, lines)):
+            print(f"\n=== {regex_engine}, {'cache' if use_cache else 'bez cache'}: {len(work)} linii ===")
+            reference = [entities(layer, line, False) for line in work]
+            baseline = None
+            for threads in thread_counts:
+                elapsed, results = run(layer, work, threads, use_cache)
+                status = "OK" if results == reference else "RÓŻNE WYNIKI!"
+                baseline = baseline or elapsed
+                print(f"  {threads:2d} wątków: {len(work) / elapsed:9.0f} linii/s  "
+                      f"(x{baseline / elapsed:.2f})  {status}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Benchmark wyrównywania tokenów w Detailed Labels: Levenshtein.opcodes na całej
+linii vs wyrównanie z kotwicami (token_alignment.anchored_opcodes).
+
+Linie syntetyczne: losowe słowa z separatorami, w wersji zanonimizowanej część
+słów zastąpiona tagami [name] (jeden tag - jeden token). Dla każdej długości
+podawany jest czas obu metod i zgodność wyniku.
+
+Użycie:
+    python utils/bench_token_alignment.py [liczby_tokenów...]
+"""
+
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from rapidfuzz.distance import Levenshtein
+
+from overfitters_pipeline.token_alignment import anchored_opcodes
+
+TAG_RATE = 0.05
+VOCABULARY = 5000
+
+
+def synthetic_line(num_tokens, rnd):
+    """Para (tokeny zanonimizowane, tokeny oryginalne)."""
+    words = [f"słowo{i}" for i in range(VOCABULARY)]
+    orig = []
+    while len(orig) < num_tokens:
+        orig.append(rnd.choice(words))
+        orig.append(rnd.choice((" ", " ", ", ", ". ")))
+    anon = ["[name]" if not token.strip(" ,.") == "" and rnd.random() < TAG_RATE else token
+            for token in orig]
+    return anon, orig
+
+
+def best_time(func, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return result, best
+
+
+def main():
+    sizes = [int(n) for n in sys.argv[1:]] or [1000, 2000, 5000, 10000, 20000, 50000]
+    rnd = random.Random(0)
+    print(f"{'tokenów':>8s} {'Levenshtein':>12s} {'kotwice':>10s} {'przysp.':>8s} {'zgodne':>7s}")
+    for size in sizes:
+        anon, orig = synthetic_line(size, rnd)
+        repeat = 3 if size <= 20000 else 1
+        full, t_full = best_time(lambda: [tuple(op) for op in Levenshtein.opcodes(anon, orig)], repeat)
+        anchored, t_anchored = best_time(lambda: anchored_opcodes(anon, orig), repeat)
+        print(f"{size:8d} {t_full * 1000:10.1f}ms {t_anchored * 1000:8.1f}ms "
+              f"{t_full / t_anchored:7.1f}x {'tak' if full == anchored else 'NIE':>7s}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+Budowa leksykonu morfologicznego dla Detailed Labels (overfitters_pipeline/morph_lexicon.py).
+
+Lematy: imiona, nazwiska i miasta z puli danych syntetycznych, lematy słów
+z wartości etykiet KEEP_LABELS w label_mappings.json oraz (opcjonalnie)
+pliki z listami lematów - jeden na linię. Każdy lemat jest rozwijany we
+wszystkie formy, a każda forma analizowana raz przez Morfeusza.
+
+Leksykon jest używany przez workery, gdy zmienna MORFEUSZ_LEXICON wskazuje plik.
+
+Użycie:
+    python utils/build_morph_lexicon.py [plik_wyjściowy] [lista_lematów ...]
+"""
+
+import json
+import re
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import morfeusz2
+
+from overfitters_pipeline.detailed_labels import KEEP_LABELS
+from overfitters_pipeline.morph_lexicon import MorphLexicon, build_lexicon, lemmas_of
+from overfitters_pipeline.synthetic_data_pool import SYNTHETIC_POOL
+
+UTILS_DIR = Path(__file__).resolve().parent
+DEFAULT_OUTPUT = UTILS_DIR.parent / "cache" / "morph_lexicon.bin"
+POOL_KEYS = ("name-man", "name-woman", "surname-man", "surname-woman", "city")
+
+
+def main():
+    output = Path(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_OUTPUT
+    morfeusz = morfeusz2.Morfeusz()
+
+    lemmas = {value for key in POOL_KEYS for value in SYNTHETIC_POOL[key]}
+    mappings = json.loads((UTILS_DIR / "label_mappings.json").read_text(encoding="utf-8"))["mappings"]
+    words = {word for label in KEEP_LABELS for value in mappings.get(label, []) for word in re.findall(r"\w+", value)}
+    lemmas |= lemmas_of(morfeusz, words)
+    for path in sys.argv[2:]:
+        lemmas.update(Path(path).read_text(encoding="utf-8").split("\n"))
+
+    start = time.perf_counter()
+    count = build_lexicon(str(output), lemmas, morfeusz)
+    elapsed = time.perf_counter() - start
+    lexicon = MorphLexicon(str(output))
+    print(f"{len(lemmas)} lematów -> {count} form, {output.stat().st_size / 2 ** 20:.1f} MB "
+          f"({elapsed:.1f} s, słownik {lexicon.dict_version})")
+    print(f"Użycie: MORFEUSZ_LEXICON={output}")
+
+
+if __name__ == "__main__":
+    main()